@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from flask import Flask, abort, send_from_directory
+from flask import Flask, abort
 from flask_cors import CORS
 
 from backend.config import get_config
@@ -15,15 +15,19 @@ if os.environ.get("USE_MARIADB", "false").lower() == "true":
 else:
     from backend.db import init_app as init_db
 
+from backend.cache import init_app as init_cache
+from backend.serialization import init_app as init_serialization
 from backend.routes.public import bp as public_bp
 from backend.routes.admin import bp as admin_bp
+from backend.season_queue import ensure_worker
+from backend.static_manifest import StaticManifest
 
 BACKEND_DIR = Path(__file__).resolve().parent
 FRONTEND_DIST = BACKEND_DIR.parent / "frontend" / "dist"
 
 def create_app(config_name: str | None = None) -> Flask:
-    static_folder = str(FRONTEND_DIST) if FRONTEND_DIST.exists() else None
-    app = Flask(__name__, static_folder=static_folder, static_url_path="")
+    # the frontend is served from an in-memory manifest, not Flask's static route
+    app = Flask(__name__, static_folder=None)
     config_class = get_config(config_name)
     app.config.from_object(config_class)
     app.config["DATABASE_PATH"] = str(config_class.DATABASE_PATH)
@@ -36,20 +40,28 @@ def create_app(config_name: str | None = None) -> Flask:
     CORS(app, resources={r"/api/*": {"origins": origins}}, supports_credentials=True)
 
     init_db(app)
+    init_cache(app)
+    init_serialization(app)
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp)
 
-    if app.static_folder:
+    # jobs left pending by a restart should not wait for the next admin write
+    worker = ensure_worker(app)
+    if worker is not None:
+        worker.wake()
+
+    if FRONTEND_DIST.exists():
+        manifest = StaticManifest(FRONTEND_DIST)
 
         @app.route("/", defaults={"path": ""})
         @app.route("/<path:path>")
         def serve_frontend(path: str):
             if path.startswith("api/"):
                 abort(404)
-            target_path = FRONTEND_DIST / path
-            if path and target_path.exists():
-                return send_from_directory(app.static_folder, path)
-            return send_from_directory(app.static_folder, "index.html")
+            static_file = manifest.lookup(path)
+            if static_file is None:
+                abort(404)
+            return manifest.response(static_file)
 
     else:
 
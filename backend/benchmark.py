@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the hot database paths of Top Scoot.
+
+Every benchmark builds a throwaway SQLite database filled with synthetic
+data, so ``data/top-scoot.sqlite3`` is never touched::
+
+    python -m backend.benchmark season --riders 100000
+    python -m backend.benchmark pagination --page 2000
+    python -m backend.benchmark search --riders 500000
+    python -m backend.benchmark leaderboard --riders 100000
+    python -m backend.benchmark serialize --limit 200
+
+``explain`` is a check rather than a timing: it fails unless the date and
+age filters are planned as index range scans and the events calendar is
+read in index order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from backend.days import day_number
+from backend.migrate import run_migrations
+from backend.pagination import encode_cursor
+from backend.search import rider_search_filter
+from backend.scoring import RESCORE_SINCE_SQL
+from backend.season import (
+    EXPIRING_RESULTS_SQL,
+    NEXT_EXPIRY_SQL,
+    recalculate_season_points,
+    refresh_season_points,
+    upsert_totals_query,
+)
+
+LEVELS = ["local", "regional", "national", "international"]
+RIDER_LEVELS = ["novice", "amateur", "pro"]
+STYLES = ["street", "park", "universal"]
+CITIES = ["Moscow", "Saint Petersburg", "Kazan", "Novosibirsk", "Yekaterinburg", "Krasnodar", "Sochi"]
+
+
+def build_database(path: Path, riders: int, events: int, results_per_event: int, seed: int = 1) -> sqlite3.Connection:
+    """Create a migrated database at ``path`` with synthetic riders and results."""
+
+    run_migrations(path)
+    rng = random.Random(seed)
+    today = date.today()
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        """
+        INSERT INTO riders (id, nickname, fullname, city, birthdate, style, level)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            (
+                rider_id,
+                f"rider{rider_id:07d}",
+                f"Rider Number {rider_id}",
+                rng.choice(CITIES),
+                (date(1985, 1, 1) + timedelta(days=rng.randrange(9000))).isoformat(),
+                rng.choice(STYLES),
+                rng.choice(RIDER_LEVELS),
+            )
+            for rider_id in range(1, riders + 1)
+        ),
+    )
+    conn.executemany(
+        """
+        INSERT INTO events (id, name, date_start, city, level, participants_count, status)
+        VALUES (?, ?, ?, ?, ?, ?, 'published')
+        """,
+        (
+            (
+                event_id,
+                f"Event {event_id}",
+                (today - timedelta(days=rng.randrange(365))).isoformat(),
+                rng.choice(CITIES),
+                rng.choice(LEVELS),
+                results_per_event,
+            )
+            for event_id in range(1, events + 1)
+        ),
+    )
+    per_event = min(results_per_event, riders)
+    conn.executemany(
+        "INSERT INTO results (event_id, rider_id, place, points) VALUES (?, ?, ?, ?)",
+        (
+            (event_id, rider_id, place, max(5, 400 - place))
+            for event_id in range(1, events + 1)
+            for place, rider_id in enumerate(rng.sample(range(1, riders + 1), per_event), start=1)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def measure(label: str, func: Callable[[], object], repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    print(f"{label:<40} best {min(timings) * 1000:9.1f} ms   median {statistics.median(timings) * 1000:9.1f} ms")
+
+
+def legacy_recalculate(conn: sqlite3.Connection, window_days: int = 90, points_cap: int = 1000) -> None:
+    """The pre-set-based rebuild: wipe, fetch every total, insert row by row."""
+
+    cutoff = (date.today() - timedelta(days=window_days)).isoformat()
+    conn.execute("DELETE FROM season_points")
+    rows = conn.execute(
+        """
+        SELECT r.rider_id, COALESCE(SUM(r.points), 0)
+        FROM results AS r
+        JOIN events AS e ON e.id = r.event_id
+        WHERE date(e.date_start) >= ?
+        GROUP BY r.rider_id
+        """,
+        (cutoff,),
+    ).fetchall()
+    for rider_id, total_points in rows:
+        conn.execute(
+            """
+            INSERT INTO season_points (rider_id, season_points, season_updated_at)
+            VALUES (?, ?, datetime('now'))
+            ON CONFLICT (rider_id) DO UPDATE SET
+                season_points = excluded.season_points,
+                season_updated_at = excluded.season_updated_at
+            """,
+            (rider_id, min(int(total_points), points_cap)),
+        )
+
+
+def bench_season(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(Path(tmp) / "bench.sqlite3", args.riders, args.events, args.results_per_event)
+        print(f"{args.riders} riders, {args.events} events, {args.events * args.results_per_event} results")
+        sample = random.Random(2).sample(range(1, args.riders + 1), 40)
+
+        def run(func: Callable[[], None]) -> Callable[[], None]:
+            def wrapped() -> None:
+                func()
+                conn.commit()
+
+            return wrapped
+
+        measure("legacy rebuild (row by row)", run(lambda: legacy_recalculate(conn)), args.repeat)
+        measure("set-based rebuild", run(lambda: recalculate_season_points(conn)), args.repeat)
+        measure("refresh 40 riders", run(lambda: refresh_season_points(conn, sample)), args.repeat)
+        measure("refresh 40 riders + re-rank", run(lambda: refresh_season_points(conn, sample, rerank=True)), args.repeat)
+
+        def change_points() -> None:
+            # one result of each sampled rider gains a point, so the re-rank has work to do
+            conn.executemany(
+                "UPDATE results SET points = points + 1 WHERE id = (SELECT MIN(id) FROM results WHERE rider_id = ?)",
+                [(rider_id,) for rider_id in sample],
+            )
+            refresh_season_points(conn, sample, rerank=True)
+
+        measure("40 riders' points change + re-rank", run(change_points), args.repeat)
+        conn.close()
+
+
+def bench_pagination(args: argparse.Namespace) -> None:
+    """Deep rating pages by page number (``OFFSET``) against a keyset cursor."""
+
+    from backend.app import create_app
+    from backend.cache import init_app as init_cache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite3"
+        conn = build_database(path, args.riders, args.events, args.results_per_event)
+        recalculate_season_points(conn)
+        conn.commit()
+        conn.close()
+        app = create_app()
+        app.config.update(DATABASE_PATH=str(path), RESPONSE_CACHE="off")
+        init_cache(app)
+        client = app.test_client()
+        print(f"{args.riders} riders, limit {args.limit}")
+
+        # ageMin=1 keeps every rider but bypasses the rider_ranks position range
+        for label, query in (("unfiltered", ""), ("filtered", "&ageMin=1")):
+            base = f"/api/rating?limit={args.limit}{query}"
+            previous = client.get(f"{base}&page={args.page - 1}").get_json()["items"]
+            if not previous:
+                raise SystemExit(f"page {args.page} is past the end, use more --riders")
+            cursor = encode_cursor([previous[-1]["seasonPoints"], previous[-1]["id"]])
+
+            measure(f"{label} page 1", lambda: client.get(f"{base}&page=1"), args.repeat)
+            measure(f"{label} page {args.page} (offset)", lambda: client.get(f"{base}&page={args.page}"), args.repeat)
+            measure(f"{label} page {args.page} (cursor)", lambda: client.get(f"{base}&cursor={cursor}"), args.repeat)
+
+
+def bench_search(args: argparse.Namespace) -> None:
+    """Rider name search: the old substring scan against the FTS5 index."""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(Path(tmp) / "bench.sqlite3", args.riders, args.events, args.results_per_event)
+        print(f"{args.riders} riders")
+        like = "(lower(r.nickname) LIKE lower(?) OR lower(COALESCE(r.fullname, '')) LIKE lower(?))"
+        # a narrow nickname prefix, a common full name word, two words
+        for term in ("rider00123", "Number", "number 4242"):
+            fts_sql, fts_params = rider_search_filter(conn, term, "r")
+            matches = conn.execute(f"SELECT COUNT(*) FROM riders AS r WHERE {fts_sql}", fts_params).fetchone()[0]
+            print(f"-- {term!r}: {matches} matches")
+            for label, where, params in (
+                ("LIKE", like, [f"%{term}%", f"%{term}%"]),
+                ("FTS5", fts_sql, fts_params),
+            ):
+                count_sql = f"SELECT COUNT(*) FROM riders AS r WHERE {where}"
+                page_sql = f"SELECT r.id FROM riders AS r WHERE {where} ORDER BY r.id LIMIT 50"
+                measure(f"{label} count", lambda: conn.execute(count_sql, params).fetchone(), args.repeat)
+                measure(f"{label} first page", lambda: conn.execute(page_sql, params).fetchall(), args.repeat)
+        conn.close()
+
+
+def bench_leaderboard(args: argparse.Namespace) -> None:
+    """Filtered rating pages from the in-memory leaderboard against SQL."""
+
+    from backend.app import create_app
+    from backend.cache import init_app as init_cache
+    from backend.leaderboard import get_leaderboard
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite3"
+        conn = build_database(path, args.riders, args.events, args.results_per_event)
+        recalculate_season_points(conn)
+        conn.commit()
+        measure("leaderboard load", lambda: get_leaderboard(conn, f"bench-{time.perf_counter()}"), 1)
+        conn.close()
+        app = create_app()
+        app.config.update(DATABASE_PATH=str(path), RESPONSE_CACHE="off")
+        init_cache(app)
+        client = app.test_client()
+        client.get("/api/rating")  # builds the leaderboard
+        print(f"{args.riders} riders")
+
+        for query in ("page=200", "city=Kazan&page=50", "level=pro&style=park", "ageMin=18&ageMax=25", "search=rider0001"):
+            for mode in ("memory", "off"):
+                app.config["LEADERBOARD"] = mode
+                measure(f"{query} ({mode})", lambda: client.get(f"/api/rating?{query}"), args.repeat)
+
+
+def legacy_rating_items(rows: list[sqlite3.Row]) -> list[dict]:
+    """Rating items as ``get_rating`` built them before row shapes."""
+
+    from backend.routes.public import calculate_age
+
+    return [
+        {
+            "id": row["id"],
+            "nickname": row["nickname"],
+            "fullname": row["fullname"],
+            "city": row["city"],
+            "birthdate": row["birthdate"],
+            "age": calculate_age(row["birthdate"]),
+            "style": row["style"],
+            "level": row["level"],
+            "seasonPoints": row["season_points"],
+            "rank": row["rank"],
+        }
+        for row in rows
+    ]
+
+
+def bench_serialize(args: argparse.Namespace) -> None:
+    """One rating page as JSON: dicts by hand and Flask's encoder against row shapes."""
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+
+    from backend import serialization
+    from backend.routes.public import rating_shape
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(Path(tmp) / "bench.sqlite3", max(args.limit, 1000), 0, 0)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT r.id, r.nickname, r.fullname, r.city, r.birthdate, r.style, r.level,
+                   0 AS season_points, r.id AS rank
+            FROM riders AS r ORDER BY r.id LIMIT ?
+            """,
+            (args.limit,),
+        ).fetchall()
+        conn.close()
+
+    app = Flask(__name__)
+    stdlib, fast = DefaultJSONProvider(app), serialization.JSONProvider(app)
+    shape = rating_shape(date.today())
+
+    def page(items: Callable[[], list[dict]], provider: DefaultJSONProvider) -> Callable[[], None]:
+        def run() -> None:
+            for _ in range(args.pages):
+                provider.dumps({"items": items(), "total": len(rows)}, separators=(",", ":"))
+
+        return run
+
+    print(f"{args.limit}-row rating page x {args.pages}, orjson {'installed' if serialization.orjson else 'missing'}")
+    measure("dicts + stdlib (before)", page(lambda: legacy_rating_items(rows), stdlib), args.repeat)
+    measure("shape + stdlib", page(lambda: shape.many(rows), stdlib), args.repeat)
+    if serialization.orjson is not None:
+        measure("shape + orjson", page(lambda: shape.many(rows), fast), args.repeat)
+
+
+def bench_explain(args: argparse.Namespace) -> None:
+    """EXPLAIN QUERY PLAN of every date and age predicate; exit 1 unless indexed.
+
+    The statements come from the helpers the routes and the season code
+    run, so a change there is checked as well.
+    """
+
+    from flask import Flask
+
+    from backend.routes.admin import event_filters, events_page_query
+    from backend.routes.public import events_query, rating_filters, rating_page_query
+
+    today = date.today()
+    window_start = today - timedelta(days=90)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(Path(tmp) / "bench.sqlite3", args.riders, args.events, args.results_per_event)
+        with Flask(__name__).test_request_context("/api/rating?ageMin=18&ageMax=25"):
+            age_clauses, age_params, _, _ = rating_filters(conn, None)
+        admin_where, admin_params = event_filters(conn, None, None, None, None, window_start, today)
+        cursor = [today.isoformat(), 0]
+        # (label, (query, parameters), index the plan must use)
+        checks = [
+            (
+                "rating age range",
+                rating_page_query(None, age_clauses, age_params, None, 51, 0),
+                "idx_riders_birth_day",
+            ),
+            (
+                "admin events date range",
+                events_page_query(admin_where, admin_params, None, 51, 0),
+                "idx_events_start_day",
+            ),
+            ("season window totals", upsert_totals_query(conn, window_start, 1000), "idx_events_start_day"),
+            (
+                "season expiring results",
+                (EXPIRING_RESULTS_SQL, (day_number(window_start) - 7, day_number(window_start))),
+                "idx_events_start_day",
+            ),
+            ("season next expiry", (NEXT_EXPIRY_SQL, (day_number(window_start),)), "idx_events_start_day"),
+            ("rescore since", (RESCORE_SINCE_SQL, (day_number(window_start),)), "idx_events_start_day"),
+            (
+                "events calendar upcoming",
+                events_query(conn, None, None, "upcoming", None, None, cursor, 51),
+                "idx_events_status_date",
+            ),
+            (
+                "events calendar past",
+                events_query(conn, None, None, "past", None, None, cursor, 51),
+                "idx_events_status_date",
+            ),
+        ]
+        # these must also come out in index order, without a sort step
+        unsorted = {"events calendar upcoming", "events calendar past"}
+        failed = 0
+        for label, (sql, params), index in checks:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            ok = any(f"INDEX {index} " in f"{step} " for step in plan)
+            if label in unsorted:
+                ok = ok and not any("TEMP B-TREE" in step for step in plan)
+            failed += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label}: {' / '.join(plan)}")
+        conn.close()
+    if failed:
+        raise SystemExit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run Top Scoot micro-benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    season = commands.add_parser("season", help="season points recalculation")
+    season.add_argument("--riders", type=int, default=100_000)
+    season.add_argument("--events", type=int, default=400)
+    season.add_argument("--results-per-event", type=int, default=500)
+    season.set_defaults(func=bench_season)
+
+    pagination = commands.add_parser("pagination", help="rating page 1 vs a deep page, offset vs cursor")
+    pagination.add_argument("--riders", type=int, default=100_000)
+    pagination.add_argument("--events", type=int, default=100)
+    pagination.add_argument("--results-per-event", type=int, default=500)
+    pagination.add_argument("--limit", type=int, default=50)
+    pagination.add_argument("--page", type=int, default=2000)
+    pagination.set_defaults(func=bench_pagination)
+
+    search = commands.add_parser("search", help="rider name search, LIKE scan vs FTS5")
+    search.add_argument("--riders", type=int, default=500_000)
+    search.add_argument("--events", type=int, default=0)
+    search.add_argument("--results-per-event", type=int, default=0)
+    search.set_defaults(func=bench_search)
+
+    leaderboard = commands.add_parser("leaderboard", help="rating filters, in-memory leaderboard vs SQL")
+    leaderboard.add_argument("--riders", type=int, default=100_000)
+    leaderboard.add_argument("--events", type=int, default=100)
+    leaderboard.add_argument("--results-per-event", type=int, default=500)
+    leaderboard.set_defaults(func=bench_leaderboard)
+
+    serialize = commands.add_parser("serialize", help="rating page JSON, hand-built dicts vs row shapes and orjson")
+    serialize.add_argument("--limit", type=int, default=200)
+    serialize.add_argument("--pages", type=int, default=100)
+    serialize.set_defaults(func=bench_serialize)
+
+    explain = commands.add_parser("explain", help="check that date and age filters use their indexes")
+    explain.add_argument("--riders", type=int, default=20_000)
+    explain.add_argument("--events", type=int, default=400)
+    explain.add_argument("--results-per-event", type=int, default=50)
+    explain.set_defaults(func=bench_explain)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Response cache for the public API.
+
+Entries are keyed on the endpoint, the data generation it depends on
+(see :mod:`backend.versions`) and the normalised query string, so admin
+writes never have to delete anything: a bumped counter simply makes the
+old keys unreachable and they age out.
+
+The backend is selected by ``RESPONSE_CACHE``:
+
+* ``memory`` (default): a per-process LRU bounded by ``RESPONSE_CACHE_MAX_BYTES``;
+* ``file``: one file per entry under ``RESPONSE_CACHE_DIR``, shared by all
+  workers on the host, pruned oldest-first past the same byte limit;
+* ``off`` disables caching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from flask import Flask, Response, current_app, request
+
+from backend.db import get_db
+from backend.versions import generation
+
+# Cached value: (status, mimetype, body)
+Entry = tuple[int, str, bytes]
+
+
+class MemoryCache:
+    """Thread-safe LRU bounded by the total size of the cached bodies."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Entry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Entry) -> None:
+        size = len(entry[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[2])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def info(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size}
+
+
+class FileCache:
+    """Entries stored as files so every process on the host shares them.
+
+    Writes go through a temporary file and ``os.replace``, so readers never
+    see partial entries. Reads refresh the file's mtime, which makes the
+    oldest-mtime-first pruning an approximate LRU.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int, prune_every: int = 100) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Entry | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        header, _, body = data.partition(b"\n")
+        status, mimetype = header.decode("ascii").split(" ", 1)
+        return int(status), mimetype, body
+
+    def set(self, key: str, entry: Entry) -> None:
+        status, mimetype, body = entry
+        if len(body) > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(f"{status} {mimetype}\n".encode("ascii"))
+            handle.write(body)
+        os.replace(tmp, self._path(key))
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def _files(self) -> list[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.startswith(".")]
+
+    def prune(self) -> None:
+        files = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for entry in self._files():
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def info(self) -> dict[str, int]:
+        files = self._files()
+        return {"entries": len(files), "bytes": sum(entry.stat().st_size for entry in files)}
+
+
+class ResponseCache:
+    def __init__(self, backend: MemoryCache | FileCache | None) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Entry | None:
+        entry = self.backend.get(key) if self.backend is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: Entry) -> None:
+        if self.backend is not None:
+            self.backend.set(key, entry)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = {"hits": self.hits, "misses": self.misses}
+        stats["backend"] = type(self.backend).__name__ if self.backend is not None else None
+        stats.update(self.backend.info() if self.backend is not None else {"entries": 0, "bytes": 0})
+        return stats
+
+
+def init_app(app: Flask) -> None:
+    kind = app.config.get("RESPONSE_CACHE", "memory")
+    max_bytes = int(app.config.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    if kind == "memory":
+        backend: MemoryCache | FileCache | None = MemoryCache(max_bytes)
+    elif kind == "file":
+        directory = app.config.get("RESPONSE_CACHE_DIR") or Path(tempfile.gettempdir()) / "topscoot-cache"
+        backend = FileCache(directory, max_bytes)
+    else:
+        backend = None
+    app.extensions["response_cache"] = ResponseCache(backend)
+
+
+def get_cache() -> ResponseCache:
+    return current_app.extensions["response_cache"]
+
+
+def normalized_query(params: Sequence[str]) -> str:
+    """The listed query parameters, without empties, in a fixed order.
+
+    Values are kept verbatim: the views use them as given, so two spellings
+    may well produce different responses.
+    """
+
+    parts = []
+    for name in params:
+        value = request.args.get(name)
+        if value:
+            parts.append(f"{name}={value}")
+    return "&".join(parts)
+
+
+def cached_response(name: str, scopes: Sequence[str], params: Sequence[str]) -> Callable:
+    """Cache successful responses of a view per data generation and query.
+
+    ``scopes`` are the ``data_versions`` the response is derived from,
+    ``params`` the query parameters it depends on.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_cache()
+            if cache.backend is None:
+                return view(*args, **kwargs)
+            # the day is part of the key because ages are computed from it
+            key = f"{name}:{date.today().isoformat()}:{generation(get_db(), scopes)}:{normalized_query(params)}"
+            entry = cache.get(key)
+            if entry is not None:
+                status, mimetype, body = entry
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return response
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                cache.set(key, (response.status_code, response.mimetype, response.get_data()))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,84 @@
+"""Rider profile cards: the result list of a profile, serialised once.
+
+``rider_cards`` holds the ``seasonResults`` JSON of ``GET /api/riders/<id>``.
+Triggers (migration 013) delete a card whenever one of the rider's
+results or events changes; the next profile view rebuilds it, so a warm
+profile is a single primary-key read.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable
+
+from backend.db import no_busy_wait
+from backend.serialization import Shape
+
+# Results shown on a profile, newest first.
+CARD_RESULTS_LIMIT = 50
+
+
+SEASON_RESULT = Shape(
+    eventId="event_id",
+    eventName="name",
+    eventCity="city",
+    eventLevel="level",
+    eventDate="date_start",
+    place="place",
+    isFinalist=("is_finalist", bool),
+    isParticipant=("is_participant", bool),
+    points="points",
+)
+
+
+def season_results(conn: sqlite3.Connection, rider_id: int, filter_sql: str = "", params: tuple = ()) -> list[Any]:
+    """The rider's latest results; ``filter_sql`` may narrow them further."""
+
+    return conn.execute(
+        f"""
+        SELECT e.id AS event_id, e.name, e.city, e.level, e.date_start,
+               res.place, res.is_finalist, res.is_participant, res.points
+        FROM results AS res
+        JOIN events AS e ON e.id = res.event_id
+        WHERE res.rider_id = ? {filter_sql}
+        ORDER BY e.date_start DESC, e.id DESC
+        LIMIT {CARD_RESULTS_LIMIT}
+        """,
+        (rider_id, *params),
+    ).fetchall()
+
+
+def build_card(conn: sqlite3.Connection, rider_id: int, dumps: Callable[[Any], str]) -> str:
+    """Serialise the rider's results and store them, returning the JSON.
+
+    The results are read inside the write transaction, so a concurrent
+    change either happens first or deletes the new card afterwards. The
+    write does not wait for a busy database: a locked or read-only one
+    still gets the JSON at once, just not the stored card.
+    """
+
+    conn.commit()
+    with no_busy_wait(conn):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            results_json = None
+        else:
+            results_json = dumps(SEASON_RESULT.many(season_results(conn, rider_id)))
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO rider_cards (rider_id, results_json, built_at)
+                    VALUES (?, ?, datetime('now'))
+                    ON CONFLICT (rider_id) DO UPDATE SET
+                        results_json = excluded.results_json,
+                        built_at = excluded.built_at
+                    """,
+                    (rider_id, results_json),
+                )
+                conn.commit()
+            except sqlite3.OperationalError:
+                conn.rollback()
+    if results_json is None:
+        return dumps(SEASON_RESULT.many(season_results(conn, rider_id)))
+    return results_json
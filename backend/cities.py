@@ -0,0 +1,95 @@
+"""City dictionary: canonical names, aliases and filter resolution.
+
+``riders.city`` and ``events.city`` keep the text as entered; the
+``city_id`` next to it is resolved through ``city_aliases`` by triggers
+(migration 011). Filters resolve the requested city against the small
+alias table once and then match ``city_id`` with an index lookup.
+"""
+
+from __future__ import annotations
+
+import string
+from typing import Any
+
+from backend.dialect import adapt, is_sqlite, placeholders
+
+# SQLite's lower() and trim() only fold ASCII letters and strip spaces;
+# city_key mirrors them so keys written by triggers and by Python agree.
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def city_key(name: str) -> str:
+    return name.strip(" ").translate(_ASCII_LOWER)
+
+
+def ensure_city(conn: Any, name: str | None) -> int | None:
+    """Return the id of the city spelled ``name``, adding it if unknown.
+
+    The SQLite triggers do this on their own; MariaDB triggers cannot, so
+    writers call this before storing a city.
+    """
+
+    if not name or not name.strip(" "):
+        return None
+    key = city_key(name)
+    cursor = conn.cursor()
+    cursor.execute(adapt(conn, "SELECT city_id FROM city_aliases WHERE alias_key = ?"), (key,))
+    row = cursor.fetchone()
+    if row is None:
+        ignore = "INSERT OR IGNORE" if is_sqlite(conn) else "INSERT IGNORE"
+        cursor.execute(adapt(conn, f"{ignore} INTO cities (name) VALUES (?)"), (name.strip(" "),))
+        cursor.execute(adapt(conn, "SELECT id FROM cities WHERE name = ?"), (name.strip(" "),))
+        row = cursor.fetchone()
+        cursor.execute(adapt(conn, f"{ignore} INTO city_aliases (alias_key, city_id) VALUES (?, ?)"), (key, row[0]))
+    cursor.close()
+    return row[0]
+
+
+def matching_city_ids(conn: Any, text: str) -> list[int]:
+    """Ids of the cities with a spelling containing ``text``."""
+
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(conn, "SELECT DISTINCT city_id FROM city_aliases WHERE alias_key LIKE ?"),
+        (f"%{city_key(text)}%",),
+    )
+    ids = sorted(row[0] for row in cursor.fetchall())
+    cursor.close()
+    return ids
+
+
+def city_filter(conn: Any, text: str, column: str) -> tuple[str, list[Any]]:
+    """Return a ``WHERE`` condition on ``column`` for cities matching ``text``.
+
+    Like the old ``city LIKE '%text%'`` filter any spelling containing the
+    text matches, but the match runs against the alias table only.
+    """
+
+    ids = matching_city_ids(conn, text)
+    if not ids:
+        return "1 = 0", []
+    return f"{column} IN ({placeholders(len(ids))})", ids
+
+
+def add_alias(conn: Any, city_id: int, alias: str) -> int | None:
+    """Map ``alias`` to ``city_id``; return the id of a city merged into it.
+
+    When the alias already names another city, that city's riders, events
+    and aliases move over and it is deleted (the counters follow through
+    the ``city_id`` triggers).
+    """
+
+    key = city_key(alias)
+    cursor = conn.cursor()
+    cursor.execute(adapt(conn, "SELECT city_id FROM city_aliases WHERE alias_key = ?"), (key,))
+    row = cursor.fetchone()
+    merged = row[0] if row is not None and row[0] != city_id else None
+    if merged is not None:
+        for table in ("riders", "events"):
+            cursor.execute(adapt(conn, f"UPDATE {table} SET city_id = ? WHERE city_id = ?"), (city_id, merged))
+        cursor.execute(adapt(conn, "UPDATE city_aliases SET city_id = ? WHERE city_id = ?"), (city_id, merged))
+        cursor.execute(adapt(conn, "DELETE FROM cities WHERE id = ?"), (merged,))
+    elif row is None:
+        cursor.execute(adapt(conn, "INSERT INTO city_aliases (alias_key, city_id) VALUES (?, ?)"), (key, city_id))
+    cursor.close()
+    return merged
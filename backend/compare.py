@@ -0,0 +1,94 @@
+"""Head-to-head comparison of riders over the events they both rode.
+
+Shared events of every pair of the compared riders come from one
+self-join of ``results``: each rider's results through
+``idx_results_rider_id``, then each other compared rider at the same
+event with a lookup in the covering ``UNIQUE (event_id, rider_id)``
+index. A pair's summary depends on nothing else, so ``GET /api/compare``
+caches it per pair and data generation and a comparison of three riders
+reuses the pairs of earlier ones.
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+from typing import Any, Sequence
+
+from backend.dialect import adapt, placeholders
+
+# The data a pair summary is derived from (see backend/versions.py).
+SCOPES = ("results", "events")
+
+
+def rider_pairs(rider_ids: Sequence[int]) -> list[tuple[int, int]]:
+    """Every pair of ``rider_ids``, lower id first."""
+
+    return list(combinations(sorted(rider_ids), 2))
+
+
+def shared_results(conn: Any, pairs: Sequence[tuple[int, int]]) -> dict[tuple[int, int], list[Any]]:
+    """Both riders' results in every event shared by a pair, newest first."""
+
+    wanted = set(pairs)
+    rider_ids = sorted({rider_id for pair in pairs for rider_id in pair})
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(
+            conn,
+            f"""
+            SELECT a.rider_id AS rider_a, b.rider_id AS rider_b,
+                   e.id AS event_id, e.name, e.date_start, e.level,
+                   a.place AS place_a, a.points AS points_a, b.place AS place_b, b.points AS points_b
+            FROM results AS a
+            JOIN results AS b ON b.event_id = a.event_id AND b.rider_id > a.rider_id
+            JOIN events AS e ON e.id = a.event_id
+            WHERE a.rider_id IN ({placeholders(len(rider_ids))}) AND b.rider_id IN ({placeholders(len(rider_ids))})
+            ORDER BY e.date_start DESC, e.id DESC
+            """,
+        ),
+        (*rider_ids, *rider_ids),
+    )
+    shared: dict[tuple[int, int], list[Any]] = {pair: [] for pair in pairs}
+    for row in cursor.fetchall():
+        pair = (row[0], row[1])
+        if pair in wanted:
+            shared[pair].append(row)
+    cursor.close()
+    return shared
+
+
+def _standing(place: int | None, points: int | None) -> tuple:
+    # a better place wins, a placed rider beats an unplaced one, then points
+    return (place is None, place or 0, -(points or 0))
+
+
+def pair_summary(pair: tuple[int, int], rows: Sequence[Any]) -> dict[str, Any]:
+    """Per-event places and points of a pair plus their win/loss record."""
+
+    wins = [0, 0]
+    ties = 0
+    events = []
+    for row in rows:
+        (_, _, event_id, name, date_start, level, place_a, points_a, place_b, points_b) = tuple(row)
+        first, second = _standing(place_a, points_a), _standing(place_b, points_b)
+        winner = None
+        if first < second:
+            wins[0] += 1
+            winner = pair[0]
+        elif second < first:
+            wins[1] += 1
+            winner = pair[1]
+        else:
+            ties += 1
+        events.append(
+            {
+                "eventId": event_id,
+                "eventName": name,
+                "eventDate": date_start,
+                "eventLevel": level,
+                "places": [place_a, place_b],
+                "points": [points_a, points_b],
+                "winner": winner,
+            }
+        )
+    return {"riderIds": list(pair), "shared": len(events), "wins": wins, "ties": ties, "events": events}
@@ -0,0 +1,66 @@
+"""Conditional GET for the public API: ETag, Last-Modified and 304s.
+
+Validators come from ``data_versions`` (see :mod:`backend.versions`), not
+from the payload: the ETag hashes the endpoint, the data generation of
+the scopes it reads, the day (ages are computed from it), the view
+arguments and the normalised query, and Last-Modified is the latest bump
+of those scopes. A revalidation is therefore answered with a 304 before
+the view, and any query it would run, is called.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, datetime, time, timezone
+from functools import wraps
+from typing import Any, Callable, Sequence
+
+from flask import current_app, request
+
+from backend.cache import normalized_query
+from backend.db import get_db
+from backend.versions import generation, last_updated
+
+
+def conditional(name: str, scopes: Sequence[str], params: Sequence[str] = (), max_age: int = 60) -> Callable:
+    """Add validators and ``Cache-Control`` to a view and answer 304s for it.
+
+    ``scopes`` and ``params`` are what the response depends on, as for
+    :func:`backend.cache.cached_response`; ``max_age`` is how long clients
+    and proxies may reuse it without revalidating.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            db = get_db()
+            today = date.today()
+            view_args = ",".join(f"{key}={value}" for key, value in sorted(kwargs.items()))
+            key = f"{name}:{today.isoformat()}:{generation(db, scopes)}:{view_args}:{normalized_query(params)}"
+            etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+            # the day's start counts as a change too, for the same reason it is in the ETag
+            midnight = datetime.combine(today, time.min).astimezone(timezone.utc)
+            modified = max(last_updated(db, scopes) or midnight, midnight).replace(microsecond=0)
+
+            if request.if_none_match:
+                # weak comparison: gzipped bodies carry a weak ETag
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and modified <= since
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # one tag for every encoding of the body, so only weakly equal
+            response.set_etag(etag, weak=bool(response.content_encoding))
+            response.last_modified = modified
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            return response
+
+        return wrapper
+
+    return decorator
@@ -55,6 +55,20 @@ class Config:
     DATABASE_READONLY = os.environ.get("TOPSCOOT_DATABASE_READONLY", "0") in {"1", "true", "True"}
     CORS_ORIGINS = os.environ.get("TOPSCOOT_CORS_ORIGINS", DEFAULT_CORS)
     JSON_SORT_KEYS = False
+
+    # How queued season recalculations run: thread, inline or external
+    # (see backend/season_queue.py)
+    SEASON_QUEUE_MODE = os.environ.get("TOPSCOOT_SEASON_QUEUE", "thread")
+    SEASON_QUEUE_DEBOUNCE = float(os.environ.get("TOPSCOOT_SEASON_QUEUE_DEBOUNCE", "0.5"))
+
+    # Public response cache: memory, file or off (see backend/cache.py)
+    RESPONSE_CACHE = os.environ.get("TOPSCOOT_RESPONSE_CACHE", "memory")
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("TOPSCOOT_RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    RESPONSE_CACHE_DIR = os.environ.get("TOPSCOOT_RESPONSE_CACHE_DIR")
+
+    # Rating served from a per-worker in-memory leaderboard: memory or off
+    # (see backend/leaderboard.py)
+    LEADERBOARD = os.environ.get("TOPSCOOT_LEADERBOARD", "memory")
     
     # MariaDB Configuration
     DB_HOST = os.environ.get("DB_HOST", "scootrate-mariadb-wmclth")
@@ -0,0 +1,152 @@
+"""Totals for paginated lists without a second pass over the filters.
+
+Totals are cached per process, keyed on the list, its filter SQL and
+parameters and the data generation of the tables it reads (see
+:mod:`backend.versions`), so a total is computed once per data change.
+On a miss the page query also returns ``COUNT(*) OVER ()`` where the
+backend has window functions, and a separate ``COUNT(*)`` is only needed
+when the page comes back empty.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Sequence
+
+from backend.dialect import is_sqlite, supports_window_functions
+from backend.versions import generation
+
+# Column alias carrying the window count in single-pass page queries.
+FULL_COUNT = "full_count"
+
+# Free-text totals are estimated from about this many rows of the base table,
+# read as this many rowid ranges.
+ESTIMATE_SAMPLE = 10_000
+ESTIMATE_RANGES = 100
+
+_MAX_TOTALS = 2048
+_TOTALS: OrderedDict[tuple, int] = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def _cached(key: tuple) -> int | None:
+    with _LOCK:
+        total = _TOTALS.get(key)
+        if total is not None:
+            _TOTALS.move_to_end(key)
+        return total
+
+
+def _store(key: tuple, total: int) -> None:
+    with _LOCK:
+        _TOTALS[key] = total
+        _TOTALS.move_to_end(key)
+        while len(_TOTALS) > _MAX_TOTALS:
+            _TOTALS.popitem(last=False)
+
+
+def _key(db: Any, name: str, scopes: Sequence[str], where_sql: str, params: Sequence[Any]) -> tuple:
+    return (name, generation(db, scopes), where_sql, tuple(params))
+
+
+def cached_count(
+    db: Any,
+    name: str,
+    scopes: Sequence[str],
+    where_sql: str,
+    params: Sequence[Any],
+    count: Callable[[], int],
+) -> int:
+    """Return the cached total for this filter, running ``count`` on a miss."""
+
+    key = _key(db, name, scopes, where_sql, params)
+    total = _cached(key)
+    if total is None:
+        total = count()
+        _store(key, total)
+    return total
+
+
+def fetch_page(
+    db: Any,
+    name: str,
+    scopes: Sequence[str],
+    where_sql: str,
+    params: Sequence[Any],
+    run_page: Callable[[bool], list[Any]],
+    count: Callable[[], int],
+    single_pass: bool = True,
+) -> tuple[list[Any], int]:
+    """Return ``(rows, total)`` for one page of a filtered list.
+
+    ``run_page(with_count)`` executes the page query, adding
+    ``COUNT(*) OVER () AS full_count`` to its select list when asked to.
+    Pass ``single_pass=False`` when the page query has extra predicates
+    (a keyset cursor), since its window count would then be too small.
+    """
+
+    key = _key(db, name, scopes, where_sql, params)
+    total = _cached(key)
+    if total is not None:
+        return run_page(False), total
+
+    with_count = single_pass and supports_window_functions(db)
+    rows = run_page(with_count)
+    if with_count and rows:
+        total = int(rows[0][FULL_COUNT])
+    else:
+        total = count()
+    _store(key, total)
+    return rows, total
+
+
+def estimate_total(
+    db: Any,
+    name: str,
+    scopes: Sequence[str],
+    table: str,
+    alias: str,
+    where_sql: str,
+    params: Sequence[Any],
+    count: Callable[[], int],
+) -> tuple[int, bool]:
+    """Extrapolate the matches in a random sample of ``table``.
+
+    Returns ``(total, estimated)``. The sample is ``ESTIMATE_RANGES`` runs
+    of consecutive rowids at random positions, read as primary-key range
+    searches, so only about ``ESTIMATE_SAMPLE`` rows are visited however
+    large the table is. Where ids and the filtered text correlate the
+    estimate is noisier, not biased. ``where_sql`` may refer to the table
+    as ``alias``; it should be a scan (a substring match), since a filter
+    answered from an index costs the same in the sample as in a count.
+
+    Only SQLite has rowids to sample. Elsewhere, and for small tables, the
+    total is the exact :func:`cached_count` under ``name`` and ``scopes``.
+    """
+
+    if not is_sqlite(db):
+        return cached_count(db, name, scopes, where_sql, params, count), False
+    size = cached_count(
+        db, table, (table,), "", (), lambda: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    )
+    if size <= ESTIMATE_SAMPLE:
+        return cached_count(db, name, scopes, where_sql, params, count), False
+    # separate subqueries, so each is a single primary-key probe
+    low, high = db.execute(f"SELECT (SELECT MIN(rowid) FROM {table}), (SELECT MAX(rowid) FROM {table})").fetchone()
+    width = ESTIMATE_SAMPLE // ESTIMATE_RANGES
+    slots = (high - low) // width + 1
+    starts = sorted(low + slot * width for slot in random.sample(range(slots), min(ESTIMATE_RANGES, slots)))
+    bounds = [bound for start in starts for bound in (start, start + width - 1)]
+    # joined against a list of ranges: a long OR of BETWEENs is planned as a full scan
+    sample = (
+        f"(VALUES {', '.join(['(?, ?)'] * len(starts))}) AS ranges CROSS JOIN {table} AS {alias}"
+        f" ON {alias}.rowid BETWEEN ranges.column1 AND ranges.column2"
+    )
+    sampled = db.execute(f"SELECT COUNT(*) FROM {sample}", bounds).fetchone()[0]
+    matched = db.execute(f"SELECT COUNT(*) FROM {sample} {where_sql}", (*bounds, *params)).fetchone()[0]
+    if not sampled:
+        # ids too sparse for the ranges to hit anything
+        return cached_count(db, name, scopes, where_sql, params, count), False
+    return round(matched * size / sampled), True
@@ -0,0 +1,30 @@
+"""Day numbers: dates as integer days since 1970-01-01.
+
+``riders.birth_day`` and ``events.start_day`` hold the day number of the
+matching date column (migration 012), so date filters become integer
+range predicates that can use an index.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def from_day_number(days: int) -> date:
+    return EPOCH + timedelta(days=days)
+
+
+def parse_date(value: str | None) -> date | None:
+    """Parse an optional ``YYYY-MM-DD`` value (a time part is ignored).
+
+    Raises ``ValueError`` for malformed dates.
+    """
+    if not value:
+        return None
+    return date.fromisoformat(value[:10])
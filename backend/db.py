@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from flask import Flask, current_app, g
 
@@ -41,3 +42,19 @@ def close_db(_: Any) -> None:
     db = g.pop("db", None)
     if db is not None:
         db.close()
+
+
+@contextmanager
+def no_busy_wait(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Fail with "database is locked" at once instead of waiting for the lock.
+
+    For optional writes on read requests, which must not stall behind the
+    season worker or an admin transaction for the whole busy timeout.
+    """
+
+    timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        yield conn
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(timeout)}")
@@ -0,0 +1,51 @@
+"""Helpers for SQL shared between the SQLite and MariaDB backends."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Sequence
+
+# Upper bound for ids passed in a single ``IN (...)`` list.
+BATCH_SIZE = 500
+
+
+def is_sqlite(conn: Any) -> bool:
+    return isinstance(conn, sqlite3.Connection)
+
+
+def adapt(conn: Any, sql: str) -> str:
+    """Rewrite ``?`` placeholders into the paramstyle expected by ``conn``.
+
+    Shared statements are written with ``?`` (the SQLite style used by the
+    routes); mysql.connector expects ``%s`` instead.
+    """
+
+    if is_sqlite(conn):
+        return sql
+    return sql.replace("?", "%s")
+
+
+def placeholders(count: int) -> str:
+    return ", ".join("?" for _ in range(count))
+
+
+def upsert_clause(conn: Any, key: str, columns: Sequence[str]) -> str:
+    """Return the "insert or update" tail for an ``INSERT`` on ``key``.
+
+    SQLite uses ``ON CONFLICT ... DO UPDATE`` while MariaDB only understands
+    ``ON DUPLICATE KEY UPDATE``; both overwrite ``columns`` with the new row.
+    """
+
+    if is_sqlite(conn):
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in columns)
+        return f"ON CONFLICT ({key}) DO UPDATE SET {assignments}"
+    assignments = ", ".join(f"{column} = VALUES({column})" for column in columns)
+    return f"ON DUPLICATE KEY UPDATE {assignments}"
+
+
+def supports_window_functions(conn: Any) -> bool:
+    """SQLite gained window functions in 3.25; every supported MariaDB has them."""
+
+    if is_sqlite(conn):
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return True
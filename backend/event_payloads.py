@@ -0,0 +1,129 @@
+"""Pre-rendered event pages: the ``GET /api/events/<id>`` body, gzipped.
+
+Results of a published event rarely change, but every view used to
+rejoin ``results`` with ``riders`` and sort by place. ``event_payloads``
+keeps the finished response body per published event, compressed, so a
+view is one primary-key read; drafts are rendered on every view. The
+admin routes rebuild a payload right after an event is published or
+edited or its results change; triggers (migration 015) drop it on any
+other write and the next view rebuilds it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import sqlite3
+from contextlib import nullcontext
+from typing import Any
+
+from flask import Response, current_app, request
+
+from backend.db import no_busy_wait
+from backend.serialization import Shape
+
+EVENT_SUMMARY = Shape(
+    id="id",
+    name="name",
+    dateStart="date_start",
+    dateEnd="date_end",
+    city="city",
+    level="level",
+    participants="participants_count",
+    style="style",
+)
+EVENT_DETAIL = Shape(
+    **EVENT_SUMMARY.fields,
+    hasBestTrick=("has_best_trick", bool),
+    sourceUrl="source_url",
+    organizerContact="organizer_contact",
+    status="status",
+)
+EVENT_RESULT = Shape(
+    riderId="rider_id",
+    nickname="nickname",
+    city="city",
+    riderLevel="level",
+    place="place",
+    isFinalist=("is_finalist", bool),
+    isParticipant=("is_participant", bool),
+    points="points",
+)
+
+
+def event_payload(conn: sqlite3.Connection, event_id: int) -> dict[str, Any] | None:
+    """The event and its results as served by the API, ``None`` if unknown."""
+
+    event = conn.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+    if event is None:
+        return None
+    results = conn.execute(
+        """
+        SELECT r.id AS rider_id, r.nickname, r.city, r.level,
+               res.place, res.is_finalist, res.is_participant, res.points
+        FROM results AS res
+        JOIN riders AS r ON r.id = res.rider_id
+        WHERE res.event_id = ?
+        ORDER BY res.place IS NULL, res.place ASC
+        """,
+        (event_id,),
+    ).fetchall()
+    return {"event": EVENT_DETAIL(event), "results": EVENT_RESULT.many(results)}
+
+
+def build_payload(conn: sqlite3.Connection, event_id: int, wait: bool = True) -> bytes | None:
+    """Render the event's gzipped response body, storing it if the event is published.
+
+    As with :func:`backend.cards.build_card` the rows are read inside the
+    write transaction, and a busy or read-only database still gets the
+    body, just not the stored copy. Views pass ``wait=False`` so a locked
+    database skips the store at once instead of after the busy timeout;
+    admin writes wait for it. ``None`` for unknown events.
+    """
+
+    conn.commit()
+    with nullcontext() if wait else no_busy_wait(conn):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            rendered = None
+        else:
+            rendered = status, body = _render(conn, event_id)
+            try:
+                if status == "published":
+                    conn.execute(
+                        """
+                        INSERT INTO event_payloads (event_id, body, built_at)
+                        VALUES (?, ?, datetime('now'))
+                        ON CONFLICT (event_id) DO UPDATE SET
+                            body = excluded.body,
+                            built_at = excluded.built_at
+                        """,
+                        (event_id, body),
+                    )
+                conn.commit()
+            except sqlite3.OperationalError:
+                conn.rollback()
+    if rendered is None:
+        rendered = _render(conn, event_id)
+    return rendered[1]
+
+
+def _render(conn: sqlite3.Connection, event_id: int) -> tuple[str | None, bytes | None]:
+    payload = event_payload(conn, event_id)
+    if payload is None:
+        return None, None
+    # compact like the rider cards, whatever the app's debug indent
+    body = current_app.json.dumps(payload, separators=(",", ":"))
+    return payload["event"]["status"], gzip.compress(f"{body}\n".encode("utf-8"), mtime=0)
+
+
+def payload_response(body: bytes) -> Response:
+    """Serve a gzipped body as is, or inflated for clients without gzip."""
+
+    if request.accept_encodings["gzip"]:
+        response = current_app.response_class(body, mimetype="application/json")
+        response.content_encoding = "gzip"
+    else:
+        response = current_app.response_class(gzip.decompress(body), mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,230 @@
+"""In-memory leaderboard for ``/api/rating``.
+
+Each worker keeps the current rating as compact columns in rating order
+(season points descending, id ascending): ``array`` columns for ids,
+points, ranks, birth day numbers and interned city/style/level codes.
+Filters are answered with bitsets over rating positions (one Python
+``int`` per city, style and level value), so combining them, counting
+the matches and cutting a page never touch the database. Only the rows
+of the page are then read by primary key.
+
+A leaderboard is tagged with the ``riders``/``season`` data generation
+(see :mod:`backend.versions`) and replaced as a whole once it changes.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Sequence
+
+from backend.dialect import adapt, placeholders
+from backend.versions import generation
+
+SCOPES = ("riders", "season")
+
+# set bits per byte value, for walking a bitset a byte at a time
+_POPCOUNT = bytes(bin(value).count("1") for value in range(256))
+
+# birth day ranges are cut from this many prefix bitsets
+_BIRTH_CHECKPOINTS = 64
+
+_LOCK = threading.Lock()
+_BOARDS: dict[str, "Leaderboard"] = {}
+_BUILD_LOCKS: dict[str, threading.Lock] = {}
+
+
+def _bitset(positions: Iterable[int], size: int) -> int:
+    """Return an ``int`` with bit ``p`` set for every position ``p``."""
+
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _select_bits(mask: int, size: int, skip: int, take: int) -> list[int]:
+    """Positions of set bits in ``mask``, skipping the first ``skip``."""
+
+    selected: list[int] = []
+    for index, byte in enumerate(mask.to_bytes((size + 7) // 8, "little")):
+        if not byte:
+            continue
+        count = _POPCOUNT[byte]
+        if skip >= count:
+            skip -= count
+            continue
+        for bit in range(8):
+            if byte & (1 << bit):
+                if skip:
+                    skip -= 1
+                    continue
+                selected.append(index * 8 + bit)
+                if len(selected) == take:
+                    return selected
+    return selected
+
+
+class Leaderboard:
+    def __init__(self, version: str, rows: Sequence[Sequence[Any]]) -> None:
+        """Build from ``(id, points, rank, birth_day, city_id, style, level)`` in rating order."""
+
+        self.generation = version
+        self.size = len(rows)
+        self.ids = array("q", (row[0] for row in rows))
+        self.points = array("q", (row[1] for row in rows))
+        # 0 stands for NULL in the rank, birth day and city columns
+        self.ranks = array("q", (row[2] or 0 for row in rows))
+        self.city_ids = array("q", (row[4] or 0 for row in rows))
+        self.style_names = sorted({row[5] for row in rows})
+        self.level_names = sorted({row[6] for row in rows})
+        style_codes = {name: code for code, name in enumerate(self.style_names)}
+        level_codes = {name: code for code, name in enumerate(self.level_names)}
+        self.styles = array("B", (style_codes[row[5]] for row in rows))
+        self.levels = array("B", (level_codes[row[6]] for row in rows))
+
+        self.all = (1 << self.size) - 1
+        self._city_masks = self._masks(self.city_ids)
+        self._style_masks = {self.style_names[code]: mask for code, mask in self._masks(self.styles).items()}
+        self._level_masks = {self.level_names[code]: mask for code, mask in self._masks(self.levels).items()}
+
+        # positions ordered by birth day, for age ranges (unknown birth days
+        # left out); _birth_prefix[k] has the first k * _birth_step of them set
+        dated = sorted((row[3], position) for position, row in enumerate(rows) if row[3] is not None)
+        self.birth_days = array("q", (day for day, _ in dated))
+        self._birth_positions = array("q", (position for _, position in dated))
+        self._birth_step = max(-(-len(dated) // _BIRTH_CHECKPOINTS), 1)
+        self._birth_prefix = [0]
+        for start in range(0, len(dated), self._birth_step):
+            chunk = self._birth_positions[start:start + self._birth_step]
+            self._birth_prefix.append(self._birth_prefix[-1] | _bitset(chunk, self.size))
+        self._positions = {rider_id: position for position, rider_id in enumerate(self.ids)}
+
+    def _masks(self, codes: Sequence[int]) -> dict[int, int]:
+        positions: dict[int, list[int]] = {}
+        for position, code in enumerate(codes):
+            positions.setdefault(code, []).append(position)
+        return {code: _bitset(members, self.size) for code, members in positions.items()}
+
+    def _birth_mask(self, end: int) -> int:
+        """Bitset of the first ``end`` positions in birth day order."""
+
+        checkpoint = end // self._birth_step
+        rest = self._birth_positions[checkpoint * self._birth_step:end]
+        return self._birth_prefix[checkpoint] | _bitset(rest, self.size)
+
+    def position_after(self, season_points: int, rider_id: int) -> int:
+        """Number of rows sorting at or before the key ``(season_points, rider_id)``."""
+
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if (-self.points[middle], self.ids[middle]) <= (-season_points, rider_id):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def mask(
+        self,
+        city_ids: Sequence[int] | None = None,
+        level: str | None = None,
+        style: str | None = None,
+        rider_ids: Iterable[int] | None = None,
+        min_birth_day: int | None = None,
+        max_birth_day: int | None = None,
+    ) -> int:
+        """Bitset of the positions matching every given filter."""
+
+        mask = self.all
+        if city_ids is not None:
+            cities = 0
+            for city_id in city_ids:
+                cities |= self._city_masks.get(city_id, 0)
+            mask &= cities
+        if level:
+            mask &= self._level_masks.get(level, 0)
+        if style:
+            mask &= self._style_masks.get(style, 0)
+        if rider_ids is not None:
+            positions = self._positions
+            mask &= _bitset((positions[rider_id] for rider_id in rider_ids if rider_id in positions), self.size)
+        if min_birth_day is not None or max_birth_day is not None:
+            start = 0 if min_birth_day is None else bisect_left(self.birth_days, min_birth_day)
+            end = len(self.birth_days) if max_birth_day is None else bisect_right(self.birth_days, max_birth_day)
+            mask &= self._birth_mask(end) ^ self._birth_mask(start)
+        return mask
+
+    def page(self, mask: int, start: int, offset: int, limit: int) -> list[int]:
+        """Up to ``limit`` matching positions from ``start``, skipping ``offset`` matches."""
+
+        if mask == self.all:
+            first = start + offset
+            return list(range(first, min(first + limit, self.size)))
+        if start:
+            mask &= ~((1 << start) - 1)
+        return _select_bits(mask, self.size, offset, limit)
+
+
+def _load(db: Any, version: str) -> Leaderboard:
+    cursor = db.cursor()
+    cursor.execute(
+        """
+        SELECT r.id, COALESCE(sp.season_points, 0) AS points, rk.rank_global,
+               r.birth_day, r.city_id, r.style, r.level
+        FROM riders AS r
+        LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+        LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id
+        """
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    # sorting here is much cheaper than an ORDER BY on the joined expression
+    rows.sort(key=lambda row: (-row[1], row[0]))
+    return Leaderboard(version, rows)
+
+
+def get_leaderboard(db: Any, cache_key: str) -> Leaderboard:
+    """Return the leaderboard of ``db``, rebuilding it after a data change.
+
+    The generation is read before the rows, so a write racing the load
+    can only make the next request rebuild again, never serve stale data.
+    """
+
+    version = generation(db, SCOPES)
+    with _LOCK:
+        board = _BOARDS.get(cache_key)
+        if board is not None and board.generation == version:
+            return board
+        build_lock = _BUILD_LOCKS.setdefault(cache_key, threading.Lock())
+    # one rebuild at a time per database; the others wait and reuse it
+    with build_lock:
+        with _LOCK:
+            board = _BOARDS.get(cache_key)
+        if board is None or board.generation != version:
+            board = _load(db, version)
+            with _LOCK:
+                _BOARDS[cache_key] = board
+    return board
+
+
+def fetch_riders(db: Any, rider_ids: Sequence[int]) -> dict[int, Any]:
+    """The display columns of ``rider_ids``, keyed on id."""
+
+    if not rider_ids:
+        return {}
+    cursor = db.cursor()
+    cursor.execute(
+        adapt(
+            db,
+            f"""
+            SELECT id, nickname, fullname, city, birthdate, style, level
+            FROM riders WHERE id IN ({placeholders(len(rider_ids))})
+            """,
+        ),
+        tuple(rider_ids),
+    )
+    rows = {row[0]: row for row in cursor.fetchall()}
+    cursor.close()
+    return rows
@@ -47,7 +47,8 @@ def run_migrations(db_path: Path) -> None:
         already_applied = applied_migrations(conn)
 
         for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
-            if path.name in already_applied:
+            # *_mariadb.sql files are the MariaDB variants (see migrate_mariadb.py)
+            if path.name.endswith("_mariadb.sql") or path.name in already_applied:
                 continue
             apply_migration(conn, path)
             print(f"Applied migration {path.name}")
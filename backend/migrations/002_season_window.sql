@@ -0,0 +1,22 @@
+-- Migration 002: rolling-window bookkeeping for incremental season expiry
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Uncapped sum and number of results behind each cached season total, so
+-- contributions leaving the window can be subtracted instead of re-summed
+ALTER TABLE season_points ADD COLUMN raw_points INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE season_points ADD COLUMN results_count INTEGER NOT NULL DEFAULT 0;
+
+-- Single-row state of the rolling window. Results of an event dated D leave
+-- the window on D + window_days + 1, so next_expiry is derived from the
+-- earliest counted event through idx_events_date_start.
+CREATE TABLE IF NOT EXISTS season_state (
+    id            INTEGER PRIMARY KEY CHECK (id = 1),
+    window_days   INTEGER NOT NULL,
+    window_start  TEXT NOT NULL,
+    next_expiry   TEXT,
+    updated_at    TEXT
+);
+
+COMMIT;
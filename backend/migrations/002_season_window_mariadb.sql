@@ -0,0 +1,16 @@
+-- Migration 002: rolling-window bookkeeping for incremental season expiry (MariaDB version)
+
+START TRANSACTION;
+
+ALTER TABLE season_points ADD COLUMN raw_points INT NOT NULL DEFAULT 0;
+ALTER TABLE season_points ADD COLUMN results_count INT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS season_state (
+    id            INT PRIMARY KEY CHECK (id = 1),
+    window_days   INT NOT NULL,
+    window_start  DATE NOT NULL,
+    next_expiry   DATE NULL,
+    updated_at    TIMESTAMP NULL
+);
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Migration 003: delta-encoded history of season points and ranks
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- One row per stretch of days during which a rider's points and rank stayed
+-- the same: valid on valid_from <= day < valid_to (valid_to NULL = current).
+-- Riders without season points have no open row.
+CREATE TABLE IF NOT EXISTS rating_snapshots (
+    rider_id       INTEGER NOT NULL,
+    valid_from     TEXT NOT NULL,
+    valid_to       TEXT,
+    season_points  INTEGER NOT NULL,
+    season_rank    INTEGER NOT NULL,
+    PRIMARY KEY (rider_id, valid_from),
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_rating_snapshots_valid ON rating_snapshots(valid_to, valid_from);
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Migration 003: delta-encoded history of season points and ranks (MariaDB version)
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS rating_snapshots (
+    rider_id       INT NOT NULL,
+    valid_from     DATE NOT NULL,
+    valid_to       DATE NULL,
+    season_points  INT NOT NULL,
+    season_rank    INT NOT NULL,
+    PRIMARY KEY (rider_id, valid_from),
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_rating_snapshots_valid ON rating_snapshots(valid_to, valid_from);
+
+COMMIT;
@@ -0,0 +1,13 @@
+-- Migration 004: versioned scoring rules and manual points overrides
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Rules version (see backend/scoring.py) the event's results were scored with;
+-- NULL means the current version
+ALTER TABLE events ADD COLUMN rules_version TEXT;
+
+-- Points set by hand by an admin are kept when results are re-scored
+ALTER TABLE results ADD COLUMN points_overridden INTEGER NOT NULL DEFAULT 0 CHECK (points_overridden IN (0, 1));
+
+COMMIT;
@@ -0,0 +1,9 @@
+-- Migration 004: versioned scoring rules and manual points overrides (MariaDB version)
+
+START TRANSACTION;
+
+ALTER TABLE events ADD COLUMN rules_version VARCHAR(50) NULL;
+
+ALTER TABLE results ADD COLUMN points_overridden TINYINT(1) NOT NULL DEFAULT 0 CHECK (points_overridden IN (0, 1));
+
+COMMIT;
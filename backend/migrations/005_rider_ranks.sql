@@ -0,0 +1,28 @@
+-- Migration 005: materialised rating positions and ranks
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- One row per rider, rebuilt at the end of every season recalculation and on
+-- rider writes (see backend/ranks.py). position is the 1-based row in the
+-- default rating order (season points desc, id asc), so a rating page is a
+-- range read on idx_rider_ranks_position. All rank_* columns are dense ranks
+-- by season points within the respective group.
+CREATE TABLE IF NOT EXISTS rider_ranks (
+    rider_id        INTEGER PRIMARY KEY,
+    season_points   INTEGER NOT NULL,
+    position        INTEGER NOT NULL,
+    rank_global     INTEGER NOT NULL,
+    age_group       TEXT NOT NULL,
+    rank_city       INTEGER NOT NULL,
+    rank_style      INTEGER NOT NULL,
+    rank_level      INTEGER NOT NULL,
+    rank_age_group  INTEGER NOT NULL,
+    ranked_at       TEXT,
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rider_ranks_position ON rider_ranks(position);
+CREATE INDEX IF NOT EXISTS idx_rider_ranks_global ON rider_ranks(rank_global);
+
+COMMIT;
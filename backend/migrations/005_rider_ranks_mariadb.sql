@@ -0,0 +1,22 @@
+-- Migration 005: materialised rating positions and ranks (MariaDB version)
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS rider_ranks (
+    rider_id        INT PRIMARY KEY,
+    season_points   INT NOT NULL,
+    position        INT NOT NULL,
+    rank_global     INT NOT NULL,
+    age_group       VARCHAR(20) NOT NULL,
+    rank_city       INT NOT NULL,
+    rank_style      INT NOT NULL,
+    rank_level      INT NOT NULL,
+    rank_age_group  INT NOT NULL,
+    ranked_at       TIMESTAMP NULL,
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rider_ranks_position ON rider_ranks(position);
+CREATE INDEX IF NOT EXISTS idx_rider_ranks_global ON rider_ranks(rank_global);
+
+COMMIT;
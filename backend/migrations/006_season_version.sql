@@ -0,0 +1,9 @@
+-- Migration 006: change counter for the cached season standings
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Incremented by every recalculation path, lets processes cache standings
+ALTER TABLE season_state ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+
+COMMIT;
@@ -0,0 +1,7 @@
+-- Migration 006: change counter for the cached season standings (MariaDB version)
+
+START TRANSACTION;
+
+ALTER TABLE season_state ADD COLUMN version INT NOT NULL DEFAULT 0;
+
+COMMIT;
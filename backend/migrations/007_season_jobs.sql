@@ -0,0 +1,20 @@
+-- Migration 007: durable queue of pending season recalculations
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Admin writes enqueue a job in their own transaction; a background worker
+-- (backend/season_queue.py) merges all pending jobs into one run.
+-- rider_ids_json is NULL for a full rebuild.
+CREATE TABLE IF NOT EXISTS season_jobs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    rider_ids_json  TEXT,
+    status          TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'done', 'failed')),
+    error           TEXT,
+    requested_at    TEXT NOT NULL DEFAULT (datetime('now')),
+    finished_at     TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_season_jobs_status ON season_jobs(status, id);
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- Migration 007: durable queue of pending season recalculations (MariaDB version)
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS season_jobs (
+    id              INT AUTO_INCREMENT PRIMARY KEY,
+    rider_ids_json  TEXT,
+    status          VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'done', 'failed')),
+    error           TEXT,
+    requested_at    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at     TIMESTAMP NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_season_jobs_status ON season_jobs(status, id);
+
+COMMIT;
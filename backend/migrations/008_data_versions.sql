@@ -0,0 +1,20 @@
+-- Migration 008: data generation counters for response caching
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- One counter per kind of data; admin writes and season recalculations
+-- increment them (backend/versions.py), cached responses are keyed on them.
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope       TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+);
+
+INSERT OR IGNORE INTO data_versions (scope, version) VALUES
+    ('riders', 0),
+    ('events', 0),
+    ('results', 0),
+    ('season', 0);
+
+COMMIT;
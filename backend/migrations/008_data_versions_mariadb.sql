@@ -0,0 +1,17 @@
+-- Migration 008: data generation counters for response caching (MariaDB version)
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope       VARCHAR(32) PRIMARY KEY,
+    version     INT NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP NULL
+);
+
+INSERT IGNORE INTO data_versions (scope, version) VALUES
+    ('riders', 0),
+    ('events', 0),
+    ('results', 0),
+    ('season', 0);
+
+COMMIT;
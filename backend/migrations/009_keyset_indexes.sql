@@ -0,0 +1,11 @@
+-- Migration 009: indexes matching the keyset pagination sort keys
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_riders_created ON riders(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_events_date_start_id ON events(date_start, id);
+-- resolves a rating cursor to a position when the rider's points changed
+CREATE INDEX IF NOT EXISTS idx_rider_ranks_points ON rider_ranks(season_points, rider_id);
+
+COMMIT;
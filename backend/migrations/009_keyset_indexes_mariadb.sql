@@ -0,0 +1,9 @@
+-- Migration 009: indexes matching the keyset pagination sort keys (MariaDB version)
+
+START TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_riders_created ON riders(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_events_date_start_id ON events(date_start, id);
+CREATE INDEX IF NOT EXISTS idx_rider_ranks_points ON rider_ranks(season_points, rider_id);
+
+COMMIT;
@@ -0,0 +1,33 @@
+-- Migration 010: full-text index over rider nicknames and full names
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- External-content FTS5 table: stores only the index, rows live in riders.
+-- unicode61 folds case for Cyrillic too (lower() only handles ASCII), and
+-- the 2/3-character prefix indexes keep short "typed so far" queries cheap.
+CREATE VIRTUAL TABLE IF NOT EXISTS riders_fts USING fts5(
+    nickname,
+    fullname,
+    content = 'riders',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS riders_fts_insert AFTER INSERT ON riders BEGIN
+    INSERT INTO riders_fts (rowid, nickname, fullname) VALUES (new.id, new.nickname, new.fullname);
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_fts_delete AFTER DELETE ON riders BEGIN
+    INSERT INTO riders_fts (riders_fts, rowid, nickname, fullname) VALUES ('delete', old.id, old.nickname, old.fullname);
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_fts_update AFTER UPDATE OF nickname, fullname ON riders BEGIN
+    INSERT INTO riders_fts (riders_fts, rowid, nickname, fullname) VALUES ('delete', old.id, old.nickname, old.fullname);
+    INSERT INTO riders_fts (rowid, nickname, fullname) VALUES (new.id, new.nickname, new.fullname);
+END;
+
+INSERT INTO riders_fts (riders_fts) VALUES ('rebuild');
+
+COMMIT;
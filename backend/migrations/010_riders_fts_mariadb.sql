@@ -0,0 +1,4 @@
+-- Migration 010: full-text index over rider nicknames and full names (MariaDB version)
+-- InnoDB maintains FULLTEXT indexes itself, no triggers are needed.
+
+ALTER TABLE riders ADD FULLTEXT INDEX IF NOT EXISTS ft_riders_names (nickname, fullname);
@@ -0,0 +1,130 @@
+-- Migration 011: normalised city dictionary
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Canonical cities with counters maintained by the triggers below.
+-- events_count only counts published events.
+CREATE TABLE IF NOT EXISTS cities (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    name          TEXT NOT NULL UNIQUE,
+    riders_count  INTEGER NOT NULL DEFAULT 0,
+    events_count  INTEGER NOT NULL DEFAULT 0,
+    created_at    TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Every spelling that maps to a city, keyed on lower(trim(spelling))
+-- (see backend/cities.py: city_key).
+CREATE TABLE IF NOT EXISTS city_aliases (
+    alias_key  TEXT PRIMARY KEY,
+    city_id    INTEGER NOT NULL,
+    FOREIGN KEY (city_id) REFERENCES cities(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_city_aliases_city ON city_aliases(city_id);
+
+ALTER TABLE riders ADD COLUMN city_id INTEGER REFERENCES cities(id);
+ALTER TABLE events ADD COLUMN city_id INTEGER REFERENCES cities(id);
+
+-- Existing spellings: one city per lower(trim(city)).
+INSERT OR IGNORE INTO cities (name)
+SELECT MIN(trim(city))
+FROM (SELECT city FROM riders UNION ALL SELECT city FROM events)
+WHERE trim(COALESCE(city, '')) <> ''
+GROUP BY lower(trim(city));
+
+INSERT OR IGNORE INTO city_aliases (alias_key, city_id)
+SELECT lower(name), id FROM cities;
+
+UPDATE riders SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(riders.city)));
+UPDATE events SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(events.city)));
+
+UPDATE cities
+SET riders_count = (SELECT COUNT(*) FROM riders WHERE riders.city_id = cities.id),
+    events_count = (SELECT COUNT(*) FROM events WHERE events.city_id = cities.id AND events.status = 'published');
+
+CREATE INDEX IF NOT EXISTS idx_riders_city_filters ON riders(city_id, level, style);
+CREATE INDEX IF NOT EXISTS idx_events_city ON events(city_id);
+
+-- Resolve city_id from the city text whenever it is written, adding
+-- unknown spellings to the dictionary.
+CREATE TRIGGER IF NOT EXISTS riders_city_insert AFTER INSERT ON riders BEGIN
+    INSERT OR IGNORE INTO cities (name)
+    SELECT trim(new.city)
+    WHERE trim(COALESCE(new.city, '')) <> ''
+      AND NOT EXISTS (SELECT 1 FROM city_aliases WHERE alias_key = lower(trim(new.city)));
+    INSERT OR IGNORE INTO city_aliases (alias_key, city_id)
+    SELECT lower(trim(new.city)), id FROM cities WHERE name = trim(new.city);
+    UPDATE riders
+    SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(new.city)))
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_city_update AFTER UPDATE OF city ON riders BEGIN
+    INSERT OR IGNORE INTO cities (name)
+    SELECT trim(new.city)
+    WHERE trim(COALESCE(new.city, '')) <> ''
+      AND NOT EXISTS (SELECT 1 FROM city_aliases WHERE alias_key = lower(trim(new.city)));
+    INSERT OR IGNORE INTO city_aliases (alias_key, city_id)
+    SELECT lower(trim(new.city)), id FROM cities WHERE name = trim(new.city);
+    UPDATE riders
+    SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(new.city)))
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_city_insert AFTER INSERT ON events BEGIN
+    INSERT OR IGNORE INTO cities (name)
+    SELECT trim(new.city)
+    WHERE trim(COALESCE(new.city, '')) <> ''
+      AND NOT EXISTS (SELECT 1 FROM city_aliases WHERE alias_key = lower(trim(new.city)));
+    INSERT OR IGNORE INTO city_aliases (alias_key, city_id)
+    SELECT lower(trim(new.city)), id FROM cities WHERE name = trim(new.city);
+    UPDATE events
+    SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(new.city)))
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_city_update AFTER UPDATE OF city ON events BEGIN
+    INSERT OR IGNORE INTO cities (name)
+    SELECT trim(new.city)
+    WHERE trim(COALESCE(new.city, '')) <> ''
+      AND NOT EXISTS (SELECT 1 FROM city_aliases WHERE alias_key = lower(trim(new.city)));
+    INSERT OR IGNORE INTO city_aliases (alias_key, city_id)
+    SELECT lower(trim(new.city)), id FROM cities WHERE name = trim(new.city);
+    UPDATE events
+    SET city_id = (SELECT city_id FROM city_aliases WHERE alias_key = lower(trim(new.city)))
+    WHERE id = new.id;
+END;
+
+-- Counters: one statement per change, also on MariaDB.
+CREATE TRIGGER IF NOT EXISTS riders_city_count_insert AFTER INSERT ON riders BEGIN
+    UPDATE cities SET riders_count = riders_count + 1 WHERE id = new.city_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_city_count_delete AFTER DELETE ON riders BEGIN
+    UPDATE cities SET riders_count = riders_count - 1 WHERE id = old.city_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_city_count_update AFTER UPDATE OF city_id ON riders BEGIN
+    UPDATE cities
+    SET riders_count = riders_count + (id IS new.city_id) - (id IS old.city_id)
+    WHERE id IN (old.city_id, new.city_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_insert AFTER INSERT ON events BEGIN
+    UPDATE cities SET events_count = events_count + 1 WHERE id = new.city_id AND new.status = 'published';
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_delete AFTER DELETE ON events BEGIN
+    UPDATE cities SET events_count = events_count - 1 WHERE id = old.city_id AND old.status = 'published';
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_update AFTER UPDATE OF city_id, status ON events BEGIN
+    UPDATE cities
+    SET events_count = events_count
+        + (id IS new.city_id AND new.status = 'published')
+        - (id IS old.city_id AND old.status = 'published')
+    WHERE id IN (old.city_id, new.city_id);
+END;
+
+COMMIT;
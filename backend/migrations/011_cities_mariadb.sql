@@ -0,0 +1,78 @@
+-- Migration 011: normalised city dictionary (MariaDB version)
+-- The migration runner splits on semicolons, so every trigger is a single
+-- statement. MariaDB triggers cannot write to their own table: city_id is
+-- resolved in BEFORE triggers, and unknown spellings are added to the
+-- dictionary by the application (backend/cities.py: ensure_city).
+
+CREATE TABLE IF NOT EXISTS cities (
+    id            INT AUTO_INCREMENT PRIMARY KEY,
+    name          VARCHAR(255) NOT NULL UNIQUE,
+    riders_count  INT NOT NULL DEFAULT 0,
+    events_count  INT NOT NULL DEFAULT 0,
+    created_at    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS city_aliases (
+    alias_key  VARCHAR(255) PRIMARY KEY,
+    city_id    INT NOT NULL,
+    INDEX idx_city_aliases_city (city_id),
+    FOREIGN KEY (city_id) REFERENCES cities(id) ON DELETE CASCADE
+);
+
+ALTER TABLE riders ADD COLUMN IF NOT EXISTS city_id INT NULL, ADD FOREIGN KEY (city_id) REFERENCES cities(id);
+ALTER TABLE events ADD COLUMN IF NOT EXISTS city_id INT NULL, ADD FOREIGN KEY (city_id) REFERENCES cities(id);
+
+INSERT IGNORE INTO cities (name)
+SELECT MIN(TRIM(city))
+FROM (SELECT city FROM riders UNION ALL SELECT city FROM events) AS spellings
+WHERE TRIM(COALESCE(city, '')) <> ''
+GROUP BY LOWER(TRIM(city));
+
+INSERT IGNORE INTO city_aliases (alias_key, city_id)
+SELECT LOWER(name), id FROM cities;
+
+UPDATE riders AS r JOIN city_aliases AS a ON a.alias_key = LOWER(TRIM(r.city)) SET r.city_id = a.city_id;
+UPDATE events AS e JOIN city_aliases AS a ON a.alias_key = LOWER(TRIM(e.city)) SET e.city_id = a.city_id;
+
+UPDATE cities
+SET riders_count = (SELECT COUNT(*) FROM riders WHERE riders.city_id = cities.id),
+    events_count = (SELECT COUNT(*) FROM events WHERE events.city_id = cities.id AND events.status = 'published');
+
+CREATE INDEX IF NOT EXISTS idx_riders_city_filters ON riders(city_id, level, style);
+CREATE INDEX IF NOT EXISTS idx_events_city ON events(city_id);
+
+CREATE TRIGGER IF NOT EXISTS riders_city_insert BEFORE INSERT ON riders FOR EACH ROW
+    SET NEW.city_id = COALESCE(NEW.city_id, (SELECT city_id FROM city_aliases WHERE alias_key = LOWER(TRIM(NEW.city))));
+
+CREATE TRIGGER IF NOT EXISTS riders_city_update BEFORE UPDATE ON riders FOR EACH ROW
+    SET NEW.city_id = IF(NEW.city <=> OLD.city, NEW.city_id, (SELECT city_id FROM city_aliases WHERE alias_key = LOWER(TRIM(NEW.city))));
+
+CREATE TRIGGER IF NOT EXISTS events_city_insert BEFORE INSERT ON events FOR EACH ROW
+    SET NEW.city_id = COALESCE(NEW.city_id, (SELECT city_id FROM city_aliases WHERE alias_key = LOWER(TRIM(NEW.city))));
+
+CREATE TRIGGER IF NOT EXISTS events_city_update BEFORE UPDATE ON events FOR EACH ROW
+    SET NEW.city_id = IF(NEW.city <=> OLD.city, NEW.city_id, (SELECT city_id FROM city_aliases WHERE alias_key = LOWER(TRIM(NEW.city))));
+
+CREATE TRIGGER IF NOT EXISTS riders_city_count_insert AFTER INSERT ON riders FOR EACH ROW
+    UPDATE cities SET riders_count = riders_count + 1 WHERE id = NEW.city_id;
+
+CREATE TRIGGER IF NOT EXISTS riders_city_count_delete AFTER DELETE ON riders FOR EACH ROW
+    UPDATE cities SET riders_count = riders_count - 1 WHERE id = OLD.city_id;
+
+CREATE TRIGGER IF NOT EXISTS riders_city_count_update AFTER UPDATE ON riders FOR EACH ROW
+    UPDATE cities
+    SET riders_count = riders_count + (id <=> NEW.city_id) - (id <=> OLD.city_id)
+    WHERE id IN (OLD.city_id, NEW.city_id);
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_insert AFTER INSERT ON events FOR EACH ROW
+    UPDATE cities SET events_count = events_count + 1 WHERE id = NEW.city_id AND NEW.status = 'published';
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_delete AFTER DELETE ON events FOR EACH ROW
+    UPDATE cities SET events_count = events_count - 1 WHERE id = OLD.city_id AND OLD.status = 'published';
+
+CREATE TRIGGER IF NOT EXISTS events_city_count_update AFTER UPDATE ON events FOR EACH ROW
+    UPDATE cities
+    SET events_count = events_count
+        + (id <=> NEW.city_id AND NEW.status = 'published')
+        - (id <=> OLD.city_id AND OLD.status = 'published')
+    WHERE id IN (OLD.city_id, NEW.city_id);
@@ -0,0 +1,42 @@
+-- Migration 012: indexed day numbers for birth and event dates
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- Days since 1970-01-01 (see backend/days.py), NULL for malformed dates.
+-- Date and age filters compare these as plain integer ranges, which can
+-- use the indexes below; date(column) predicates could not.
+ALTER TABLE riders ADD COLUMN birth_day INTEGER;
+ALTER TABLE events ADD COLUMN start_day INTEGER;
+
+UPDATE riders SET birth_day = CAST(julianday(date(birthdate)) - 2440587.5 AS INTEGER);
+UPDATE events SET start_day = CAST(julianday(date(date_start)) - 2440587.5 AS INTEGER);
+
+CREATE INDEX IF NOT EXISTS idx_riders_birth_day ON riders(birth_day);
+CREATE INDEX IF NOT EXISTS idx_events_start_day ON events(start_day);
+
+CREATE TRIGGER IF NOT EXISTS riders_birth_day_insert AFTER INSERT ON riders BEGIN
+    UPDATE riders
+    SET birth_day = CAST(julianday(date(new.birthdate)) - 2440587.5 AS INTEGER)
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_birth_day_update AFTER UPDATE OF birthdate ON riders BEGIN
+    UPDATE riders
+    SET birth_day = CAST(julianday(date(new.birthdate)) - 2440587.5 AS INTEGER)
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_days_insert AFTER INSERT ON events BEGIN
+    UPDATE events
+    SET start_day = CAST(julianday(date(new.date_start)) - 2440587.5 AS INTEGER)
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_days_update AFTER UPDATE OF date_start ON events BEGIN
+    UPDATE events
+    SET start_day = CAST(julianday(date(new.date_start)) - 2440587.5 AS INTEGER)
+    WHERE id = new.id;
+END;
+
+COMMIT;
@@ -0,0 +1,11 @@
+-- Migration 012: indexed day numbers for birth and event dates (MariaDB version)
+-- Persistent generated columns, so MariaDB maintains them on every write.
+
+ALTER TABLE riders
+    ADD COLUMN IF NOT EXISTS birth_day INT AS (DATEDIFF(birthdate, '1970-01-01')) PERSISTENT;
+
+ALTER TABLE events
+    ADD COLUMN IF NOT EXISTS start_day INT AS (DATEDIFF(date_start, '1970-01-01')) PERSISTENT;
+
+CREATE INDEX IF NOT EXISTS idx_riders_birth_day ON riders(birth_day);
+CREATE INDEX IF NOT EXISTS idx_events_start_day ON events(start_day);
@@ -0,0 +1,36 @@
+-- Migration 013: pre-serialised rider profile cards
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- The "seasonResults" list of GET /api/riders/<id>, as JSON. Rows are
+-- deleted by the triggers below whenever one of the rider's results or
+-- events changes and rebuilt on the next profile view (backend/cards.py).
+CREATE TABLE IF NOT EXISTS rider_cards (
+    rider_id      INTEGER PRIMARY KEY,
+    results_json  TEXT NOT NULL,
+    built_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS results_cards_insert AFTER INSERT ON results BEGIN
+    DELETE FROM rider_cards WHERE rider_id = new.rider_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_cards_update AFTER UPDATE ON results BEGIN
+    DELETE FROM rider_cards WHERE rider_id IN (old.rider_id, new.rider_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_cards_delete AFTER DELETE ON results BEGIN
+    DELETE FROM rider_cards WHERE rider_id = old.rider_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_cards_update AFTER UPDATE OF name, city, level, date_start ON events BEGIN
+    DELETE FROM rider_cards WHERE rider_id IN (SELECT rider_id FROM results WHERE event_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_cards_delete AFTER DELETE ON events BEGIN
+    DELETE FROM rider_cards WHERE rider_id IN (SELECT rider_id FROM results WHERE event_id = old.id);
+END;
+
+COMMIT;
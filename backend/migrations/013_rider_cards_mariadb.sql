@@ -0,0 +1,28 @@
+-- Migration 013: pre-serialised rider profile cards (MariaDB version)
+-- Foreign key cascades do not fire triggers in MariaDB, so event deletes
+-- clear the cards before the results go.
+
+CREATE TABLE IF NOT EXISTS rider_cards (
+    rider_id      INT PRIMARY KEY,
+    results_json  LONGTEXT NOT NULL,
+    built_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (rider_id) REFERENCES riders(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS results_cards_insert AFTER INSERT ON results FOR EACH ROW
+    DELETE FROM rider_cards WHERE rider_id = NEW.rider_id;
+
+CREATE TRIGGER IF NOT EXISTS results_cards_update AFTER UPDATE ON results FOR EACH ROW
+    DELETE FROM rider_cards WHERE rider_id IN (OLD.rider_id, NEW.rider_id);
+
+CREATE TRIGGER IF NOT EXISTS results_cards_delete AFTER DELETE ON results FOR EACH ROW
+    DELETE FROM rider_cards WHERE rider_id = OLD.rider_id;
+
+CREATE TRIGGER IF NOT EXISTS events_cards_update AFTER UPDATE ON events FOR EACH ROW
+    DELETE FROM rider_cards
+    WHERE NOT (OLD.name <=> NEW.name AND OLD.city <=> NEW.city AND OLD.level <=> NEW.level
+               AND OLD.date_start <=> NEW.date_start)
+      AND rider_id IN (SELECT rider_id FROM results WHERE event_id = NEW.id);
+
+CREATE TRIGGER IF NOT EXISTS events_cards_delete BEFORE DELETE ON events FOR EACH ROW
+    DELETE FROM rider_cards WHERE rider_id IN (SELECT rider_id FROM results WHERE event_id = OLD.id);
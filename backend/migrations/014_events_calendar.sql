@@ -0,0 +1,11 @@
+-- Migration 014: index for the public events calendar
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- /api/events lists published events by date_start in either direction
+-- with an (date_start, id) cursor; the status prefix keeps drafts out of
+-- the range scan and the order comes straight from the index.
+CREATE INDEX IF NOT EXISTS idx_events_status_date ON events(status, date_start, id);
+
+COMMIT;
@@ -0,0 +1,7 @@
+-- Migration 014: index for the public events calendar (MariaDB version)
+
+START TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_events_status_date ON events(status, date_start, id);
+
+COMMIT;
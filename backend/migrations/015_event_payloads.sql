@@ -0,0 +1,47 @@
+-- Migration 015: pre-rendered event pages
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- The whole GET /api/events/<id> body of a published event, gzip
+-- compressed (backend/event_payloads.py). The admin write paths rebuild
+-- it right after publishing or editing; the triggers below drop it on
+-- any other change to the event, its results or their riders, and the
+-- next view rebuilds it.
+CREATE TABLE IF NOT EXISTS event_payloads (
+    event_id  INTEGER PRIMARY KEY,
+    body      BLOB NOT NULL,
+    built_at  TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_insert AFTER INSERT ON results BEGIN
+    DELETE FROM event_payloads WHERE event_id = new.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_update AFTER UPDATE ON results BEGIN
+    DELETE FROM event_payloads WHERE event_id IN (old.event_id, new.event_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_delete AFTER DELETE ON results BEGIN
+    DELETE FROM event_payloads WHERE event_id = old.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_payloads_update AFTER UPDATE ON events BEGIN
+    DELETE FROM event_payloads WHERE event_id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_payloads_delete AFTER DELETE ON events BEGIN
+    DELETE FROM event_payloads WHERE event_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_payloads_update AFTER UPDATE OF nickname, city, level ON riders
+WHEN old.nickname IS NOT new.nickname OR old.city IS NOT new.city OR old.level IS NOT new.level BEGIN
+    DELETE FROM event_payloads WHERE event_id IN (SELECT event_id FROM results WHERE rider_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_payloads_delete AFTER DELETE ON riders BEGIN
+    DELETE FROM event_payloads WHERE event_id IN (SELECT event_id FROM results WHERE rider_id = old.id);
+END;
+
+COMMIT;
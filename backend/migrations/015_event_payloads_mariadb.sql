@@ -0,0 +1,30 @@
+-- Migration 015: pre-rendered event pages (MariaDB version)
+-- Foreign key cascades do not fire triggers in MariaDB, so event and
+-- rider deletes clear the payloads before their results go.
+
+CREATE TABLE IF NOT EXISTS event_payloads (
+    event_id  INT PRIMARY KEY,
+    body      LONGBLOB NOT NULL,
+    built_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_insert AFTER INSERT ON results FOR EACH ROW
+    DELETE FROM event_payloads WHERE event_id = NEW.event_id;
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_update AFTER UPDATE ON results FOR EACH ROW
+    DELETE FROM event_payloads WHERE event_id IN (OLD.event_id, NEW.event_id);
+
+CREATE TRIGGER IF NOT EXISTS results_payloads_delete AFTER DELETE ON results FOR EACH ROW
+    DELETE FROM event_payloads WHERE event_id = OLD.event_id;
+
+CREATE TRIGGER IF NOT EXISTS events_payloads_update AFTER UPDATE ON events FOR EACH ROW
+    DELETE FROM event_payloads WHERE event_id = NEW.id;
+
+CREATE TRIGGER IF NOT EXISTS riders_payloads_update AFTER UPDATE ON riders FOR EACH ROW
+    DELETE FROM event_payloads
+    WHERE NOT (OLD.nickname <=> NEW.nickname AND OLD.city <=> NEW.city AND OLD.level <=> NEW.level)
+      AND event_id IN (SELECT event_id FROM results WHERE rider_id = NEW.id);
+
+CREATE TRIGGER IF NOT EXISTS riders_payloads_delete BEFORE DELETE ON riders FOR EACH ROW
+    DELETE FROM event_payloads WHERE event_id IN (SELECT event_id FROM results WHERE rider_id = OLD.id);
@@ -0,0 +1,97 @@
+-- Migration 016: summary counters for /api/stats
+PRAGMA foreign_keys = ON;
+
+BEGIN TRANSACTION;
+
+-- One counter per (dimension, bucket), kept current by the triggers below:
+--   rider_level, rider_style  riders per level and style
+--   event_level, event_month  published events per level and start month (YYYY-MM)
+--   points                    riders in the season per 100-point band (lower bound)
+-- Riders per city are the counters on cities (migration 011).
+-- backend/stats.py checks them against the base tables and rebuilds them.
+CREATE TABLE IF NOT EXISTS stats_counts (
+    dimension  TEXT NOT NULL,
+    bucket     TEXT NOT NULL,
+    total      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, bucket)
+);
+
+INSERT OR REPLACE INTO stats_counts (dimension, bucket, total)
+SELECT 'rider_level', COALESCE(level, ''), COUNT(*) FROM riders GROUP BY 1, 2
+UNION ALL
+SELECT 'rider_style', COALESCE(style, ''), COUNT(*) FROM riders GROUP BY 1, 2
+UNION ALL
+SELECT 'event_level', COALESCE(level, ''), COUNT(*) FROM events WHERE status = 'published' GROUP BY 1, 2
+UNION ALL
+SELECT 'event_month', COALESCE(substr(date_start, 1, 7), ''), COUNT(*) FROM events WHERE status = 'published' GROUP BY 1, 2
+UNION ALL
+SELECT 'points', CAST(season_points / 100 * 100 AS TEXT), COUNT(*) FROM season_points GROUP BY 1, 2;
+
+-- Each trigger adds +1 for the new row and -1 for the old one in a single
+-- upsert; rows are applied in order, so an unchanged bucket nets zero.
+CREATE TRIGGER IF NOT EXISTS riders_stats_insert AFTER INSERT ON riders BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(new.level, ''), 1), ('rider_style', COALESCE(new.style, ''), 1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_stats_update AFTER UPDATE OF level, style ON riders
+WHEN old.level IS NOT new.level OR old.style IS NOT new.style BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(old.level, ''), -1), ('rider_level', COALESCE(new.level, ''), 1),
+           ('rider_style', COALESCE(old.style, ''), -1), ('rider_style', COALESCE(new.style, ''), 1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS riders_stats_delete AFTER DELETE ON riders BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(old.level, ''), -1), ('rider_style', COALESCE(old.style, ''), -1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_stats_insert AFTER INSERT ON events WHEN new.status = 'published' BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('event_level', COALESCE(new.level, ''), 1), ('event_month', COALESCE(substr(new.date_start, 1, 7), ''), 1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_stats_update AFTER UPDATE OF status, level, date_start ON events
+WHEN old.status IS NOT new.status OR old.level IS NOT new.level OR old.date_start IS NOT new.date_start BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    SELECT 'event_level', COALESCE(old.level, ''), -1 WHERE old.status = 'published'
+    UNION ALL
+    SELECT 'event_month', COALESCE(substr(old.date_start, 1, 7), ''), -1 WHERE old.status = 'published'
+    UNION ALL
+    SELECT 'event_level', COALESCE(new.level, ''), 1 WHERE new.status = 'published'
+    UNION ALL
+    SELECT 'event_month', COALESCE(substr(new.date_start, 1, 7), ''), 1 WHERE new.status = 'published'
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_stats_delete AFTER DELETE ON events WHEN old.status = 'published' BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('event_level', COALESCE(old.level, ''), -1), ('event_month', COALESCE(substr(old.date_start, 1, 7), ''), -1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_insert AFTER INSERT ON season_points BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(new.season_points / 100 * 100 AS TEXT), 1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_update AFTER UPDATE OF season_points ON season_points
+WHEN old.season_points / 100 IS NOT new.season_points / 100 BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(old.season_points / 100 * 100 AS TEXT), -1),
+           ('points', CAST(new.season_points / 100 * 100 AS TEXT), 1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_delete AFTER DELETE ON season_points BEGIN
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(old.season_points / 100 * 100 AS TEXT), -1)
+    ON CONFLICT (dimension, bucket) DO UPDATE SET total = total + excluded.total;
+END;
+
+COMMIT;
@@ -0,0 +1,83 @@
+-- Migration 016: summary counters for /api/stats (MariaDB version)
+-- Same counters as the SQLite version. Triggers cannot have a WHEN
+-- clause here, so unchanged rows add and remove the same bucket.
+
+CREATE TABLE IF NOT EXISTS stats_counts (
+    dimension  VARCHAR(32) NOT NULL,
+    bucket     VARCHAR(255) NOT NULL,
+    total      INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, bucket)
+);
+
+REPLACE INTO stats_counts (dimension, bucket, total)
+SELECT 'rider_level', COALESCE(level, ''), COUNT(*) FROM riders GROUP BY level
+UNION ALL
+SELECT 'rider_style', COALESCE(style, ''), COUNT(*) FROM riders GROUP BY style
+UNION ALL
+SELECT 'event_level', COALESCE(level, ''), COUNT(*) FROM events WHERE status = 'published' GROUP BY level
+UNION ALL
+SELECT 'event_month', DATE_FORMAT(date_start, '%Y-%m'), COUNT(*) FROM events WHERE status = 'published'
+GROUP BY DATE_FORMAT(date_start, '%Y-%m')
+UNION ALL
+SELECT 'points', CAST(FLOOR(season_points / 100) * 100 AS CHAR), COUNT(*) FROM season_points
+GROUP BY FLOOR(season_points / 100);
+
+CREATE TRIGGER IF NOT EXISTS riders_stats_insert AFTER INSERT ON riders FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(NEW.level, ''), 1), ('rider_style', COALESCE(NEW.style, ''), 1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS riders_stats_update AFTER UPDATE ON riders FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(OLD.level, ''), -1), ('rider_level', COALESCE(NEW.level, ''), 1),
+           ('rider_style', COALESCE(OLD.style, ''), -1), ('rider_style', COALESCE(NEW.style, ''), 1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS riders_stats_delete AFTER DELETE ON riders FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('rider_level', COALESCE(OLD.level, ''), -1), ('rider_style', COALESCE(OLD.style, ''), -1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS events_stats_insert AFTER INSERT ON events FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    SELECT 'event_level' AS dimension, COALESCE(NEW.level, '') AS bucket, 1 AS change_by FROM DUAL
+    WHERE NEW.status = 'published'
+    UNION ALL
+    SELECT 'event_month', DATE_FORMAT(NEW.date_start, '%Y-%m'), 1 FROM DUAL WHERE NEW.status = 'published'
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS events_stats_update AFTER UPDATE ON events FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    SELECT 'event_level' AS dimension, COALESCE(OLD.level, '') AS bucket, -1 AS change_by FROM DUAL
+    WHERE OLD.status = 'published'
+    UNION ALL
+    SELECT 'event_month', DATE_FORMAT(OLD.date_start, '%Y-%m'), -1 FROM DUAL WHERE OLD.status = 'published'
+    UNION ALL
+    SELECT 'event_level', COALESCE(NEW.level, ''), 1 FROM DUAL WHERE NEW.status = 'published'
+    UNION ALL
+    SELECT 'event_month', DATE_FORMAT(NEW.date_start, '%Y-%m'), 1 FROM DUAL WHERE NEW.status = 'published'
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS events_stats_delete AFTER DELETE ON events FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    SELECT 'event_level' AS dimension, COALESCE(OLD.level, '') AS bucket, -1 AS change_by FROM DUAL
+    WHERE OLD.status = 'published'
+    UNION ALL
+    SELECT 'event_month', DATE_FORMAT(OLD.date_start, '%Y-%m'), -1 FROM DUAL WHERE OLD.status = 'published'
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_insert AFTER INSERT ON season_points FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(FLOOR(NEW.season_points / 100) * 100 AS CHAR), 1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_update AFTER UPDATE ON season_points FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(FLOOR(OLD.season_points / 100) * 100 AS CHAR), -1),
+           ('points', CAST(FLOOR(NEW.season_points / 100) * 100 AS CHAR), 1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+
+CREATE TRIGGER IF NOT EXISTS season_points_stats_delete AFTER DELETE ON season_points FOR EACH ROW
+    INSERT INTO stats_counts (dimension, bucket, total)
+    VALUES ('points', CAST(FLOOR(OLD.season_points / 100) * 100 AS CHAR), -1)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total);
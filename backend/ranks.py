@@ -0,0 +1,245 @@
+"""Materialised rating positions and per-category ranks (``rider_ranks``)."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Sequence
+
+from backend.days import day_number
+from backend.dialect import BATCH_SIZE, adapt, placeholders
+
+# (label, minimum age) from the oldest group down; a rider belongs to the
+# first group whose minimum age they have reached.
+AGE_GROUPS: tuple[tuple[str, int], ...] = (
+    ("25+", 25),
+    ("18-24", 18),
+    ("14-17", 14),
+    ("under-14", 0),
+)
+
+
+def _years_ago(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        # February 29 in a non-leap year
+        return today.replace(month=2, day=28, year=today.year - years)
+
+
+# Dense-rank columns of rider_ranks and the column partitioning each: one of
+# riders, except age_group, which rider_ranks stores; None for the global rank.
+_DENSE_RANKS: tuple[tuple[str, str | None], ...] = (
+    ("rank_global", None),
+    ("rank_city", "city_id"),
+    ("rank_style", "style"),
+    ("rank_level", "level"),
+    ("rank_age_group", "age_group"),
+)
+_RANK_COLUMNS = ("season_points", "position", *(column for column, _ in _DENSE_RANKS))
+
+
+def rank_riders(conn: Any, today: date | None = None, rider_ids: Sequence[int] | None = None) -> bool:
+    """Bring ``rider_ranks`` up to date; return whether it may have changed.
+
+    Without ``rider_ids`` every rider is re-ranked in one set-based
+    statement. With them (the riders a queue batch refreshed) only the
+    ranks their points changes actually move are rewritten, see
+    :func:`_rank_moved`, and nothing is written when none of their points
+    changed. Riders without season points are ranked too (with 0 points),
+    so the table always covers the whole rating.
+    """
+
+    if rider_ids is not None:
+        moved = _moved_riders(conn, rider_ids)
+        if moved is not None:
+            if moved:
+                _rank_moved(conn, moved)
+            return bool(moved)
+    _rank_all(conn, today or date.today())
+    return True
+
+
+def _moved_riders(conn: Any, rider_ids: Sequence[int]) -> dict[int, tuple[int, int]] | None:
+    """``rider_id -> (ranked points, current points)`` of riders whose points changed.
+
+    ``None`` when anything else the ranks depend on may have changed: riders
+    were added or deleted, or one of ``rider_ids`` was edited after it was
+    last ranked (a new city, style, level or birthdate).
+    """
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT (SELECT COUNT(*) FROM riders), (SELECT COUNT(*) FROM rider_ranks)")
+    riders, ranked = cursor.fetchone()
+    if riders != ranked:
+        cursor.close()
+        return None
+    ids = sorted(set(rider_ids))
+    moved: dict[int, tuple[int, int]] = {}
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start : start + BATCH_SIZE]
+        cursor.execute(
+            adapt(
+                conn,
+                f"""
+                SELECT r.id, rk.season_points, COALESCE(sp.season_points, 0),
+                       CASE WHEN rk.ranked_at IS NULL OR r.updated_at >= rk.ranked_at THEN 1 ELSE 0 END
+                FROM riders AS r
+                LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id
+                LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+                WHERE r.id IN ({placeholders(len(batch))})
+                """,
+            ),
+            batch,
+        )
+        rows = cursor.fetchall()
+        if len(rows) != len(batch) or any(row[1] is None or row[3] for row in rows):
+            cursor.close()
+            return None
+        moved.update((row[0], (int(row[1]), int(row[2]))) for row in rows if row[1] != row[2])
+    cursor.close()
+    return moved
+
+
+def _rank_moved(conn: Any, moved: dict[int, tuple[int, int]]) -> None:
+    """Re-rank after the points of ``moved`` riders changed, nothing else.
+
+    Riders above the highest old or new points of a moved rider keep every
+    rank. The band between the lowest and highest of those points is ranked
+    again from its old ranks: its first position and first dense rank are
+    still right, only the order inside it changed. Below the band positions
+    stay, and a dense rank moves by the number of distinct points the band
+    gained or lost, the same for the whole partition.
+    """
+
+    low = min(min(points) for points in moved.values())
+    high = max(max(points) for points in moved.values())
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(
+            conn,
+            f"""
+            SELECT rk.rider_id, {", ".join(f"rk.{column}" for column in _RANK_COLUMNS)},
+                   r.city_id, r.style, r.level, rk.age_group
+            FROM rider_ranks AS rk
+            JOIN riders AS r ON r.id = rk.rider_id
+            WHERE rk.season_points BETWEEN ? AND ?
+            """,
+        ),
+        (low, high),
+    )
+    band = {}
+    for row in cursor.fetchall():
+        old = dict(zip(_RANK_COLUMNS, row[1 : len(_RANK_COLUMNS) + 1]))
+        keys = dict(zip(("city_id", "style", "level", "age_group"), row[len(_RANK_COLUMNS) + 1 :]))
+        band[row[0]] = (old, keys)
+    new = {rider_id: dict(old) for rider_id, (old, _) in band.items()}
+    for rider_id, (_, points) in moved.items():
+        new[rider_id]["season_points"] = points
+
+    # positions: the band is one contiguous block of the rating order
+    order = sorted(new, key=lambda rider_id: (-new[rider_id]["season_points"], rider_id))
+    first = min(old["position"] for old, _ in band.values())
+    for offset, rider_id in enumerate(order):
+        new[rider_id]["position"] = first + offset
+
+    shifts: list[tuple[str, str | None, Any, int, int]] = []
+    for column, key in _DENSE_RANKS:
+        partitions: dict[Any, list[int]] = {}
+        for rider_id, (_, keys) in band.items():
+            partitions.setdefault(None if key is None else keys[key], []).append(rider_id)
+        for value, members in partitions.items():
+            changed = [rider_id for rider_id in members if rider_id in moved]
+            if not changed:
+                continue
+            part_low = min(min(moved[rider_id]) for rider_id in changed)
+            part_high = max(max(moved[rider_id]) for rider_id in changed)
+            inside = [rider_id for rider_id in members if part_low <= band[rider_id][0]["season_points"] <= part_high]
+            old_points = {band[rider_id][0]["season_points"] for rider_id in inside}
+            new_points = sorted({new[rider_id]["season_points"] for rider_id in inside}, reverse=True)
+            top = max(inside, key=lambda rider_id: band[rider_id][0]["season_points"])
+            base = band[top][0][column]
+            dense = {points: base + index for index, points in enumerate(new_points)}
+            for rider_id in inside:
+                new[rider_id][column] = dense[new[rider_id]["season_points"]]
+            if len(new_points) != len(old_points):
+                shifts.append((column, key, value, part_low, len(new_points) - len(old_points)))
+
+    rows = [
+        (values["season_points"], -values["position"], *(values[column] for column, _ in _DENSE_RANKS), rider_id)
+        for rider_id, values in new.items()
+        if values != band[rider_id][0]
+    ]
+    # written negated first: positions are unique and rows swap them
+    cursor.executemany(
+        adapt(
+            conn,
+            f"""
+            UPDATE rider_ranks
+            SET season_points = ?, position = ?,
+                {", ".join(f"{column} = ?" for column, _ in _DENSE_RANKS)},
+                ranked_at = CURRENT_TIMESTAMP
+            WHERE rider_id = ?
+            """,
+        ),
+        rows,
+    )
+    cursor.execute("UPDATE rider_ranks SET position = -position WHERE position < 0")
+    for column, key, value, below, delta in shifts:
+        if key is None:
+            partition, params = "", ()
+        elif key == "age_group":
+            partition, params = "AND age_group = ?", (value,)
+        elif value is None:
+            partition, params = f"AND rider_id IN (SELECT id FROM riders WHERE {key} IS NULL)", ()
+        else:
+            partition, params = f"AND rider_id IN (SELECT id FROM riders WHERE {key} = ?)", (value,)
+        cursor.execute(
+            adapt(
+                conn,
+                f"""
+                UPDATE rider_ranks
+                SET {column} = {column} + ?, ranked_at = CURRENT_TIMESTAMP
+                WHERE season_points < ? {partition}
+                """,
+            ),
+            (delta, below, *params),
+        )
+    cursor.close()
+
+
+def _rank_all(conn: Any, today: date) -> None:
+    age_cases = " ".join(
+        f"WHEN r.birth_day <= ? THEN '{label}'" for label, _ in AGE_GROUPS[:-1]
+    )
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM rider_ranks")
+    cursor.execute(
+        adapt(
+            conn,
+            f"""
+            INSERT INTO rider_ranks (
+                rider_id, season_points, position, rank_global, age_group,
+                rank_city, rank_style, rank_level, rank_age_group, ranked_at
+            )
+            SELECT rider_id,
+                   points,
+                   ROW_NUMBER() OVER (ORDER BY points DESC, rider_id ASC),
+                   DENSE_RANK() OVER (ORDER BY points DESC),
+                   age_group,
+                   DENSE_RANK() OVER (PARTITION BY city_id ORDER BY points DESC),
+                   DENSE_RANK() OVER (PARTITION BY style ORDER BY points DESC),
+                   DENSE_RANK() OVER (PARTITION BY level ORDER BY points DESC),
+                   DENSE_RANK() OVER (PARTITION BY age_group ORDER BY points DESC),
+                   CURRENT_TIMESTAMP
+            FROM (
+                SELECT r.id AS rider_id, r.city_id, r.style, r.level,
+                       COALESCE(sp.season_points, 0) AS points,
+                       CASE {age_cases} ELSE '{AGE_GROUPS[-1][0]}' END AS age_group
+                FROM riders AS r
+                LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+            ) AS standings
+            """,
+        ),
+        [day_number(_years_ago(today, min_age)) for _, min_age in AGE_GROUPS[:-1]],
+    )
+    cursor.close()
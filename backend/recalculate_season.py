@@ -1,26 +1,196 @@
 #!/usr/bin/env python3
-"""Utility script to recalculate rolling season points."""
+"""Command line entry point for season points maintenance.
+
+Meant to be run from cron (or as a long-lived process) next to the web
+application::
+
+    python -m backend.recalculate_season expire    # daily: move the window forward
+    python -m backend.recalculate_season watch     # sleep until the next expiry, repeat
+    python -m backend.recalculate_season rebuild   # full recomputation
+    python -m backend.recalculate_season verify    # compare incremental paths with a rebuild
+    python -m backend.recalculate_season status
+    python -m backend.recalculate_season drain     # run queued jobs (TOPSCOOT_SEASON_QUEUE=external)
+    python -m backend.recalculate_season rescore --rules-version 2025   # after a rules change
+
+Running it without a command performs a full rebuild, as it always did.
+"""
 
 from __future__ import annotations
 
+import argparse
 import sqlite3
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-from backend.season import recalculate_season_points
+from backend.config import Config
+from backend.scoring import rescore_season
+from backend.season import (
+    expire_season_points,
+    load_state,
+    recalculate_season_points,
+    refresh_season_points,
+)
+from backend.season_queue import process_pending
 
-BASE_DIR = Path(__file__).resolve().parent
-ROOT_DIR = BASE_DIR.parent
-DB_PATH = ROOT_DIR / "data" / "top-scoot.sqlite3"
+DB_PATH = Path(Config.DATABASE_PATH)
 
 
-def main() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("PRAGMA foreign_keys = ON;")
-        recalculate_season_points(conn)
-        conn.commit()
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def season_table(conn: sqlite3.Connection) -> dict[int, tuple[int, int, int]]:
+    rows = conn.execute(
+        "SELECT rider_id, season_points, raw_points, results_count FROM season_points"
+    ).fetchall()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def diff_tables(label: str, actual: dict, expected: dict) -> list[str]:
+    return [
+        f"{label}: rider {rider_id}: got {actual.get(rider_id)} expected {expected.get(rider_id)}"
+        for rider_id in sorted(set(actual) | set(expected))
+        if actual.get(rider_id) != expected.get(rider_id)
+    ]
+
+
+def verify(conn: sqlite3.Connection, args: argparse.Namespace) -> list[str]:
+    """Check that the incremental paths agree with a full rebuild.
+
+    Window expiry starts from the stored state, the per-rider refresh then
+    covers every rider, and finally the table is rebuilt from scratch. All
+    of it runs inside one transaction that is rolled back afterwards.
+    """
+
+    options = {"window_days": args.window_days, "points_cap": args.points_cap, "today": args.today}
+    rider_ids = [row[0] for row in conn.execute("SELECT id FROM riders UNION SELECT rider_id FROM season_points")]
+    try:
+        expire_season_points(conn, **options)
+        expired = season_table(conn)
+        refresh_season_points(conn, rider_ids, **options)
+        refreshed = season_table(conn)
+        recalculate_season_points(conn, **options)
+        rebuilt = season_table(conn)
+    finally:
+        conn.rollback()
+    return diff_tables("expire", expired, rebuilt) + diff_tables("refresh", refreshed, rebuilt)
+
+
+def cmd_rebuild(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    recalculate_season_points(conn, args.window_days, args.points_cap, args.today)
+    conn.commit()
     print("Season points recalculated")
 
 
+def cmd_expire(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    changed = expire_season_points(conn, args.window_days, args.points_cap, args.today)
+    conn.commit()
+    if changed is None:
+        print("No window state found, season points rebuilt")
+    else:
+        print(f"Window moved forward, {len(changed)} riders updated")
+
+
+def cmd_status(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    state = load_state(conn)
+    if state is None:
+        print("No window state yet; run 'rebuild' or 'expire'")
+        return
+    print(f"window_days:  {state.window_days}")
+    print(f"window_start: {state.window_start.isoformat()}")
+    print(f"next_expiry:  {state.next_expiry.isoformat() if state.next_expiry else '-'}")
+
+
+def cmd_verify(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    mismatches = verify(conn, args)
+    for line in mismatches:
+        print(line)
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} rows differ from a full rebuild")
+    print("Incremental paths and full rebuild produce identical season points")
+
+
+def cmd_watch(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    """Run ``expire`` whenever the next result is due to leave the window.
+
+    Sleeps until the stored ``next_expiry`` (capped by ``--max-sleep`` so
+    results added in the meantime are picked up) and repeats forever.
+    """
+
+    while True:
+        expire_season_points(conn, args.window_days, args.points_cap)
+        conn.commit()
+        state = load_state(conn)
+        wake_at = datetime.now() + timedelta(seconds=args.max_sleep)
+        if state is not None and state.next_expiry is not None:
+            wake_at = min(wake_at, datetime.combine(state.next_expiry, datetime.min.time()))
+        time.sleep(max((wake_at - datetime.now()).total_seconds(), 1))
+
+
+def cmd_drain(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    handled = process_pending(conn, args.window_days, args.points_cap)
+    print(f"{len(handled)} queued jobs processed")
+
+
+def cmd_rescore(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    changed = rescore_season(conn, args.rules_version, args.since)
+    refresh_season_points(conn, changed, args.window_days, args.points_cap, args.today, rerank=True)
+    conn.commit()
+    print(f"Results re-scored, points changed for {len(changed)} riders")
+
+
+COMMANDS = {
+    "drain": cmd_drain,
+    "rebuild": cmd_rebuild,
+    "rescore": cmd_rescore,
+    "expire": cmd_expire,
+    "status": cmd_status,
+    "verify": cmd_verify,
+    "watch": cmd_watch,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Maintain rolling season points.")
+    parser.add_argument("command", nargs="?", default="rebuild", choices=sorted(COMMANDS))
+    parser.add_argument("--database", type=Path, default=DB_PATH, help=f"SQLite database (default: {DB_PATH})")
+    parser.add_argument("--window-days", type=int, default=90)
+    parser.add_argument("--points-cap", type=int, default=1000)
+    parser.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        default=None,
+        help="evaluate the window as of this date (YYYY-MM-DD) instead of today",
+    )
+    parser.add_argument(
+        "--rules-version",
+        default=None,
+        help="rescore: rules version to apply (default: each event's own, else the current one)",
+    )
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="rescore: only events starting on or after this date",
+    )
+    parser.add_argument(
+        "--max-sleep",
+        type=int,
+        default=3600,
+        help="upper bound in seconds between checks in watch mode (default: 3600)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with connect(args.database) as conn:
+        COMMANDS[args.command](conn, args)
+
+
 if __name__ == "__main__":
     main()
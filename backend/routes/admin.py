@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import time
+from datetime import date
 from typing import Any
 
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, current_app, jsonify, request, g
 
 from backend.auth import (
     clear_current_user,
@@ -16,8 +17,21 @@ from backend.auth import (
     touch_last_login,
     verify_password,
 )
+from backend.cache import get_cache
 from backend.db import get_db
-from backend.season import recalculate_season_points
+from backend.cities import add_alias, city_filter, ensure_city
+from backend.counting import FULL_COUNT, estimate_total, fetch_page
+from backend.days import day_number, parse_date
+from backend.event_payloads import build_payload
+from backend.dialect import placeholders
+from backend.pagination import decode_cursor, next_cursor, parse_limit
+from backend.season import event_rider_ids
+from backend.season_queue import ensure_worker, job_status, queue_status, request_recalculation
+from backend.scoring import rescore_event, score_event
+from backend.search import rider_relevance, rider_search_filter, search_words
+from backend.serialization import Shape
+from backend.simulation import load_standings, simulate
+from backend.versions import bump_versions
 from backend.audit import record_audit
 
 bp = Blueprint("admin", __name__, url_prefix="/api/admin")
@@ -102,19 +116,18 @@ def validate_rider_payload(data: dict[str, Any], partial: bool = False) -> tuple
     return (len(errors) == 0, errors)
 
 
-def serialize_rider(row: Any) -> dict[str, Any]:
-    return {
-        "id": row["id"],
-        "nickname": row["nickname"],
-        "fullname": row["fullname"],
-        "city": row["city"],
-        "birthdate": row["birthdate"],
-        "style": row["style"],
-        "level": row["level"],
-        "photoUrl": row["photo_url"],
-        "email": row["email"],
-        "socialsJson": row["socials_json"],
-    }
+serialize_rider = Shape(
+    id="id",
+    nickname="nickname",
+    fullname="fullname",
+    city="city",
+    birthdate="birthdate",
+    style="style",
+    level="level",
+    photoUrl="photo_url",
+    email="email",
+    socialsJson="socials_json",
+)
 
 
 @bp.get("/riders")
@@ -126,15 +139,21 @@ def admin_list_riders() -> Any:
     style = request.args.get("style")
     city = request.args.get("city")
     page = max(request.args.get("page", type=int) or 1, 1)
-    limit = min(max(request.args.get("limit", type=int) or 50, 1), 200)
+    limit = parse_limit(request.args.get("limit", type=int))
+    after: list[Any] | None = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args["cursor"], (str, int))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
 
     where: list[str] = []
     params: list[Any] = []
 
     if search:
-        like = f"%{search}%"
-        where.append("(lower(nickname) LIKE lower(?) OR lower(COALESCE(fullname,'')) LIKE lower(?))")
-        params.extend([like, like])
+        search_sql, search_params = rider_search_filter(db, search, "riders")
+        where.append(search_sql)
+        params.extend(search_params)
     if level:
         where.append("level = ?")
         params.append(level)
@@ -142,30 +161,67 @@ def admin_list_riders() -> Any:
         where.append("style = ?")
         params.append(style)
     if city:
-        where.append("lower(city) LIKE lower(?)")
-        params.append(f"%{city}%")
+        city_sql, city_params = city_filter(db, city, "riders.city_id")
+        where.append(city_sql)
+        params.extend(city_params)
 
     where_sql = " AND ".join(where)
     if where_sql:
         where_sql = "WHERE " + where_sql
 
-    total = db.execute(
-        f"SELECT COUNT(*) FROM riders {where_sql}",
-        params,
-    ).fetchone()[0]
+    # sort=relevance (with search): best full-text matches first, page numbers only
+    relevance = bool(search) and request.args.get("sort") == "relevance"
+    if relevance and after is not None:
+        return jsonify({"error": "cursor is not supported with sort=relevance"}), 400
+    join_sql, join_params, order_sql = "", [], "riders.created_at DESC, riders.id DESC"
+    if relevance:
+        join_sql, join_params, order_sql = rider_relevance(db, search, "riders")
 
     offset = (page - 1) * limit
-    rows = db.execute(
-        f"SELECT * FROM riders {where_sql} ORDER BY created_at DESC LIMIT ? OFFSET ?",
-        (*params, limit, offset),
-    ).fetchall()
-
-    return jsonify({
-        "items": [serialize_rider(row) for row in rows],
+    page_where, page_params = where_sql, list(params)
+    if after is not None:
+        offset = 0
+        page_where = "WHERE " + " AND ".join([*where, "(created_at, id) < (?, ?)"])
+        page_params.extend(after)
+
+    def run_page(with_count: bool) -> list[Any]:
+        count_column = f", COUNT(*) OVER () AS {FULL_COUNT}" if with_count else ""
+        return db.execute(
+            f"""
+            SELECT riders.*{count_column}
+            FROM riders {join_sql}
+            {page_where}
+            ORDER BY {order_sql}
+            LIMIT ? OFFSET ?
+            """,
+            (*join_params, *page_params, limit + 1, offset),
+        ).fetchall()
+
+    def count() -> int:
+        return db.execute(f"SELECT COUNT(*) FROM riders {where_sql}", params).fetchone()[0]
+
+    estimated = False
+    # word searches read the full-text index, which a sample would run in full anyway
+    if search and not search_words(search) and request.args.get("estimateTotal") == "1":
+        rows = run_page(False)
+        total, estimated = estimate_total(
+            db, "admin_riders", ("riders",), "riders", "riders", where_sql, params, count
+        )
+    else:
+        rows, total = fetch_page(
+            db, "admin_riders", ("riders",), where_sql, params, run_page, count, single_pass=after is None
+        )
+
+    payload = {
+        "items": serialize_rider.many(rows[:limit]),
         "total": total,
-        "page": page,
+        "page": page if after is None else None,
         "limit": limit,
-    })
+        "nextCursor": None if relevance else next_cursor(rows, limit, ("created_at", "id")),
+    }
+    if estimated:
+        payload["totalEstimated"] = True
+    return jsonify(payload)
 
 
 @bp.post("/riders")
@@ -177,6 +233,7 @@ def admin_create_rider() -> Any:
         return jsonify({"errors": errors}), 400
 
     db = get_db()
+    ensure_city(db, data.get("city"))
     cursor = db.execute(
         """
         INSERT INTO riders (nickname, fullname, city, birthdate, style, level, photo_url, email, socials_json)
@@ -196,9 +253,11 @@ def admin_create_rider() -> Any:
     )
     rider_id = cursor.lastrowid
     row = db.execute("SELECT * FROM riders WHERE id = ?", (rider_id,)).fetchone()
+    job_id = request_recalculation(db, [rider_id])
+    bump_versions(db, "riders")
     record_audit("rider", rider_id, "create", {"nickname": data.get("nickname"), "city": data.get("city")})
     db.commit()
-    return jsonify({"rider": serialize_rider(row)}), 201
+    return jsonify({"rider": serialize_rider(row), "seasonJob": job_id}), 201
 
 
 @bp.put("/riders/<int:rider_id>")
@@ -214,6 +273,7 @@ def admin_update_rider(rider_id: int) -> Any:
     if not existing:
         return jsonify({"error": "Not found"}), 404
 
+    ensure_city(db, data.get("city"))
     db.execute(
         """
         UPDATE riders
@@ -243,9 +303,14 @@ def admin_update_rider(rider_id: int) -> Any:
         ),
     )
     row = db.execute("SELECT * FROM riders WHERE id = ?", (rider_id,)).fetchone()
+    job_id = None
+    if any(data.get(key) is not None for key in ("city", "birthdate", "style", "level")):
+        # category ranks only; the rider's points are unchanged
+        job_id = request_recalculation(db, [rider_id])
+    bump_versions(db, "riders")
     record_audit("rider", rider_id, "update", {key: data.get(key) for key in data.keys()})
     db.commit()
-    return jsonify({"rider": serialize_rider(row)})
+    return jsonify({"rider": serialize_rider(row), "seasonJob": job_id})
 
 
 @bp.delete("/riders/<int:rider_id>")
@@ -255,9 +320,11 @@ def admin_delete_rider(rider_id: int) -> Any:
     cursor = db.execute("DELETE FROM riders WHERE id = ?", (rider_id,))
     if cursor.rowcount == 0:
         return jsonify({"error": "Not found"}), 404
+    job_id = request_recalculation(db, [rider_id])
+    bump_versions(db, "riders")
     record_audit("rider", rider_id, "delete", {})
     db.commit()
-    return jsonify({"message": "Deleted"})
+    return jsonify({"message": "Deleted", "seasonJob": job_id})
 
 
 # Events management ---------------------------------------------------------
@@ -285,36 +352,32 @@ def validate_event_payload(data: dict[str, Any], partial: bool = False) -> tuple
     return (len(errors) == 0, errors)
 
 
-def serialize_event(row: Any) -> dict[str, Any]:
-    return {
-        "id": row["id"],
-        "name": row["name"],
-        "dateStart": row["date_start"],
-        "dateEnd": row["date_end"],
-        "city": row["city"],
-        "level": row["level"],
-        "participantsCount": row["participants_count"],
-        "style": row["style"],
-        "hasBestTrick": bool(row["has_best_trick"]),
-        "sourceUrl": row["source_url"],
-        "organizerContact": row["organizer_contact"],
-        "status": row["status"],
-    }
-
+serialize_event = Shape(
+    id="id",
+    name="name",
+    dateStart="date_start",
+    dateEnd="date_end",
+    city="city",
+    level="level",
+    participantsCount="participants_count",
+    style="style",
+    hasBestTrick=("has_best_trick", bool),
+    sourceUrl="source_url",
+    organizerContact="organizer_contact",
+    status="status",
+)
 
-@bp.get("/events")
-@login_required("editor")
-def admin_list_events() -> Any:
-    db = get_db()
-    status = request.args.get("status")
-    level = request.args.get("level")
-    city = request.args.get("city")
-    search = request.args.get("search")
-    date_from = request.args.get("date_from")
-    date_to = request.args.get("date_to")
-    page = max(request.args.get("page", type=int) or 1, 1)
-    limit = min(max(request.args.get("limit", type=int) or 50, 1), 200)
 
+def event_filters(
+    db: Any,
+    status: str | None,
+    level: str | None,
+    city: str | None,
+    search: str | None,
+    date_from: date | None,
+    date_to: date | None,
+) -> tuple[list[str], list[Any]]:
+    """``WHERE`` clauses on ``events`` for the admin list filters."""
     where: list[str] = []
     params: list[Any] = []
     if status:
@@ -324,38 +387,85 @@ def admin_list_events() -> Any:
         where.append("level = ?")
         params.append(level)
     if city:
-        where.append("lower(city) LIKE lower(?)")
-        params.append(f"%{city}%")
+        city_sql, city_params = city_filter(db, city, "city_id")
+        where.append(city_sql)
+        params.extend(city_params)
     if search:
         where.append("lower(name) LIKE lower(?)")
         params.append(f"%{search}%")
     if date_from:
-        where.append("date(date_start) >= date(?)")
-        params.append(date_from)
+        where.append("start_day >= ?")
+        params.append(day_number(date_from))
     if date_to:
-        where.append("date(date_start) <= date(?)")
-        params.append(date_to)
+        where.append("start_day <= ?")
+        params.append(day_number(date_to))
+    return where, params
+
+
+def events_page_query(
+    where: list[str],
+    params: list[Any],
+    after: list[Any] | None,
+    limit: int,
+    offset: int,
+    with_count: bool = False,
+) -> tuple[str, tuple[Any, ...]]:
+    """One page of the admin events list, newest first, after an optional cursor key."""
+    page_where, page_params = list(where), list(params)
+    if after is not None:
+        page_where.append("(date_start, id) < (?, ?)")
+        page_params.extend(after)
+    where_sql = ("WHERE " + " AND ".join(page_where)) if page_where else ""
+    count_column = f", COUNT(*) OVER () AS {FULL_COUNT}" if with_count else ""
+    sql = f"SELECT *{count_column} FROM events {where_sql} ORDER BY date_start DESC, id DESC LIMIT ? OFFSET ?"
+    return sql, (*page_params, limit, offset)
+
 
+@bp.get("/events")
+@login_required("editor")
+def admin_list_events() -> Any:
+    db = get_db()
+    status = request.args.get("status")
+    level = request.args.get("level")
+    city = request.args.get("city")
+    search = request.args.get("search")
+    try:
+        date_from = parse_date(request.args.get("date_from"))
+        date_to = parse_date(request.args.get("date_to"))
+    except ValueError:
+        return jsonify({"error": "Invalid date filter"}), 400
+    page = max(request.args.get("page", type=int) or 1, 1)
+    limit = parse_limit(request.args.get("limit", type=int))
+    after: list[Any] | None = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args["cursor"], (str, int))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    where, params = event_filters(db, status, level, city, search, date_from, date_to)
     where_sql = " AND ".join(where)
     if where_sql:
         where_sql = "WHERE " + where_sql
 
-    total = db.execute(
-        f"SELECT COUNT(*) FROM events {where_sql}",
-        params,
-    ).fetchone()[0]
+    offset = 0 if after is not None else (page - 1) * limit
 
-    offset = (page - 1) * limit
-    rows = db.execute(
-        f"SELECT * FROM events {where_sql} ORDER BY date_start DESC LIMIT ? OFFSET ?",
-        (*params, limit, offset),
-    ).fetchall()
+    def run_page(with_count: bool) -> list[Any]:
+        return db.execute(*events_page_query(where, params, after, limit + 1, offset, with_count)).fetchall()
+
+    def count() -> int:
+        return db.execute(f"SELECT COUNT(*) FROM events {where_sql}", params).fetchone()[0]
+
+    rows, total = fetch_page(
+        db, "admin_events", ("events",), where_sql, params, run_page, count, single_pass=after is None
+    )
 
     return jsonify({
-        "items": [serialize_event(row) for row in rows],
+        "items": serialize_event.many(rows[:limit]),
         "total": total,
-        "page": page,
+        "page": page if after is None else None,
         "limit": limit,
+        "nextCursor": next_cursor(rows, limit, ("date_start", "id")),
     })
 
 
@@ -368,6 +478,7 @@ def admin_create_event() -> Any:
         return jsonify({"errors": errors}), 400
 
     db = get_db()
+    ensure_city(db, data.get("city"))
     cursor = db.execute(
         """
         INSERT INTO events (
@@ -391,9 +502,12 @@ def admin_create_event() -> Any:
     )
     event_id = cursor.lastrowid
     row = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
-    recalculate_season_points(db)
+    # A new event has no results yet, so nobody's season points change.
+    bump_versions(db, "events")
     record_audit("event", event_id, "create", {"name": data.get("name"), "status": row["status"]})
     db.commit()
+    if row["status"] == "published":
+        build_payload(db, event_id)
     return jsonify({"event": serialize_event(row)}), 201
 
 
@@ -410,6 +524,7 @@ def admin_update_event(event_id: int) -> Any:
     if not existing:
         return jsonify({"error": "Not found"}), 404
 
+    ensure_city(db, data.get("city"))
     db.execute(
         """
         UPDATE events
@@ -443,11 +558,14 @@ def admin_update_event(event_id: int) -> Any:
         ),
     )
     row = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
-    if row["status"] == "published":
-        recalculate_season_points(db)
+    if data.get("level") is not None or data.get("participants_count") is not None:
+        rescore_event(db, event_id)
+    job_id = request_recalculation(db, event_rider_ids(db, event_id))
+    bump_versions(db, "events", "results")
     record_audit("event", event_id, "update", {key: data.get(key) for key in data.keys()})
     db.commit()
-    return jsonify({"event": serialize_event(row)})
+    build_payload(db, event_id)
+    return jsonify({"event": serialize_event(row), "seasonJob": job_id})
 
 
 @bp.post("/events/<int:event_id>/publish")
@@ -461,26 +579,28 @@ def admin_publish_event(event_id: int) -> Any:
     if cursor.rowcount == 0:
         return jsonify({"error": "Not found"}), 404
     row = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
-    recalculate_season_points(db)
+    job_id = request_recalculation(db, event_rider_ids(db, event_id))
+    bump_versions(db, "events")
     record_audit("event", event_id, "publish", {})
     db.commit()
-    return jsonify({"event": serialize_event(row)})
+    # pre-render the event page before the first visitors arrive
+    build_payload(db, event_id)
+    return jsonify({"event": serialize_event(row), "seasonJob": job_id})
 
 
 # Results management --------------------------------------------------------
 
 
-def serialize_result(row: Any) -> dict[str, Any]:
-    return {
-        "id": row["id"],
-        "eventId": row["event_id"],
-        "riderId": row["rider_id"],
-        "place": row["place"],
-        "isFinalist": bool(row["is_finalist"]),
-        "isParticipant": bool(row["is_participant"]),
-        "points": row["points"],
-        "comment": row["comment"],
-    }
+serialize_result = Shape(
+    id="id",
+    eventId="event_id",
+    riderId="rider_id",
+    place="place",
+    isFinalist=("is_finalist", bool),
+    isParticipant=("is_participant", bool),
+    points="points",
+    comment="comment",
+)
 
 
 @bp.get("/results")
@@ -494,7 +614,7 @@ def admin_list_results() -> Any:
         "SELECT * FROM results WHERE event_id = ? ORDER BY place IS NULL, place ASC",
         (event_id,),
     ).fetchall()
-    return jsonify({"items": [serialize_result(row) for row in rows]})
+    return jsonify({"items": serialize_result.many(rows)})
 
 
 @bp.put("/results/<int:result_id>")
@@ -516,6 +636,7 @@ def admin_update_result(result_id: int) -> Any:
             is_finalist = COALESCE(?, is_finalist),
             is_participant = COALESCE(?, is_participant),
             points = COALESCE(?, points),
+            points_overridden = CASE WHEN ? IS NULL THEN points_overridden ELSE 1 END,
             comment = COALESCE(?, comment)
         WHERE id = ?
         """,
@@ -524,26 +645,197 @@ def admin_update_result(result_id: int) -> Any:
             int(data.get("isFinalist")) if data.get("isFinalist") is not None else None,
             int(data.get("isParticipant")) if data.get("isParticipant") is not None else None,
             data.get("points"),
+            data.get("points"),
             data.get("comment"),
             result_id,
         ),
     )
+    affected = {existing["rider_id"]}
+    if any(data.get(key) is not None for key in ("place", "isFinalist", "isParticipant")):
+        # keeps manually overridden points, see scoring.rescore_event
+        affected.update(rescore_event(db, existing["event_id"]))
     row = db.execute("SELECT * FROM results WHERE id = ?", (result_id,)).fetchone()
-    # recalc season points for rider
+    bump_versions(db, "results")
     record_audit("result", result_id, "update", {key: data.get(key) for key in data.keys()})
-    recalculate_season_points(db)
+    job_id = request_recalculation(db, affected)
     db.commit()
-    return jsonify({"result": serialize_result(row)})
+    build_payload(db, existing["event_id"])
+    return jsonify({"result": serialize_result(row), "seasonJob": job_id})
 
 
 @bp.post("/recalculate-season")
 @login_required("editor")
 def admin_recalculate_season() -> Any:
     db = get_db()
-    recalculate_season_points(db)
+    job_id = request_recalculation(db)
     record_audit("system", None, "recalculate_season", {})
     db.commit()
-    return jsonify({"message": "Season points recalculated"})
+    return jsonify({"message": "Season recalculation queued", "seasonJob": job_id}), 202
+
+
+@bp.get("/season/status")
+@login_required("editor")
+def admin_season_status() -> Any:
+    """Queue length and the ``seasonUpdatedAt`` watermark of the standings."""
+    ensure_worker()  # picks up jobs left over from a restart
+    return jsonify(queue_status(get_db()))
+
+
+@bp.get("/season/jobs/<int:job_id>")
+@login_required("editor")
+def admin_season_job(job_id: int) -> Any:
+    db = get_db()
+    job = job_status(db, job_id)
+    if job is None:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"job": job, **queue_status(db)})
+
+
+@bp.post("/cities/<int:city_id>/aliases")
+@login_required("editor")
+def admin_add_city_alias(city_id: int) -> Any:
+    """Map another spelling to a city, merging the city it named before."""
+    data = request.get_json(silent=True) or {}
+    alias = (data.get("alias") or "").strip()
+    if not alias:
+        return jsonify({"error": "alias is required"}), 400
+    db = get_db()
+    if not db.execute("SELECT 1 FROM cities WHERE id = ?", (city_id,)).fetchone():
+        return jsonify({"error": "Not found"}), 404
+
+    merged = add_alias(db, city_id, alias)
+    job_id = None
+    if merged is not None:
+        # city ranks are partitioned by city_id
+        rider_ids = [row[0] for row in db.execute("SELECT id FROM riders WHERE city_id = ?", (city_id,))]
+        job_id = request_recalculation(db, rider_ids)
+        bump_versions(db, "riders", "events")
+    record_audit("system", city_id, "city_alias", {"alias": alias, "merged": merged})
+    db.commit()
+    row = db.execute("SELECT id, name, riders_count, events_count FROM cities WHERE id = ?", (city_id,)).fetchone()
+    return jsonify({
+        "city": {"id": row["id"], "name": row["name"], "riders": row["riders_count"], "events": row["events_count"]},
+        "mergedCityId": merged,
+        "seasonJob": job_id,
+    })
+
+
+@bp.get("/cache")
+@login_required("editor")
+def admin_cache_stats() -> Any:
+    """Hit and miss counters of this process's public response cache."""
+    return jsonify(get_cache().stats())
+
+
+@bp.delete("/cache")
+@login_required("admin")
+def admin_cache_clear() -> Any:
+    get_cache().clear()
+    return jsonify({"message": "Cache cleared"})
+
+
+@bp.post("/simulate")
+@login_required("editor")
+def admin_simulate_event() -> Any:
+    """Show how an event would move the rating, without writing anything.
+
+    Body: ``eventId`` of an existing (usually draft) event and/or an
+    ``event`` object (``dateStart``, ``level``, ``participantsCount``) with
+    hypothetical attributes, plus optional ``results`` items (``riderId`` and
+    either ``points`` or ``place``/``isFinalist``/``isParticipant``).
+    Without ``results`` the stored results of ``eventId`` are used. The
+    event's currently counted results are replaced by the simulated ones.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+    db = get_db()
+    event_id = data.get("eventId")
+    overrides = data.get("event") or {}
+    if not isinstance(overrides, dict):
+        return jsonify({"error": "event must be an object"}), 400
+    try:
+        event_id = None if event_id is None else int(event_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "eventId must be an integer"}), 400
+
+    stored = None
+    stored_results: list[tuple[int, int]] = []
+    if event_id is not None:
+        stored = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+        if not stored:
+            return jsonify({"error": "Not found"}), 404
+        stored_results = [
+            (row["rider_id"], row["points"])
+            for row in db.execute("SELECT rider_id, points FROM results WHERE event_id = ?", (event_id,))
+        ]
+
+    level = overrides.get("level") or (stored["level"] if stored else None)
+    participants = overrides.get("participantsCount", stored["participants_count"] if stored else None)
+    date_start = overrides.get("dateStart") or (stored["date_start"] if stored else None)
+    if level not in {"local", "regional", "national", "international"}:
+        return jsonify({"error": "Invalid level"}), 400
+    try:
+        participants = None if participants is None else int(participants)
+    except (TypeError, ValueError):
+        return jsonify({"error": "participantsCount must be an integer"}), 400
+    try:
+        event_date = date.fromisoformat(str(date_start)[:10])
+    except ValueError:
+        return jsonify({"error": "Invalid dateStart"}), 400
+
+    if "results" in data:
+        proposed = data.get("results") or []
+        if not isinstance(proposed, list) or not all(
+            isinstance(item, dict) and item.get("riderId") for item in proposed
+        ):
+            return jsonify({"error": "Every result needs a riderId"}), 400
+        try:
+            proposed_ids = [int(item["riderId"]) for item in proposed]
+            fixed_points = [None if item.get("points") is None else int(item["points"]) for item in proposed]
+        except (TypeError, ValueError):
+            return jsonify({"error": "riderId and points must be integers"}), 400
+        rows = [
+            {
+                "place": item.get("place"),
+                "is_finalist": bool(item.get("isFinalist")),
+                "is_participant": bool(item.get("isParticipant", True)),
+            }
+            for item in proposed
+        ]
+        scored = score_event(level, participants, rows)
+        added = [
+            (rider_id, points if fixed is None else fixed)
+            for rider_id, fixed, points in zip(proposed_ids, fixed_points, scored)
+        ]
+    elif stored:
+        added = stored_results
+    else:
+        return jsonify({"error": "eventId or results is required"}), 400
+
+    rider_ids = sorted({rider_id for rider_id, _ in added})
+    known: dict[int, str] = {}
+    if rider_ids:
+        rows = db.execute(f"SELECT id, nickname FROM riders WHERE id IN ({placeholders(len(rider_ids))})", rider_ids)
+        known = {row["id"]: row["nickname"] for row in rows}
+    missing = [rider_id for rider_id in rider_ids if rider_id not in known]
+    if missing:
+        return jsonify({"error": "Unknown riders", "riderIds": missing}), 400
+
+    standings = load_standings(db, str(current_app.config["DATABASE_PATH"]))
+    removed: list[tuple[int, int]] = []
+    if stored and standings.in_window(date.fromisoformat(str(stored["date_start"])[:10])):
+        removed = stored_results
+    in_window = standings.in_window(event_date)
+    outcome = simulate(standings, removed, added if in_window else [])
+    for item in outcome["riders"]:
+        item["nickname"] = known.get(item["riderId"])
+
+    return jsonify({
+        "event": {"id": event_id, "dateStart": event_date.isoformat(), "level": level, "inWindow": in_window},
+        "seasonVersion": standings.version,
+        **outcome,
+    })
 
 
 @bp.post("/results/import-csv")
@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
+import csv
+import io
+from array import array
 from datetime import date, timedelta
-from typing import Any
-
-from flask import Blueprint, jsonify, request
-
+from functools import lru_cache, partial
+from typing import Any, Iterator
+
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+
+from backend.cache import cached_response, get_cache
+from backend.compare import SCOPES as COMPARE_SCOPES, pair_summary, rider_pairs, shared_results
+from backend.cards import CARD_RESULTS_LIMIT, SEASON_RESULT, build_card, season_results
+from backend.cities import city_filter, matching_city_ids
+from backend.conditional import conditional
+from backend.counting import FULL_COUNT, cached_count, estimate_total, fetch_page
+from backend.days import day_number, parse_date
 from backend.db import get_db
+from backend.dialect import placeholders
+from backend.event_payloads import EVENT_SUMMARY, build_payload, event_payload, payload_response
+from backend.leaderboard import fetch_riders, get_leaderboard
+from backend.pagination import decode_cursor, next_cursor, parse_limit
+from backend.search import matching_rider_ids, rider_search_filter, search_words
+from backend.serialization import Shape
+from backend.snapshots import SNAPSHOT_AS_OF_SQL
+from backend.stats import SCOPES as STATS_SCOPES, load_stats
+from backend.versions import generation
 
 bp = Blueprint("public", __name__, url_prefix="/api")
 
@@ -26,9 +46,41 @@ def parse_int(value: str | None, default: int | None = None) -> int | None:
         return default
 
 
-@bp.get("/rating")
-def get_rating() -> Any:
-    db = get_db()
+def parse_as_of() -> date | None:
+    """Parse the optional ``asOf`` (YYYY-MM-DD) query parameter.
+
+    Raises ``ValueError`` for malformed dates.
+    """
+    value = request.args.get("asOf")
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
+def season_points_join(as_of: date | None) -> tuple[str, list[Any]]:
+    """Return the join providing ``sp.season_points`` (current or historical)."""
+    if as_of is None:
+        return "LEFT JOIN season_points AS sp ON sp.rider_id = r.id", []
+    return (
+        f"LEFT JOIN ({SNAPSHOT_AS_OF_SQL}) AS sp ON sp.rider_id = r.id",
+        [as_of.isoformat(), as_of.isoformat()],
+    )
+
+
+RATING_PARAMS = (
+    "city", "level", "style", "search", "ageMin", "ageMax", "allAges",
+    "page", "limit", "cursor", "asOf", "estimateTotal",
+)
+EVENTS_PARAMS = ("city", "level", "from", "to", "when", "limit", "cursor")
+# A rider profile shows their results, events and season standing.
+RIDER_SCOPES = ("riders", "results", "events", "season")
+
+
+def rating_filters(db: Any, as_of: date | None) -> tuple[list[str], list[Any], int | None, int | None]:
+    """``WHERE`` clauses on ``riders AS r`` for the rating filters of the request.
+
+    Also returns the birth day range of the age filter (``None`` when open).
+    """
     city = request.args.get("city")
     level = request.args.get("level")
     style = request.args.get("style")
@@ -36,15 +88,14 @@ def get_rating() -> Any:
     age_min = parse_int(request.args.get("ageMin"))
     age_max = parse_int(request.args.get("ageMax"))
     all_ages = request.args.get("allAges") == "1"
-    page = max(parse_int(request.args.get("page"), 1) or 1, 1)
-    limit = parse_int(request.args.get("limit"), 50) or 50
 
     where_clauses: list[str] = []
     params: list[Any] = []
 
     if city:
-        where_clauses.append("r.city LIKE ?")
-        params.append(f"%{city}%")
+        city_sql, city_params = city_filter(db, city, "r.city_id")
+        where_clauses.append(city_sql)
+        params.extend(city_params)
     if level:
         where_clauses.append("r.level = ?")
         params.append(level)
@@ -52,64 +103,305 @@ def get_rating() -> Any:
         where_clauses.append("r.style = ?")
         params.append(style)
     if search:
-        where_clauses.append("(lower(r.nickname) LIKE lower(?) OR lower(COALESCE(r.fullname, '')) LIKE lower(?))")
-        params.extend([f"%{search}%", f"%{search}%"])
+        search_sql, search_params = rider_search_filter(db, search, "r")
+        where_clauses.append(search_sql)
+        params.extend(search_params)
+    min_birth_day = max_birth_day = None
     if not all_ages:
-        today = date.today()
+        today = as_of or date.today()
         if age_min is not None:
-            max_birth = subtract_years(today, age_min)
-            where_clauses.append("date(r.birthdate) <= date(?)")
-            params.append(max_birth.isoformat())
+            max_birth_day = day_number(subtract_years(today, age_min))
+            where_clauses.append("r.birth_day <= ?")
+            params.append(max_birth_day)
         if age_max is not None:
-            min_birth = subtract_years(today, age_max + 1) + timedelta(days=1)
-            where_clauses.append("date(r.birthdate) >= date(?)")
-            params.append(min_birth.isoformat())
+            min_birth_day = day_number(subtract_years(today, age_max + 1) + timedelta(days=1))
+            where_clauses.append("r.birth_day >= ?")
+            params.append(min_birth_day)
+    return where_clauses, params, min_birth_day, max_birth_day
+
+
+def rating_page_query(
+    as_of: date | None,
+    where_clauses: list[str],
+    params: list[Any],
+    after: list[Any] | None,
+    limit: int,
+    offset: int,
+    with_count: bool = False,
+) -> tuple[str, tuple[Any, ...]]:
+    """The SQL rating page for ``rating_filters`` output, after an optional cursor key."""
+    season_join, join_params = season_points_join(as_of)
+    if as_of:
+        rank_column, rank_join = "sp.season_rank", ""
+    else:
+        rank_column, rank_join = "rk.rank_global", "LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id"
+    page_clauses, page_params = list(where_clauses), list(params)
+    if after is not None:
+        page_clauses.append(
+            "(COALESCE(sp.season_points, 0) < ? OR (COALESCE(sp.season_points, 0) = ? AND r.id > ?))"
+        )
+        page_params.extend([after[0], after[0], after[1]])
+    page_where = ("WHERE " + " AND ".join(page_clauses)) if page_clauses else ""
+    count_column = f", COUNT(*) OVER () AS {FULL_COUNT}" if with_count else ""
+    sql = f"""
+        SELECT r.id, r.nickname, r.fullname, r.city, r.birthdate, r.style, r.level,
+               COALESCE(sp.season_points, 0) AS season_points, {rank_column} AS rank{count_column}
+        FROM riders AS r
+        {season_join}
+        {rank_join}
+        {page_where}
+        ORDER BY season_points DESC, r.id ASC
+        LIMIT ? OFFSET ?
+    """
+    return sql, (*join_params, *page_params, limit, offset)
+
+
+@bp.get("/rating")
+@conditional("rating", ("riders", "season"), RATING_PARAMS)
+@cached_response("rating", ("riders", "season"), RATING_PARAMS)
+def get_rating() -> Any:
+    db = get_db()
+    city = request.args.get("city")
+    level = request.args.get("level")
+    style = request.args.get("style")
+    search = request.args.get("search")
+    page = max(parse_int(request.args.get("page"), 1) or 1, 1)
+    limit = parse_limit(request.args.get("limit"))
+    try:
+        as_of = parse_as_of()
+    except ValueError:
+        return jsonify({"error": "Invalid asOf date"}), 400
+    after: list[Any] | None = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args["cursor"], (int, int))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    where_clauses, params, min_birth_day, max_birth_day = rating_filters(db, as_of)
 
     where_sql = " AND ".join(where_clauses)
     if where_sql:
         where_sql = "WHERE " + where_sql
 
-    count_sql = f"""
-        SELECT COUNT(*)
-        FROM riders AS r
-        LEFT JOIN season_points AS sp ON sp.rider_id = r.id
-        {where_sql}
+    def count() -> int:
+        # season_points and snapshots hold at most one row per rider, so the
+        # filters alone decide the total
+        return db.execute(f"SELECT COUNT(*) FROM riders AS r {where_sql}", params).fetchone()[0]
+
+    # With a cursor (season points and id of the last row seen) the page
+    # starts right after that key instead of skipping ``offset`` rows.
+    offset = (page - 1) * limit if after is None else 0
+    estimated = False
+    fast_path = False
+    # Current standings come from the worker's in-memory leaderboard;
+    # historical ones (asOf) always go to the database.
+    in_memory = as_of is None and current_app.config.get("LEADERBOARD", "memory") == "memory"
+    if not in_memory and not where_clauses and as_of is None:
+        total = cached_count(db, "rating", ("riders",), where_sql, params, count)
+        ranked = cached_count(
+            db, "rider_ranks", ("riders", "season"), "", (),
+            lambda: db.execute("SELECT COUNT(*) FROM rider_ranks").fetchone()[0],
+        )
+        fast_path = ranked == total
+    if in_memory:
+        rows, total = leaderboard_page(
+            db, city, level, style, search, min_birth_day, max_birth_day, after, offset, limit
+        )
+    elif fast_path:
+        # Unfiltered rating: the page is a position range on idx_rider_ranks_position.
+        start = offset if after is None else rating_position(db, after[0], after[1])
+        rows = db.execute(
+            """
+            SELECT r.id, r.nickname, r.fullname, r.city, r.birthdate, r.style, r.level,
+                   rk.season_points, rk.rank_global AS rank
+            FROM rider_ranks AS rk
+            JOIN riders AS r ON r.id = rk.rider_id
+            WHERE rk.position > ? AND rk.position <= ?
+            ORDER BY rk.position
+            """,
+            (start, start + limit + 1),
+        ).fetchall()
+    else:
+
+        def run_page(with_count: bool) -> list[Any]:
+            query = rating_page_query(as_of, where_clauses, params, after, limit + 1, offset, with_count)
+            return db.execute(*query).fetchall()
+
+        # word searches read the full-text index, which a sample would run in full anyway
+        if search and not search_words(search) and request.args.get("estimateTotal") == "1":
+            rows = run_page(False)
+            total, estimated = estimate_total(db, "rating", ("riders",), "riders", "r", where_sql, params, count)
+        else:
+            rows, total = fetch_page(
+                db, "rating", ("riders",), where_sql, params, run_page, count, single_pass=after is None
+            )
+
+    payload: dict[str, Any] = {
+        "items": rating_shape(as_of or date.today()).many(rows[:limit]),
+        "total": total,
+        "page": page if after is None else None,
+        "limit": limit,
+        "nextCursor": next_cursor(rows, limit, ("season_points", "id")),
+    }
+    if estimated:
+        payload["totalEstimated"] = True
+    if as_of:
+        payload["asOf"] = as_of.isoformat()
+    return jsonify(payload)
+
+
+# Query parameters of /api/rating/export: the rating filters and the format.
+EXPORT_PARAMS = ("city", "level", "style", "search", "ageMin", "ageMax", "allAges", "asOf", "format")
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = ("id", "nickname", "fullname", "city", "birthdate", "age", "style", "level", "seasonPoints", "rank")
+# rows per chunk handed to the WSGI server, read by one query each
+EXPORT_CHUNK_ROWS = 500
+
+
+@bp.get("/rating/export")
+@conditional("rating-export", ("riders", "season"), EXPORT_PARAMS, max_age=300)
+def export_rating() -> Any:
+    """The whole rating, with the ``get_rating`` filters, as CSV or NDJSON.
+
+    The rating order is read up front as a compact id array; every chunk
+    is then its own primary-key query. No statement stays open while the
+    client downloads, so a slow mirror never holds a read lock that blocks
+    admin writes or the season worker. Memory stays at eight bytes per
+    rider; mirrors revalidate against the ETag.
     """
-    total = db.execute(count_sql, params).fetchone()[0]
-
-    offset = (page - 1) * limit
-    query_sql = f"""
-        SELECT r.id, r.nickname, r.fullname, r.city, r.birthdate, r.style, r.level,
-               COALESCE(sp.season_points, 0) AS season_points
+    export_format = request.args.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        as_of = parse_as_of()
+    except ValueError:
+        return jsonify({"error": "Invalid asOf date"}), 400
+    db = get_db()
+    season_join, join_params = season_points_join(as_of)
+    if as_of:
+        rank_column, rank_join = "sp.season_rank", ""
+    else:
+        rank_column, rank_join = "rk.rank_global", "LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id"
+    where_clauses, params, _, _ = rating_filters(db, as_of)
+    where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+    order = db.execute(
+        f"""
+        SELECT r.id
         FROM riders AS r
-        LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+        {season_join}
         {where_sql}
-        ORDER BY season_points DESC, r.id ASC
-        LIMIT ? OFFSET ?
-    """
-    rows = db.execute(query_sql, (*params, limit, offset)).fetchall()
-
-    items = []
-    for row in rows:
-        age = calculate_age(row["birthdate"])
-        items.append(
-            {
-                "id": row["id"],
-                "nickname": row["nickname"],
-                "fullname": row["fullname"],
-                "city": row["city"],
-                "birthdate": row["birthdate"],
-                "age": age,
-                "style": row["style"],
-                "level": row["level"],
-                "seasonPoints": row["season_points"],
-            }
+        ORDER BY COALESCE(sp.season_points, 0) DESC, r.id ASC
+        """,
+        (*join_params, *params),
+    )
+    rider_ids = array("q", (row[0] for row in order))
+
+    def chunks() -> Iterator[list[Any]]:
+        for start in range(0, len(rider_ids), EXPORT_CHUNK_ROWS):
+            batch = rider_ids[start : start + EXPORT_CHUNK_ROWS]
+            rows = db.execute(
+                f"""
+                SELECT r.id, r.nickname, r.fullname, r.city, r.birthdate, r.style, r.level,
+                       COALESCE(sp.season_points, 0) AS season_points, {rank_column} AS rank
+                FROM riders AS r
+                {season_join}
+                {rank_join}
+                WHERE r.id IN ({placeholders(len(batch))})
+                """,
+                (*join_params, *batch),
+            ).fetchall()
+            by_id = {row["id"]: row for row in rows}
+            # riders deleted since the order was read are skipped
+            yield [by_id[rider_id] for rider_id in batch if rider_id in by_id]
+
+    def values(row: Any) -> tuple:
+        return (
+            row["id"], row["nickname"], row["fullname"], row["city"], row["birthdate"],
+            calculate_age(row["birthdate"], as_of), row["style"], row["level"], row["season_points"], row["rank"],
         )
 
-    return jsonify({"items": items, "total": total, "page": page, "limit": limit})
+    def generate_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in chunks():
+            writer.writerows(values(row) for row in chunk)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def generate_ndjson() -> Iterator[str]:
+        dumps = current_app.json.dumps
+        shape = rating_shape(as_of or date.today())
+        for chunk in chunks():
+            yield "".join(dumps(item, separators=(",", ":")) + "\n" for item in shape.many(chunk))
+
+    generate = generate_csv if export_format == "csv" else generate_ndjson
+    response = current_app.response_class(
+        stream_with_context(generate()), mimetype=EXPORT_FORMATS[export_format]
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="rating.{export_format}"'
+    return response
+
+
+def leaderboard_page(
+    db: Any,
+    city: str | None,
+    level: str | None,
+    style: str | None,
+    search: str | None,
+    min_birth_day: int | None,
+    max_birth_day: int | None,
+    after: list[Any] | None,
+    offset: int,
+    limit: int,
+) -> tuple[list[dict[str, Any]], int]:
+    """Rating rows (``limit + 1`` at most) and total from the in-memory leaderboard."""
+    board = get_leaderboard(db, str(current_app.config["DATABASE_PATH"]))
+    mask = board.mask(
+        city_ids=matching_city_ids(db, city) if city else None,
+        level=level,
+        style=style,
+        rider_ids=matching_rider_ids(db, search) if search else None,
+        min_birth_day=min_birth_day,
+        max_birth_day=max_birth_day,
+    )
+    start = 0 if after is None else board.position_after(after[0], after[1])
+    positions = board.page(mask, start, offset, limit + 1)
+    riders = fetch_riders(db, [board.ids[position] for position in positions])
+    rows = [
+        {
+            **riders[board.ids[position]],
+            "season_points": board.points[position],
+            "rank": board.ranks[position] or None,
+        }
+        for position in positions
+        if board.ids[position] in riders
+    ]
+    return rows, mask.bit_count()
 
 
-def calculate_age(birthdate: str | None) -> int | None:
+def rating_position(db: Any, season_points: int, rider_id: int) -> int:
+    """Position of the last row sorting at or before ``(season_points, rider_id)``."""
+    row = db.execute(
+        "SELECT position FROM rider_ranks WHERE rider_id = ? AND season_points = ?",
+        (rider_id, season_points),
+    ).fetchone()
+    if row is not None:
+        return row[0]
+    # The rider's points changed or the rider is gone: count what sorts before the key.
+    return db.execute(
+        """
+        SELECT (SELECT COUNT(*) FROM rider_ranks WHERE season_points > ?)
+             + (SELECT COUNT(*) FROM rider_ranks WHERE season_points = ? AND rider_id <= ?)
+        """,
+        (season_points, season_points, rider_id),
+    ).fetchone()[0]
+
+
+def calculate_age(birthdate: str | None, today: date | None = None) -> int | None:
     if not birthdate:
         return None
     try:
@@ -118,11 +410,29 @@ def calculate_age(birthdate: str | None) -> int | None:
     except ValueError:
         return None
 
-    today = date.today()
+    today = today or date.today()
     age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
     return age
 
 
+@lru_cache(maxsize=32)
+def rating_shape(today: date, with_points: bool = True) -> Shape:
+    """Rating row shape, with ages as of ``today``; ``with_points`` adds points and rank."""
+    fields: dict[str, Any] = {
+        "id": "id",
+        "nickname": "nickname",
+        "fullname": "fullname",
+        "city": "city",
+        "birthdate": "birthdate",
+        "age": ("birthdate", partial(calculate_age, today=today)),
+        "style": "style",
+        "level": "level",
+    }
+    if with_points:
+        fields.update(seasonPoints="season_points", rank="rank")
+    return Shape(**fields)
+
+
 def subtract_years(dt: date, years: int) -> date:
     try:
         return dt.replace(year=dt.year - years)
@@ -132,13 +442,29 @@ def subtract_years(dt: date, years: int) -> date:
 
 
 @bp.get("/riders/<int:rider_id>")
+@conditional("rider", RIDER_SCOPES, ("asOf",))
 def get_rider(rider_id: int) -> Any:
+    """Rider profile with their season results.
+
+    The current profile is answered from the stored ``rider_cards`` JSON,
+    which is always compact; only ``asOf`` profiles go through ``jsonify``
+    and pick up its indentation in debug mode.
+    """
     db = get_db()
+    try:
+        as_of = parse_as_of()
+    except ValueError:
+        return jsonify({"error": "Invalid asOf date"}), 400
+
     rider = db.execute(
         """
-        SELECT r.*, COALESCE(sp.season_points, 0) AS season_points
+        SELECT r.*, COALESCE(sp.season_points, 0) AS season_points,
+               rk.rank_global, rk.age_group, rk.rank_city, rk.rank_style, rk.rank_level, rk.rank_age_group,
+               c.results_json
         FROM riders AS r
         LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+        LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id
+        LEFT JOIN rider_cards AS c ON c.rider_id = r.id
         WHERE r.id = ?
         """,
         (rider_id,),
@@ -146,152 +472,347 @@ def get_rider(rider_id: int) -> Any:
     if not rider:
         return jsonify({"error": "Not found"}), 404
 
-    results = db.execute(
+    if as_of is None:
+        # the result list comes pre-serialised from rider_cards
+        def dumps(obj: Any) -> str:
+            return current_app.json.dumps(obj, separators=(",", ":"))
+
+        results_json = rider["results_json"] or build_card(db, rider_id, dumps)
+        rider_json = dumps(serialize_rider(rider, None, rider["season_points"], rider["rank_global"]))
+        return current_app.response_class(
+            f'{{"rider":{rider_json},"seasonResults":{results_json}}}\n', mimetype="application/json"
+        )
+
+    snapshot = db.execute(
         """
-        SELECT e.id AS event_id, e.name, e.city, e.level, e.date_start,
-               res.place, res.is_finalist, res.is_participant, res.points
-        FROM results AS res
-        JOIN events AS e ON e.id = res.event_id
-        WHERE res.rider_id = ?
-        ORDER BY e.date_start DESC
-        LIMIT 50
+        SELECT season_points, season_rank
+        FROM rating_snapshots
+        WHERE rider_id = ? AND valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
         """,
-        (rider_id,),
-    ).fetchall()
+        (rider_id, as_of.isoformat(), as_of.isoformat()),
+    ).fetchone()
+    season_points = snapshot["season_points"] if snapshot else 0
+    rank = snapshot["season_rank"] if snapshot else None
+    results = season_results(db, rider_id, "AND e.start_day <= ?", (day_number(as_of),))
+    rider_payload = serialize_rider(rider, as_of, season_points, rank)
+    return jsonify({"rider": rider_payload, "seasonResults": SEASON_RESULT.many(results)})
 
-    return jsonify(
-        {
-            "rider": {
-                "id": rider["id"],
-                "nickname": rider["nickname"],
-                "fullname": rider["fullname"],
-                "city": rider["city"],
-                "birthdate": rider["birthdate"],
-                "age": calculate_age(rider["birthdate"]),
-                "style": rider["style"],
-                "level": rider["level"],
-                "seasonPoints": rider["season_points"],
-            },
-            "seasonResults": [
-                {
-                    "eventId": row["event_id"],
-                    "eventName": row["name"],
-                    "eventCity": row["city"],
-                    "eventLevel": row["level"],
-                    "eventDate": row["date_start"],
-                    "place": row["place"],
-                    "isFinalist": bool(row["is_finalist"]),
-                    "isParticipant": bool(row["is_participant"]),
-                    "points": row["points"],
-                }
-                for row in results
-            ],
+
+# Upper bound for ``GET /api/riders?ids=``.
+MAX_RIDER_IDS = 200
+
+
+@bp.get("/riders")
+@conditional("riders", RIDER_SCOPES, ("ids", "results", "asOf"))
+def get_riders() -> Any:
+    """Summaries of several riders (``?ids=1,2,3``) in one round trip.
+
+    Riders come back in the order asked for; unknown ids are listed under
+    ``missing``. ``results=1`` adds each rider's latest results, all read
+    in one more query.
+    """
+    db = get_db()
+    try:
+        as_of = parse_as_of()
+    except ValueError:
+        return jsonify({"error": "Invalid asOf date"}), 400
+    try:
+        ids = list(dict.fromkeys(int(part) for part in request.args.get("ids", "").split(",") if part.strip()))
+    except ValueError:
+        return jsonify({"error": "ids must be a comma-separated list of integers"}), 400
+    if not ids:
+        return jsonify({"error": "ids is required"}), 400
+    if len(ids) > MAX_RIDER_IDS:
+        return jsonify({"error": f"At most {MAX_RIDER_IDS} ids per request"}), 400
+
+    id_list = placeholders(len(ids))
+    riders = {
+        row["id"]: row
+        for row in db.execute(
+            f"""
+            SELECT r.*, COALESCE(sp.season_points, 0) AS season_points,
+                   rk.rank_global, rk.age_group, rk.rank_city, rk.rank_style, rk.rank_level, rk.rank_age_group
+            FROM riders AS r
+            LEFT JOIN season_points AS sp ON sp.rider_id = r.id
+            LEFT JOIN rider_ranks AS rk ON rk.rider_id = r.id
+            WHERE r.id IN ({id_list})
+            """,
+            ids,
+        )
+    }
+    snapshots: dict[int, Any] = {}
+    if as_of:
+        snapshots = {
+            row["rider_id"]: row
+            for row in db.execute(
+                f"""
+                SELECT rider_id, season_points, season_rank
+                FROM rating_snapshots
+                WHERE rider_id IN ({id_list}) AND valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+                """,
+                (*ids, as_of.isoformat(), as_of.isoformat()),
+            )
         }
-    )
 
+    results: dict[int, list[dict[str, Any]]] = {}
+    if request.args.get("results") == "1" and riders:
+        results_filter = ""
+        results_params: list[Any] = list(riders)
+        if as_of:
+            results_filter = "AND e.start_day <= ?"
+            results_params.append(day_number(as_of))
+        # each rider's latest CARD_RESULTS_LIMIT, the same cut as GET /api/riders/<id>
+        for row in db.execute(
+            f"""
+            SELECT * FROM (
+                SELECT res.rider_id, e.id AS event_id, e.name, e.city, e.level, e.date_start,
+                       res.place, res.is_finalist, res.is_participant, res.points,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY res.rider_id ORDER BY e.date_start DESC, e.id DESC
+                       ) AS row_number
+                FROM results AS res
+                JOIN events AS e ON e.id = res.event_id
+                WHERE res.rider_id IN ({placeholders(len(riders))}) {results_filter}
+            ) AS latest
+            WHERE row_number <= ?
+            ORDER BY rider_id, row_number
+            """,
+            (*results_params, CARD_RESULTS_LIMIT),
+        ):
+            results.setdefault(row["rider_id"], []).append(SEASON_RESULT(row))
 
-@bp.get("/events")
-def get_events() -> Any:
+    items = []
+    for rider_id in ids:
+        rider = riders.get(rider_id)
+        if rider is None:
+            continue
+        season_points, rank = rider["season_points"], rider["rank_global"]
+        if as_of:
+            snapshot = snapshots.get(rider_id)
+            season_points = snapshot["season_points"] if snapshot else 0
+            rank = snapshot["season_rank"] if snapshot else None
+        item = serialize_rider(rider, as_of, season_points, rank)
+        if request.args.get("results") == "1":
+            item["seasonResults"] = results.get(rider_id, [])
+        items.append(item)
+
+    return jsonify({"items": items, "missing": [rider_id for rider_id in ids if rider_id not in riders]})
+
+
+def serialize_rider(rider: Any, as_of: date | None, season_points: int, rank: int | None) -> dict[str, Any]:
+    """Rider summary; current ranks are included unless ``as_of`` is set."""
+    payload = rating_shape(as_of or date.today(), with_points=False)(rider)
+    payload["seasonPoints"] = season_points
+    payload["rank"] = rank
+    if as_of:
+        payload["asOf"] = as_of.isoformat()
+    elif rider["rank_global"] is not None:
+        payload["ageGroup"] = rider["age_group"]
+        payload["ranks"] = {
+            "city": rider["rank_city"],
+            "style": rider["rank_style"],
+            "level": rider["rank_level"],
+            "ageGroup": rider["rank_age_group"],
+        }
+    return payload
+
+
+# Upper bound for ``GET /api/compare?riders=``.
+MAX_COMPARE_RIDERS = 5
+COMPARE_RIDER = Shape(id="id", nickname="nickname", fullname="fullname", city="city", style="style", level="level")
+
+
+@bp.get("/compare")
+@conditional("compare", ("riders", *COMPARE_SCOPES), ("riders",))
+def compare_riders() -> Any:
+    """Head-to-head record of two or more riders (``?riders=1,2,3``).
+
+    Every pair gets its shared events, newest first, with both riders'
+    places and points and the win/loss/tie count. Pair summaries are
+    cached per data generation (see backend/compare.py).
+    """
     db = get_db()
-    city = request.args.get("city")
-    level = request.args.get("level")
+    try:
+        ids = list(dict.fromkeys(int(part) for part in request.args.get("riders", "").split(",") if part.strip()))
+    except ValueError:
+        return jsonify({"error": "riders must be a comma-separated list of integers"}), 400
+    if not 2 <= len(ids) <= MAX_COMPARE_RIDERS:
+        return jsonify({"error": f"Compare between 2 and {MAX_COMPARE_RIDERS} riders"}), 400
+
+    riders = {
+        row["id"]: row
+        for row in db.execute(
+            f"SELECT id, nickname, fullname, city, style, level FROM riders WHERE id IN ({placeholders(len(ids))})",
+            ids,
+        )
+    }
+    missing = [rider_id for rider_id in ids if rider_id not in riders]
+    if missing:
+        return jsonify({"error": "Not found", "missing": missing}), 404
+
+    cache = get_cache()
+    version = generation(db, COMPARE_SCOPES)
+    pairs = rider_pairs(ids)
+    pair_json: dict[tuple[int, int], str] = {}
+    for pair in pairs:
+        entry = cache.get(f"compare:{version}:{pair[0]}:{pair[1]}")
+        if entry is not None:
+            pair_json[pair] = entry[2].decode("utf-8")
+    uncached = [pair for pair in pairs if pair not in pair_json]
+    if uncached:
+        for pair, rows in shared_results(db, uncached).items():
+            body = current_app.json.dumps(pair_summary(pair, rows), separators=(",", ":"))
+            cache.set(f"compare:{version}:{pair[0]}:{pair[1]}", (200, "application/json", body.encode("utf-8")))
+            pair_json[pair] = body
+
+    dumps = current_app.json.dumps
+    riders_json = dumps([COMPARE_RIDER(riders[rider_id]) for rider_id in ids], separators=(",", ":"))
+    return current_app.response_class(
+        f'{{"pairs":[{",".join(pair_json[pair] for pair in pairs)}],"riders":{riders_json}}}\n',
+        mimetype="application/json",
+    )
 
+
+def events_query(
+    db: Any,
+    city: str | None,
+    level: str | None,
+    when: str | None,
+    date_from: date | None,
+    date_to: date | None,
+    after: list[Any] | None,
+    limit: int,
+) -> tuple[str, tuple[Any, ...]]:
+    """The calendar page of published events for the ``get_events`` filters."""
     where_clauses: list[str] = ["e.status = 'published'"]
     params: list[Any] = []
     if city:
-        where_clauses.append("e.city LIKE ?")
-        params.append(f"%{city}%")
+        city_sql, city_params = city_filter(db, city, "e.city_id")
+        where_clauses.append(city_sql)
+        params.extend(city_params)
     if level:
         where_clauses.append("e.level = ?")
         params.append(level)
-
-    where_sql = " AND ".join(where_clauses)
-    if where_sql:
-        where_sql = "WHERE " + where_sql
-
-    rows = db.execute(
-        f"""
+    # ISO date text sorts by date, so the bounds compare date_start as is
+    # and a time part on the ``to`` day still falls inside
+    if when == "upcoming":
+        where_clauses.append("e.date_start >= ?")
+        params.append(date.today().isoformat())
+    elif when == "past":
+        where_clauses.append("e.date_start < ?")
+        params.append(date.today().isoformat())
+    if date_from:
+        where_clauses.append("e.date_start >= ?")
+        params.append(date_from.isoformat())
+    # date.max has no next day, and no start date lies past it anyway
+    if date_to and date_to < date.max:
+        where_clauses.append("e.date_start < ?")
+        params.append((date_to + timedelta(days=1)).isoformat())
+    direction = "ASC" if when == "upcoming" else "DESC"
+    if after is not None:
+        where_clauses.append(f"(e.date_start, e.id) {'>' if direction == 'ASC' else '<'} (?, ?)")
+        params.extend(after)
+
+    sql = f"""
         SELECT e.id, e.name, e.date_start, e.date_end, e.city, e.level,
                e.participants_count, e.style
         FROM events AS e
-        {where_sql}
-        ORDER BY e.date_start DESC
-        LIMIT 50
-        """,
-        params,
-    ).fetchall()
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY e.date_start {direction}, e.id {direction}
+        LIMIT ?
+    """
+    return sql, (*params, limit)
+
+
+@bp.get("/events")
+@conditional("events", ("events",), EVENTS_PARAMS, max_age=300)
+@cached_response("events", ("events",), EVENTS_PARAMS)
+def get_events() -> Any:
+    """Published events, newest first, or split by ``when=upcoming|past``.
+
+    ``from``/``to`` narrow the start dates (inclusive). Upcoming events run
+    soonest first, past ones latest first; every variant is a range scan
+    on ``idx_events_status_date`` in index order, paged by ``cursor``.
+    """
+    db = get_db()
+    city = request.args.get("city")
+    level = request.args.get("level")
+    when = request.args.get("when") or None
+    if when not in (None, "upcoming", "past"):
+        return jsonify({"error": "when must be upcoming or past"}), 400
+    try:
+        date_from = parse_date(request.args.get("from"))
+        date_to = parse_date(request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "Invalid date filter"}), 400
+    limit = parse_limit(request.args.get("limit"))
+    after: list[Any] | None = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args["cursor"], (str, int))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    sql, params = events_query(db, city, level, when, date_from, date_to, after, limit + 1)
+    rows = db.execute(sql, params).fetchall()
 
     return jsonify(
         {
-            "items": [
-                {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "dateStart": row["date_start"],
-                    "dateEnd": row["date_end"],
-                    "city": row["city"],
-                    "level": row["level"],
-                    "participants": row["participants_count"],
-                    "style": row["style"],
-                }
-                for row in rows
-            ]
+            "items": EVENT_SUMMARY.many(rows[:limit]),
+            "limit": limit,
+            "nextCursor": next_cursor(rows, limit, ("date_start", "id")),
         }
     )
 
 
+CITY = Shape(id="id", name="name", riders="riders_count", events="events_count")
+
+
+@bp.get("/cities")
+@conditional("cities", ("riders", "events"), max_age=300)
+@cached_response("cities", ("riders", "events"), ())
+def get_cities() -> Any:
+    """Cities with riders or published events, from the maintained counters."""
+    rows = get_db().execute(
+        """
+        SELECT id, name, riders_count, events_count
+        FROM cities
+        WHERE riders_count > 0 OR events_count > 0
+        ORDER BY riders_count DESC, name ASC
+        """
+    ).fetchall()
+    return jsonify({"items": CITY.many(rows)})
+
+
+@bp.get("/stats")
+@conditional("stats", STATS_SCOPES, max_age=300)
+@cached_response("stats", STATS_SCOPES, ())
+def get_stats() -> Any:
+    """Home page totals, from the counters kept by migration 016."""
+    return jsonify(load_stats(get_db()))
+
+
 @bp.get("/events/<int:event_id>")
+@conditional("event", ("events", "results", "riders"), max_age=300)
 def get_event(event_id: int) -> Any:
     db = get_db()
-    event = db.execute(
+    row = db.execute(
         """
-        SELECT * FROM events WHERE id = ?
+        SELECT e.status, p.body
+        FROM events AS e
+        LEFT JOIN event_payloads AS p ON p.event_id = e.id
+        WHERE e.id = ?
         """,
         (event_id,),
     ).fetchone()
-    if not event:
+    if not row:
         return jsonify({"error": "Not found"}), 404
-
-    results = db.execute(
-        """
-        SELECT r.id AS rider_id, r.nickname, r.city, r.level,
-               res.place, res.is_finalist, res.is_participant, res.points
-        FROM results AS res
-        JOIN riders AS r ON r.id = res.rider_id
-        WHERE res.event_id = ?
-        ORDER BY res.place IS NULL, res.place ASC
-        """,
-        (event_id,),
-    ).fetchall()
-
-    return jsonify(
-        {
-            "event": {
-                "id": event["id"],
-                "name": event["name"],
-                "dateStart": event["date_start"],
-                "dateEnd": event["date_end"],
-                "city": event["city"],
-                "level": event["level"],
-                "participants": event["participants_count"],
-                "style": event["style"],
-                "hasBestTrick": bool(event["has_best_trick"]),
-                "sourceUrl": event["source_url"],
-                "organizerContact": event["organizer_contact"],
-                "status": event["status"],
-            },
-            "results": [
-                {
-                    "riderId": row["rider_id"],
-                    "nickname": row["nickname"],
-                    "city": row["city"],
-                    "riderLevel": row["level"],
-                    "place": row["place"],
-                    "isFinalist": bool(row["is_finalist"]),
-                    "isParticipant": bool(row["is_participant"]),
-                    "points": row["points"],
-                }
-                for row in results
-            ],
-        }
-    )
+    if row["body"] is not None:
+        return payload_response(row["body"])
+    if row["status"] != "published":
+        # drafts are not stored, see backend/event_payloads.py
+        return jsonify(event_payload(db, event_id))
+    body = build_payload(db, event_id, wait=False)
+    if body is None:
+        return jsonify({"error": "Not found"}), 404
+    return payload_response(body)
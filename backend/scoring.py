@@ -0,0 +1,202 @@
+"""Points rules and batch scoring of event results.
+
+Rule tables are versioned: ``events.rules_version`` records which table
+scored an event, so changing the rules means adding a new entry to
+``RULES`` and re-scoring the season with :func:`rescore_season`.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Iterable, Mapping, Sequence
+
+from backend.days import day_number
+from backend.dialect import BATCH_SIZE, adapt, placeholders
+
+RULES: dict[str, dict[str, Any]] = {
+    "2025": {
+        "points": {
+            "international": {
+                "place": {1: 400, 2: 300, 3: 220},
+                "finalist": 100,
+                "participant": 20,
+            },
+            "national": {
+                "place": {1: 300, 2: 220, 3: 160},
+                "finalist": 80,
+                "participant": 15,
+            },
+            "regional": {
+                "place": {1: 200, 2: 140, 3: 100},
+                "finalist": 50,
+                "participant": 10,
+            },
+            "local": {
+                "place": {1: 120, 2: 80, 3: 60},
+                "finalist": 30,
+                "participant": 5,
+            },
+        },
+        # (more than N participants, multiplier), checked in order
+        "bonus": ((60, 1.2), (30, 1.1)),
+    },
+}
+
+CURRENT_RULES_VERSION = "2025"
+
+POINTS_TABLE = RULES[CURRENT_RULES_VERSION]["points"]
+
+
+def get_rules(version: str | None = None) -> dict[str, Any]:
+    try:
+        return RULES[version or CURRENT_RULES_VERSION]
+    except KeyError:
+        raise ValueError(f"Unknown rules version: {version}") from None
+
+
+def bonus_multiplier(participants_count: int | None, version: str | None = None) -> float:
+    if participants_count is None:
+        return 1.0
+    for threshold, multiplier in get_rules(version)["bonus"]:
+        if participants_count > threshold:
+            return multiplier
+    return 1.0
+
+
+def score_event(
+    level: str,
+    participants_count: int | None,
+    results: Sequence[Mapping[str, Any]],
+    version: str | None = None,
+) -> list[int]:
+    """Score every result of one event in a single pass.
+
+    ``results`` items need ``place``, ``is_finalist`` and ``is_participant``.
+    The level table and the participants bonus are resolved once per event
+    instead of once per row.
+    """
+
+    table = get_rules(version)["points"][level]
+    multiplier = bonus_multiplier(participants_count, version)
+    by_place = {place: int(round(points * multiplier)) for place, points in table["place"].items()}
+    finalist = int(round(table["finalist"] * multiplier))
+    participant = int(round(table["participant"] * multiplier))
+
+    def points_for(row: Mapping[str, Any]) -> int:
+        if row["place"] in by_place:
+            return by_place[row["place"]]
+        if row["is_finalist"]:
+            return finalist
+        if row["is_participant"]:
+            return participant
+        return 0
+
+    return [points_for(row) for row in results]
+
+
+def calculate_points(
+    level: str,
+    place: int | None,
+    is_finalist: bool,
+    is_participant: bool,
+    participants_count: int | None,
+    version: str | None = None,
+) -> int:
+    row = {"place": place, "is_finalist": is_finalist, "is_participant": is_participant}
+    return score_event(level, participants_count, [row], version)[0]
+
+
+def _rescore(conn: Any, event_rows: Iterable[tuple], version: str | None) -> list[int]:
+    """Re-score results of the given events; return riders whose points changed.
+
+    ``event_rows`` are ``(id, level, participants_count, rules_version)``.
+    When ``version`` is given it replaces each event's own rules version.
+    Results with manually overridden points are left alone.
+    """
+
+    events = {row[0]: row for row in event_rows}
+    if not events:
+        return []
+
+    cursor = conn.cursor()
+    results: dict[int, list[dict[str, Any]]] = {}
+    ids = sorted(events)
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start : start + BATCH_SIZE]
+        cursor.execute(
+            adapt(
+                conn,
+                f"""
+                SELECT id, event_id, rider_id, place, is_finalist, is_participant, points
+                FROM results
+                WHERE points_overridden = 0 AND event_id IN ({placeholders(len(batch))})
+                """,
+            ),
+            batch,
+        )
+        for row in cursor.fetchall():
+            results.setdefault(row[1], []).append(
+                {
+                    "id": row[0],
+                    "rider_id": row[2],
+                    "place": row[3],
+                    "is_finalist": row[4],
+                    "is_participant": row[5],
+                    "points": row[6],
+                }
+            )
+
+    updates: list[tuple[int, int]] = []
+    riders: set[int] = set()
+    for event_id, rows in results.items():
+        _, level, participants_count, event_version = events[event_id]
+        scored = score_event(level, participants_count, rows, version or event_version)
+        for row, points in zip(rows, scored):
+            if row["points"] != points:
+                updates.append((points, row["id"]))
+                riders.add(row["rider_id"])
+
+    if updates:
+        cursor.executemany(adapt(conn, "UPDATE results SET points = ? WHERE id = ?"), updates)
+    if version:
+        cursor.executemany(
+            adapt(conn, "UPDATE events SET rules_version = ? WHERE id = ?"),
+            [(version, event_id) for event_id in ids],
+        )
+    cursor.close()
+    return sorted(riders)
+
+
+def rescore_event(conn: Any, event_id: int, version: str | None = None) -> list[int]:
+    """Re-score all results of one event after its level or size changed."""
+
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(conn, "SELECT id, level, participants_count, rules_version FROM events WHERE id = ?"),
+        (event_id,),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    return _rescore(conn, rows, version)
+
+
+# events re-scored by ``rescore --since``; its plan is checked by the explain benchmark
+RESCORE_SINCE_SQL = "SELECT id, level, participants_count, rules_version FROM events WHERE start_day >= ?"
+
+
+def rescore_season(conn: Any, version: str | None = None, since: date | None = None) -> list[int]:
+    """Re-score every event (optionally from ``since`` on) in bulk.
+
+    Used after a rules change: pass the new ``version`` to score with it and
+    record it on the events.
+    """
+
+    get_rules(version)  # fail early on unknown versions
+    cursor = conn.cursor()
+    if since is None:
+        cursor.execute("SELECT id, level, participants_count, rules_version FROM events")
+    else:
+        cursor.execute(adapt(conn, RESCORE_SINCE_SQL), (day_number(since),))
+    rows = cursor.fetchall()
+    cursor.close()
+    return _rescore(conn, rows, version)
@@ -0,0 +1,90 @@
+"""Full-text rider search over nickname and full name.
+
+SQLite uses the ``riders_fts`` FTS5 index, MariaDB the ``ft_riders_names``
+FULLTEXT index (see migration 010). Every word of the query must match
+the start of a word in either name, so "max iv" finds "Maxim Ivanov".
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from backend.dialect import adapt, is_sqlite
+
+_WORD = re.compile(r"\w+")
+
+# bm25 column weights: a nickname hit counts twice as much as a full name hit
+_BM25_WEIGHTS = (2.0, 1.0)
+
+
+def search_words(text: str) -> list[str]:
+    return _WORD.findall(text)
+
+
+def fts_query(text: str) -> str:
+    """FTS5 query: every word as a quoted prefix term (implicit AND)."""
+    return " ".join(f'"{word}"*' for word in search_words(text))
+
+
+def boolean_query(text: str) -> str:
+    """MariaDB boolean-mode query: every word required, as a prefix."""
+    return " ".join(f"+{word}*" for word in search_words(text))
+
+
+def rider_search_filter(conn: Any, text: str, alias: str) -> tuple[str, list[Any]]:
+    """Return a ``WHERE`` condition on the riders table ``alias`` matching ``text``.
+
+    Queries without any word characters cannot use the index and keep the
+    old substring match.
+    """
+    if not search_words(text):
+        like = f"%{text}%"
+        return (
+            f"(lower({alias}.nickname) LIKE lower(?) OR lower(COALESCE({alias}.fullname, '')) LIKE lower(?))",
+            [like, like],
+        )
+    if is_sqlite(conn):
+        return f"{alias}.id IN (SELECT rowid FROM riders_fts WHERE riders_fts MATCH ?)", [fts_query(text)]
+    return f"MATCH({alias}.nickname, {alias}.fullname) AGAINST (? IN BOOLEAN MODE)", [boolean_query(text)]
+
+
+def matching_rider_ids(conn: Any, text: str) -> list[int]:
+    """Ids of the riders :func:`rider_search_filter` would match."""
+    cursor = conn.cursor()
+    if is_sqlite(conn) and search_words(text):
+        cursor.execute("SELECT rowid FROM riders_fts WHERE riders_fts MATCH ?", (fts_query(text),))
+    else:
+        condition, params = rider_search_filter(conn, text, "r")
+        cursor.execute(adapt(conn, f"SELECT r.id FROM riders AS r WHERE {condition}"), params)
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return ids
+
+
+def rider_relevance(conn: Any, text: str, alias: str) -> tuple[str, list[Any], str]:
+    """Return ``(join_sql, params, order_sql)`` ranking ``alias`` rows by relevance.
+
+    Meant to be combined with :func:`rider_search_filter`; the best match
+    comes first. Without indexable words the order falls back to the id.
+    """
+    if not search_words(text):
+        return "", [], f"{alias}.id ASC"
+    if is_sqlite(conn):
+        weights = ", ".join(str(weight) for weight in _BM25_WEIGHTS)
+        return (
+            f"""
+            JOIN (
+                SELECT rowid AS rider_id, bm25(riders_fts, {weights}) AS relevance
+                FROM riders_fts WHERE riders_fts MATCH ?
+            ) AS fts ON fts.rider_id = {alias}.id
+            """,
+            [fts_query(text)],
+            f"fts.relevance ASC, {alias}.id ASC",
+        )
+    # words are \w+ only, so the query can be inlined safely
+    return (
+        "",
+        [],
+        f"MATCH({alias}.nickname, {alias}.fullname) AGAINST ('{boolean_query(text)}' IN BOOLEAN MODE) DESC, {alias}.id ASC",
+    )
@@ -2,47 +2,333 @@
 
 from __future__ import annotations
 
-from datetime import date, timedelta
-import mysql.connector
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, NamedTuple, Sequence
+
+from backend.days import day_number, from_day_number
+from backend.dialect import BATCH_SIZE, adapt, placeholders, upsert_clause
+from backend.ranks import rank_riders
+from backend.snapshots import record_snapshot
+from backend.versions import bump_versions
+
+
+class SeasonState(NamedTuple):
+    window_days: int
+    window_start: date
+    next_expiry: date | None
+    version: int
+
+
+def _as_date(value: Any) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _window_start(today: date | None, window_days: int) -> date:
+    return (today or date.today()) - timedelta(days=window_days)
+
+
+def _rider_filter(rider_ids: Sequence[int] | None, column: str) -> str:
+    if rider_ids is None:
+        return ""
+    return f"AND {column} IN ({placeholders(len(rider_ids))})"
+
+
+# Statements whose plans ``python -m backend.benchmark explain`` checks.
+NEXT_EXPIRY_SQL = """
+    SELECT MIN(e.start_day)
+    FROM events AS e
+    WHERE e.start_day >= ?
+      AND EXISTS (SELECT 1 FROM results AS r WHERE r.event_id = e.id)
+"""
+EXPIRING_RESULTS_SQL = """
+    SELECT r.rider_id, COALESCE(SUM(r.points), 0), COUNT(*)
+    FROM results AS r
+    JOIN events AS e ON e.id = r.event_id
+    WHERE e.start_day >= ? AND e.start_day < ?
+    GROUP BY r.rider_id
+"""
+
+
+def upsert_totals_query(
+    conn: Any, window_start: date, points_cap: int, rider_ids: Sequence[int] | None = None
+) -> tuple[str, tuple[Any, ...]]:
+    """The statement that aggregates, caps and upserts season totals, with its parameters."""
+
+    if rider_ids is None:
+        # CROSS JOIN keeps the join order: a full rebuild walks the window
+        # through idx_events_start_day instead of every result by rider
+        source = "events AS e CROSS JOIN results AS r ON r.event_id = e.id"
+    else:
+        source = "results AS r JOIN events AS e ON e.id = r.event_id"
+    sql = f"""
+        INSERT INTO season_points (rider_id, season_points, raw_points, results_count, season_updated_at)
+        SELECT r.rider_id,
+               CASE WHEN SUM(r.points) > ? THEN ? ELSE COALESCE(SUM(r.points), 0) END,
+               COALESCE(SUM(r.points), 0),
+               COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM {source}
+        WHERE e.start_day >= ? {_rider_filter(rider_ids, "r.rider_id")}
+        GROUP BY r.rider_id
+        {upsert_clause(conn, "rider_id", ("season_points", "raw_points", "results_count", "season_updated_at"))}
+    """
+    return adapt(conn, sql), (points_cap, points_cap, day_number(window_start), *(rider_ids or ()))
+
+
+def load_state(conn: Any) -> SeasonState | None:
+    cursor = conn.cursor()
+    cursor.execute("SELECT window_days, window_start, next_expiry, version FROM season_state WHERE id = 1")
+    row = cursor.fetchone()
+    cursor.close()
+    if row is None:
+        return None
+    return SeasonState(int(row[0]), _as_date(row[1]), _as_date(row[2]), int(row[3]))
+
+
+def next_expiry_date(conn: Any, window_start: date, window_days: int) -> date | None:
+    """Return the first day on which a counted result leaves the window."""
+
+    cursor = conn.cursor()
+    cursor.execute(adapt(conn, NEXT_EXPIRY_SQL), (day_number(window_start),))
+    earliest = cursor.fetchone()[0]
+    cursor.close()
+    if earliest is None:
+        return None
+    return from_day_number(int(earliest)) + timedelta(days=window_days + 1)
+
+
+def _save_state(cursor: Any, conn: Any, window_days: int, window_start: date) -> None:
+    """Store the window and bump ``version`` after ``season_points`` changed."""
+
+    expiry = next_expiry_date(conn, window_start, window_days)
+    params = (window_days, window_start.isoformat(), expiry.isoformat() if expiry else None)
+    cursor.execute(
+        adapt(
+            conn,
+            """
+            UPDATE season_state
+            SET window_days = ?, window_start = ?, next_expiry = ?,
+                updated_at = CURRENT_TIMESTAMP, version = version + 1
+            WHERE id = 1
+            """,
+        ),
+        params,
+    )
+    if cursor.rowcount == 0:
+        cursor.execute(
+            adapt(
+                conn,
+                """
+                INSERT INTO season_state (id, window_days, window_start, next_expiry, updated_at, version)
+                VALUES (1, ?, ?, ?, CURRENT_TIMESTAMP, 1)
+                """,
+            ),
+            params,
+        )
+
+
+def _upsert_totals(
+    cursor: Any,
+    conn: Any,
+    window_start: date,
+    points_cap: int,
+    rider_ids: Sequence[int] | None = None,
+) -> None:
+    """Aggregate, cap and upsert season totals in a single statement."""
+
+    cursor.execute(*upsert_totals_query(conn, window_start, points_cap, rider_ids))
+
+
+def _delete_stale(cursor: Any, conn: Any, window_start: date, rider_ids: Sequence[int] | None = None) -> None:
+    """Drop rows of riders that no longer have results inside the window."""
+
+    cursor.execute(
+        adapt(
+            conn,
+            f"""
+            DELETE FROM season_points
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM results AS r
+                JOIN events AS e ON e.id = r.event_id
+                WHERE r.rider_id = season_points.rider_id AND e.start_day >= ?
+            ) {_rider_filter(rider_ids, "rider_id")}
+            """,
+        ),
+        (day_number(window_start), *(rider_ids or ())),
+    )
 
 
 def recalculate_season_points(
-    conn: mysql.connector.connection.MySQLConnection,
+    conn: Any,
     window_days: int = 90,
     points_cap: int = 1000,
+    today: date | None = None,
 ) -> None:
     """Recompute rolling season points for all riders.
 
-    Deletes existing cache and fills it with sums for events in the last
-    ``window_days`` days, applying the ``points_cap`` limit per rider.
+    Upserts capped sums for events in the last ``window_days`` days and
+    removes riders that dropped out of the window. Both steps are single
+    set-based statements, so no per-rider round trips are made. The window
+    state is reset to ``today``.
+    """
+
+    _rebuild(conn, window_days, points_cap, today)
+    _after_recalculation(conn, today)
+
+
+def _after_recalculation(conn: Any, today: date | None, rider_ids: Sequence[int] | None = None) -> None:
+    """Re-rank and record the day's history.
+
+    Runs after full rebuilds, when the window moves and after a batch of
+    queued refreshes; a single rider's refresh leaves ranks to those. A
+    batch passes its ``rider_ids``, so only the ranks their points changes
+    move are rewritten (see :func:`backend.ranks.rank_riders`).
     """
 
-    cutoff = (date.today() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+    if rank_riders(conn, today, rider_ids):
+        record_snapshot(conn, today)
+    bump_versions(conn, "season")
+
+
+def _window_moved(conn: Any, window_days: int, today: date | None) -> bool:
+    """Whether :func:`_expire` would move the window or rebuild."""
+
+    state = load_state(conn)
+    if state is None or state.window_days != window_days:
+        return True
+    return _window_start(today, window_days) > state.window_start
+
+
+def _rebuild(conn: Any, window_days: int, points_cap: int, today: date | None) -> None:
+    window_start = _window_start(today, window_days)
+    cursor = conn.cursor()
+    _upsert_totals(cursor, conn, window_start, points_cap)
+    _delete_stale(cursor, conn, window_start)
+    _save_state(cursor, conn, window_days, window_start)
+    cursor.close()
+
+
+def expire_season_points(
+    conn: Any,
+    window_days: int = 90,
+    points_cap: int = 1000,
+    today: date | None = None,
+) -> list[int] | None:
+    """Move the rolling window forward to ``today``.
+
+    Only results of events that fell out of the window since the last run
+    are subtracted from their riders' totals. Returns the ids of riders
+    whose totals changed, or ``None`` when a full rebuild was needed
+    because there was no usable window state.
+    """
+
+    moved = _window_moved(conn, window_days, today)
+    changed = _expire(conn, window_days, points_cap, today)
+    if moved:
+        _after_recalculation(conn, today)
+    return changed
+
+
+def _expire(conn: Any, window_days: int, points_cap: int, today: date | None) -> list[int] | None:
+    state = load_state(conn)
+    if state is None or state.window_days != window_days:
+        _rebuild(conn, window_days, points_cap, today)
+        return None
+
+    window_start = _window_start(today, window_days)
+    if window_start <= state.window_start:
+        return []
 
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM season_points")
-    
     cursor.execute(
-        """
-        SELECT r.rider_id, COALESCE(SUM(r.points), 0) AS total_points
-        FROM results AS r
-        JOIN events AS e ON e.id = r.event_id
-        WHERE date(e.date_start) >= %s
-        GROUP BY r.rider_id
-        """,
-        (cutoff,),
+        adapt(conn, EXPIRING_RESULTS_SQL),
+        (day_number(state.window_start), day_number(window_start)),
     )
-
-    for rider_id, total_points in cursor.fetchall():
-        capped = min(int(total_points), points_cap)
-        cursor.execute(
-            """
-            INSERT INTO season_points (rider_id, season_points, season_updated_at)
-            VALUES (%s, %s, NOW())
-            ON DUPLICATE KEY UPDATE
-                season_points = VALUES(season_points),
-                season_updated_at = VALUES(season_updated_at)
-            """,
-            (rider_id, capped),
+    expiring = cursor.fetchall()
+    if expiring:
+        # season_points is assigned first: MariaDB evaluates SET clauses left
+        # to right, SQLite always sees the old row, so both read the old
+        # raw_points here.
+        cursor.executemany(
+            adapt(
+                conn,
+                """
+                UPDATE season_points
+                SET season_points = CASE WHEN raw_points - ? > ? THEN ? ELSE raw_points - ? END,
+                    raw_points = raw_points - ?,
+                    results_count = results_count - ?,
+                    season_updated_at = CURRENT_TIMESTAMP
+                WHERE rider_id = ?
+                """,
+            ),
+            [
+                (points, points_cap, points_cap, points, points, count, rider_id)
+                for rider_id, points, count in expiring
+            ],
         )
+        cursor.execute("DELETE FROM season_points WHERE results_count <= 0")
+    _save_state(cursor, conn, window_days, window_start)
+    cursor.close()
+    return [rider_id for rider_id, _, _ in expiring]
+
+
+def refresh_season_points(
+    conn: Any,
+    rider_ids: Iterable[int],
+    window_days: int = 90,
+    points_cap: int = 1000,
+    today: date | None = None,
+    rerank: bool = False,
+) -> None:
+    """Recompute rolling season points for the given riders only.
+
+    Produces the same rows as :func:`recalculate_season_points` for these
+    riders while leaving everyone else untouched, so a single result or
+    event change no longer rewrites the whole table. The window is moved
+    forward first, so every row is computed against the same start date.
+
+    ``rider_ranks`` and the history are rebuilt only with ``rerank`` (the
+    queue drain passes it once per batch) or when the window moved;
+    otherwise ranks lag until the next such pass.
+    """
+
+    ids = sorted({int(rider_id) for rider_id in rider_ids})
+    if not ids:
+        return
+
+    moved = _window_moved(conn, window_days, today)
+    # ``None`` means the window state was missing and a full rebuild has
+    # already covered these riders.
+    if _expire(conn, window_days, points_cap, today) is not None:
+        state = load_state(conn)
+        cursor = conn.cursor()
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start : start + BATCH_SIZE]
+            _upsert_totals(cursor, conn, state.window_start, points_cap, batch)
+            _delete_stale(cursor, conn, state.window_start, batch)
+        # A result may have been added to an event older than the tracked expiry.
+        _save_state(cursor, conn, window_days, state.window_start)
+        cursor.close()
+    if moved:
+        _after_recalculation(conn, today)
+    elif rerank:
+        _after_recalculation(conn, today, ids)
+    else:
+        bump_versions(conn, "season")
+
+
+def event_rider_ids(conn: Any, event_id: int) -> list[int]:
+    """Return ids of riders with a result in ``event_id``."""
+
+    cursor = conn.cursor()
+    cursor.execute(adapt(conn, "SELECT rider_id FROM results WHERE event_id = ?"), (event_id,))
+    ids = [row[0] for row in cursor.fetchall()]
     cursor.close()
+    return ids
@@ -0,0 +1,225 @@
+"""Durable queue of season recalculations, processed off the request path.
+
+Admin writes call :func:`request_recalculation`, which inserts a row into
+``season_jobs`` inside the request's own transaction. A background worker
+(one thread per process, started by the app factory) picks up every
+pending job at once and runs a single recalculation for all of them, so
+a burst of 40 result edits costs one refresh instead of 40.
+
+``SEASON_QUEUE_MODE`` selects how jobs are run:
+
+* ``thread`` (default): the worker thread, woken after each write;
+* ``inline``: right after the request committed, before the response;
+* ``external``: only queued; run ``python -m backend.recalculate_season drain``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable
+
+from flask import after_this_request, current_app
+
+from backend.dialect import BATCH_SIZE, adapt, placeholders
+from backend.season import recalculate_season_points, refresh_season_points
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long for status queries.
+_KEEP_FINISHED = timedelta(days=7)
+
+_WORKERS: dict[str, "SeasonWorker"] = {}
+_WORKERS_LOCK = threading.Lock()
+
+
+def enqueue(conn: Any, rider_ids: Iterable[int] | None = None) -> int:
+    """Queue a refresh of ``rider_ids`` (``None``: full rebuild); return the job id.
+
+    The caller commits, so the job becomes visible together with the
+    change that caused it.
+    """
+
+    payload = None if rider_ids is None else json.dumps(sorted({int(rider_id) for rider_id in rider_ids}))
+    cursor = conn.cursor()
+    cursor.execute(adapt(conn, "INSERT INTO season_jobs (rider_ids_json) VALUES (?)"), (payload,))
+    job_id = cursor.lastrowid
+    cursor.close()
+    return job_id
+
+
+def process_pending(conn: sqlite3.Connection, window_days: int = 90, points_cap: int = 1000) -> list[int]:
+    """Run all pending jobs as one recalculation; return the ids handled.
+
+    Jobs are claimed and completed in the same write transaction, so two
+    processes never run the same job and a crash leaves them pending.
+    Jobs asking for a full rebuild turn the whole batch into one; otherwise
+    the union of their riders is refreshed and everyone re-ranked once.
+    """
+
+    job_ids: list[int] = []
+    conn.commit()
+    # a plain read first: idle polls must not take the write lock
+    if conn.execute("SELECT 1 FROM season_jobs WHERE status = 'pending' LIMIT 1").fetchone() is None:
+        return []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("SELECT id, rider_ids_json FROM season_jobs WHERE status = 'pending' ORDER BY id").fetchall()
+        if not rows:
+            conn.rollback()
+            return []
+        job_ids = [row[0] for row in rows]
+        if any(row[1] is None for row in rows):
+            recalculate_season_points(conn, window_days, points_cap)
+        else:
+            rider_ids = {rider_id for row in rows for rider_id in json.loads(row[1])}
+            refresh_season_points(conn, rider_ids, window_days, points_cap, rerank=True)
+        _finish(conn, job_ids, "done", None)
+        conn.execute(
+            "DELETE FROM season_jobs WHERE status <> 'pending' AND finished_at < ?",
+            ((datetime.utcnow() - _KEEP_FINISHED).strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+        conn.commit()
+    except sqlite3.OperationalError:
+        # locked or busy database: leave the jobs pending for the next run
+        conn.rollback()
+        raise
+    except Exception as exc:
+        conn.rollback()
+        _finish(conn, job_ids, "failed", str(exc))
+        conn.commit()
+        raise
+    return job_ids
+
+
+def _finish(conn: sqlite3.Connection, job_ids: list[int], status: str, error: str | None) -> None:
+    for start in range(0, len(job_ids), BATCH_SIZE):
+        batch = job_ids[start : start + BATCH_SIZE]
+        conn.execute(
+            f"""
+            UPDATE season_jobs
+            SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id IN ({placeholders(len(batch))})
+            """,
+            (status, error, *batch),
+        )
+
+
+def connect(database_path: str | Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(database_path, timeout=30)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+class SeasonWorker(threading.Thread):
+    """Background thread draining ``season_jobs`` for one database.
+
+    After a wake-up it waits ``debounce`` seconds so a burst of writes ends
+    up in one run; ``poll_interval`` catches jobs queued by other processes.
+    """
+
+    def __init__(self, database_path: str, debounce: float = 0.5, poll_interval: float = 5.0) -> None:
+        super().__init__(name="season-worker", daemon=True)
+        self.database_path = database_path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run(self) -> None:
+        conn = connect(self.database_path)
+        while True:
+            if self._wake.wait(self.poll_interval):
+                time.sleep(self.debounce)
+                self._wake.clear()
+            try:
+                process_pending(conn)
+            except Exception:
+                logger.exception("Season recalculation failed")
+
+
+def ensure_worker(app: Any = None) -> SeasonWorker | None:
+    """Return the running worker of this process, starting it if needed."""
+
+    app = app or current_app
+    if app.config.get("SEASON_QUEUE_MODE") != "thread" or app.config.get("DATABASE_READONLY"):
+        return None
+    database_path = str(app.config["DATABASE_PATH"])
+    if not Path(database_path).exists():
+        return None
+    with _WORKERS_LOCK:
+        worker = _WORKERS.get(database_path)
+        # a forked process inherits the object but not the thread
+        if worker is None or not worker.is_alive():
+            worker = SeasonWorker(database_path, float(app.config.get("SEASON_QUEUE_DEBOUNCE", 0.5)))
+            worker.start()
+            _WORKERS[database_path] = worker
+    return worker
+
+
+def request_recalculation(db: sqlite3.Connection, rider_ids: Iterable[int] | None = None) -> int | None:
+    """Queue a recalculation for the current request; return the job id.
+
+    Returns ``None`` when ``rider_ids`` is empty and nothing needs to run.
+    """
+
+    if rider_ids is not None:
+        rider_ids = list(rider_ids)
+        if not rider_ids:
+            return None
+    job_id = enqueue(db, rider_ids)
+    app = current_app._get_current_object()
+
+    @after_this_request
+    def run_job(response: Any) -> Any:
+        mode = app.config.get("SEASON_QUEUE_MODE")
+        if mode == "inline":
+            try:
+                process_pending(db)
+            except Exception:
+                # the write itself is committed; the job stays pending or failed
+                logger.exception("Season recalculation failed")
+        elif mode == "thread":
+            worker = ensure_worker(app)
+            if worker is not None:
+                worker.wake()
+        return response
+
+    return job_id
+
+
+def job_status(db: sqlite3.Connection, job_id: int) -> dict[str, Any] | None:
+    row = db.execute(
+        "SELECT id, rider_ids_json, status, error, requested_at, finished_at FROM season_jobs WHERE id = ?",
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "id": row[0],
+        "riders": None if row[1] is None else len(json.loads(row[1])),
+        "status": row[2],
+        "error": row[3],
+        "requestedAt": row[4],
+        "finishedAt": row[5],
+    }
+
+
+def queue_status(db: sqlite3.Connection) -> dict[str, Any]:
+    """Pending jobs and the ``season_updated_at`` watermark of the standings."""
+
+    state = db.execute("SELECT updated_at, version FROM season_state WHERE id = 1").fetchone()
+    pending = db.execute("SELECT COUNT(*), MIN(id) FROM season_jobs WHERE status = 'pending'").fetchone()
+    return {
+        "seasonUpdatedAt": state[0] if state else None,
+        "seasonVersion": state[1] if state else 0,
+        "pendingJobs": pending[0],
+        "oldestPendingJob": pending[1],
+    }
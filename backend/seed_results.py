@@ -8,7 +8,8 @@ import mysql.connector
 from pathlib import Path
 from typing import Iterable
 
-from season import recalculate_season_points
+from backend.scoring import calculate_points
+from backend.season import recalculate_season_points
 
 # Get database connection parameters from environment
 db_config = {
@@ -20,60 +21,6 @@ db_config = {
     'charset': 'utf8mb4'
 }
 
-POINTS_TABLE = {
-    "international": {
-        "place": {1: 400, 2: 300, 3: 220},
-        "finalist": 100,
-        "participant": 20,
-    },
-    "national": {
-        "place": {1: 300, 2: 220, 3: 160},
-        "finalist": 80,
-        "participant": 15,
-    },
-    "regional": {
-        "place": {1: 200, 2: 140, 3: 100},
-        "finalist": 50,
-        "participant": 10,
-    },
-    "local": {
-        "place": {1: 120, 2: 80, 3: 60},
-        "finalist": 30,
-        "participant": 5,
-    },
-}
-
-
-def bonus_multiplier(participants_count: int | None) -> float:
-    if participants_count is None:
-        return 1.0
-    if participants_count > 60:
-        return 1.2
-    if participants_count > 30:
-        return 1.1
-    return 1.0
-
-
-def calculate_points(
-    level: str,
-    place: int | None,
-    is_finalist: bool,
-    is_participant: bool,
-    participants_count: int | None,
-) -> int:
-    base_points = 0
-    table = POINTS_TABLE[level]
-
-    if place in table["place"]:
-        base_points = table["place"][place]
-    elif is_finalist:
-        base_points = table["finalist"]
-    elif is_participant:
-        base_points = table["participant"]
-
-    total = base_points * bonus_multiplier(participants_count)
-    return int(round(total))
-
 
 def fetch_rider_ids(conn: mysql.connector.connection.MySQLConnection) -> list[int]:
     cursor = conn.cursor()
@@ -0,0 +1,120 @@
+"""JSON output: row shapes and the application's JSON provider.
+
+A :class:`Shape` describes how a database row becomes an API object
+(output field -> column, optionally through a converter). The first row
+of a layout compiles it into a plain function that builds the dict from
+positional reads, so a page of rows costs one call per row instead of a
+name lookup per field.
+
+:class:`JSONProvider` replaces Flask's default provider and encodes with
+``orjson`` when it is installed, falling back to the standard library.
+Both produce the same bytes: sorted keys, compact separators (responses
+are indented in debug mode, by the same rule for both), non-ASCII text as
+UTF-8 and Flask's handling of dates, decimals and dataclasses. Flask's own
+provider escapes non-ASCII text as ``\\u`` sequences, so such responses
+are shorter than before this provider, not byte-identical.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Callable, Sequence
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+Converter = Callable[[Any], Any]
+Encoder = Callable[[Any], dict[str, Any]]
+
+
+class Shape:
+    """Maps rows to output dicts.
+
+    ``Shape(id="id", isFinalist=("is_finalist", bool))`` turns a row into
+    ``{"id": row["id"], "isFinalist": bool(row["is_finalist"])}``. Rows may
+    be ``sqlite3.Row`` objects (read by position) or mappings.
+    """
+
+    def __init__(self, **fields: str | tuple[str, Converter]) -> None:
+        self.fields = {
+            name: (spec, None) if isinstance(spec, str) else spec for name, spec in fields.items()
+        }
+        # column layout (None for mappings) -> compiled encoder
+        self._encoders: dict[tuple[str, ...] | None, Encoder] = {}
+
+    def encoder(self, row: Any) -> Encoder:
+        """The compiled encoder for rows laid out like ``row``."""
+
+        layout = None if isinstance(row, Mapping) else tuple(row.keys())
+        encode = self._encoders.get(layout)
+        if encode is None:
+            encode = self._encoders[layout] = self._compile(layout)
+        return encode
+
+    def _compile(self, layout: tuple[str, ...] | None) -> Encoder:
+        namespace: dict[str, Any] = {}
+        items = []
+        for index, (name, (column, convert)) in enumerate(self.fields.items()):
+            value = f"row[{column!r}]" if layout is None else f"row[{layout.index(column)}]"
+            if convert is not None:
+                namespace[f"convert_{index}"] = convert
+                value = f"convert_{index}({value})"
+            items.append(f"{name!r}: {value}")
+        exec(f"def encode(row):\n    return {{{', '.join(items)}}}\n", namespace)
+        return namespace["encode"]
+
+    def __call__(self, row: Any) -> dict[str, Any]:
+        return self.encoder(row)(row)
+
+    def many(self, rows: Sequence[Any]) -> list[dict[str, Any]]:
+        if not rows:
+            return []
+        return list(map(self.encoder(rows[0]), rows))
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding through ``orjson`` when available."""
+
+    # orjson cannot escape non-ASCII text, so neither path does
+    ensure_ascii = False
+
+    def _indent(self) -> bool:
+        """Whether responses are indented, Flask's rule for both encoders."""
+
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def _orjson_options(self, indent: Any = None, sort_keys: bool | None = None) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Compact unless ``indent`` is given, whichever encoder is used."""
+
+        if orjson is None:
+            if not kwargs.get("indent"):
+                kwargs.setdefault("separators", (",", ":"))
+            return super().dumps(obj, **kwargs)
+        options = self._orjson_options(kwargs.get("indent"), kwargs.get("sort_keys"))
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=options).decode()
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if self._indent() else None
+        if orjson is None:
+            body = f"{self.dumps(obj, indent=indent)}\n".encode("utf-8")
+        else:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent)) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app: Flask) -> None:
+    app.json = JSONProvider(app)
@@ -0,0 +1,115 @@
+"""What-if standings: how an event would move the season rating.
+
+The current standings are loaded once per process into a :class:`Standings`
+object and reused until ``season_state.version`` changes, so a simulation
+only touches the riders of the simulated event and never writes anything.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable
+
+from backend.season import load_state
+
+_LOCK = threading.Lock()
+_CACHE: dict[str, "Standings"] = {}
+
+
+@dataclass
+class Standings:
+    version: int
+    window_start: date | None
+    points_cap: int
+    raw: dict[int, int]
+    # capped season points -> number of riders with that value (riders
+    # without season points are counted under 0)
+    counts: Counter
+
+    def points(self, rider_id: int) -> int:
+        return min(self.raw.get(rider_id, 0), self.points_cap)
+
+    def in_window(self, event_date: date | None) -> bool:
+        return event_date is not None and self.window_start is not None and event_date >= self.window_start
+
+
+def load_standings(db: Any, cache_key: str, points_cap: int = 1000) -> Standings:
+    """Return the standings of ``db``, reloading only after a recalculation."""
+
+    state = load_state(db)
+    version = state.version if state else 0
+    with _LOCK:
+        cached = _CACHE.get(cache_key)
+        if cached is not None and cached.version == version and cached.points_cap == points_cap:
+            return cached
+
+    raw = {row[0]: int(row[1]) for row in db.execute("SELECT rider_id, raw_points FROM season_points")}
+    riders_total = db.execute("SELECT COUNT(*) FROM riders").fetchone()[0]
+    counts = Counter(min(points, points_cap) for points in raw.values())
+    counts[0] += max(riders_total - len(raw), 0)
+    standings = Standings(version, state.window_start if state else None, points_cap, raw, counts)
+    with _LOCK:
+        _CACHE[cache_key] = standings
+    return standings
+
+
+def _dense_ranks(counts: Counter) -> dict[int, int]:
+    values = sorted((value for value, count in counts.items() if count > 0), reverse=True)
+    return {value: rank for rank, value in enumerate(values, start=1)}
+
+
+def simulate(
+    standings: Standings,
+    removed: Iterable[tuple[int, int]],
+    added: Iterable[tuple[int, int]],
+) -> dict[str, Any]:
+    """Apply ``(rider_id, points)`` contributions to a copy of the standings.
+
+    ``removed`` are contributions currently counted for the event (they are
+    replaced), ``added`` the hypothetical ones. Returns per-rider before and
+    after values plus how many other riders would change rank.
+    """
+
+    delta: dict[int, int] = {}
+    for rider_id, points in removed:
+        delta[rider_id] = delta.get(rider_id, 0) - int(points)
+    for rider_id, points in added:
+        delta[rider_id] = delta.get(rider_id, 0) + int(points)
+
+    before = {rider_id: standings.points(rider_id) for rider_id in delta}
+    after = {
+        rider_id: min(max(standings.raw.get(rider_id, 0) + change, 0), standings.points_cap)
+        for rider_id, change in delta.items()
+    }
+
+    counts_after = standings.counts.copy()
+    for rider_id in delta:
+        counts_after[before[rider_id]] -= 1
+        counts_after[after[rider_id]] += 1
+
+    ranks_before = _dense_ranks(standings.counts)
+    ranks_after = _dense_ranks(counts_after)
+    riders = [
+        {
+            "riderId": rider_id,
+            "pointsBefore": before[rider_id],
+            "pointsAfter": after[rider_id],
+            "rankBefore": ranks_before[before[rider_id]],
+            "rankAfter": ranks_after[after[rider_id]],
+        }
+        for rider_id in delta
+    ]
+    riders.sort(key=lambda item: (item["rankAfter"], item["riderId"]))
+
+    # Riders outside the event keep their points; they only move when the
+    # set of distinct point values above them changes.
+    unchanged = standings.counts.copy()
+    for rider_id in delta:
+        unchanged[before[rider_id]] -= 1
+    moved = sum(
+        count for value, count in unchanged.items() if count > 0 and ranks_before[value] != ranks_after[value]
+    )
+    return {"riders": riders, "otherRidersMoved": moved}
@@ -0,0 +1,100 @@
+"""Point-in-time history of the season rating.
+
+``rating_snapshots`` is delta encoded: a rider gets a new row only on days
+their points or rank actually change, and the previous row is closed by
+setting ``valid_to``. Reading the rating "as of" a day is therefore a
+lookup of the rows whose ``[valid_from, valid_to)`` range covers that day.
+
+Every re-ranking compares the whole of ``rider_ranks`` with the open rows,
+since one rider's points change shifts the ranks of everyone below them.
+The comparison runs in SQL, so only the changed riders reach Python.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from backend.dialect import adapt
+
+
+# Riders whose points or rank differ from their open row (or who have none).
+_CHANGED_SQL = """
+    SELECT sp.rider_id, sp.season_points, rk.rank_global, s.valid_from
+    FROM season_points AS sp
+    JOIN rider_ranks AS rk ON rk.rider_id = sp.rider_id
+    LEFT JOIN rating_snapshots AS s ON s.rider_id = sp.rider_id AND s.valid_to IS NULL
+    WHERE s.rider_id IS NULL OR s.season_points <> sp.season_points OR s.season_rank <> rk.rank_global
+"""
+# Open rows of riders that no longer have season points.
+_GONE_SQL = """
+    SELECT s.rider_id, s.valid_from
+    FROM rating_snapshots AS s
+    WHERE s.valid_to IS NULL
+      AND NOT EXISTS (
+          SELECT 1
+          FROM season_points AS sp
+          JOIN rider_ranks AS rk ON rk.rider_id = sp.rider_id
+          WHERE sp.rider_id = s.rider_id
+      )
+"""
+
+
+def record_snapshot(conn: Any, day: date | None = None) -> set[int]:
+    """Store today's standings, touching only riders whose values changed.
+
+    Ranks are read from ``rider_ranks``, which must be current. Several
+    recalculations on the same day overwrite that day's rows, so the history
+    keeps one state per rider per day. Returns the ids of riders whose
+    snapshot changed.
+    """
+
+    day_iso = (day or date.today()).isoformat()
+    cursor = conn.cursor()
+    cursor.execute(_CHANGED_SQL)
+    changed = cursor.fetchall()
+    cursor.execute(_GONE_SQL)
+    gone = cursor.fetchall()
+
+    closed: list[tuple[str, int, str]] = []
+    dropped: list[tuple[int, str]] = []
+    inserted: list[tuple[int, str, int, int]] = []
+    for rider_id, valid_from in [(row[0], row[3]) for row in changed if row[3] is not None] + gone:
+        valid_from = str(valid_from)[:10]
+        if valid_from >= day_iso:
+            dropped.append((rider_id, valid_from))
+        else:
+            closed.append((day_iso, rider_id, valid_from))
+    for rider_id, points, rank, _ in changed:
+        inserted.append((rider_id, day_iso, int(points), int(rank)))
+
+    if closed:
+        cursor.executemany(
+            adapt(conn, "UPDATE rating_snapshots SET valid_to = ? WHERE rider_id = ? AND valid_from = ?"),
+            closed,
+        )
+    if dropped:
+        cursor.executemany(
+            adapt(conn, "DELETE FROM rating_snapshots WHERE rider_id = ? AND valid_from = ?"),
+            dropped,
+        )
+    if inserted:
+        cursor.executemany(
+            adapt(
+                conn,
+                """
+                INSERT INTO rating_snapshots (rider_id, valid_from, valid_to, season_points, season_rank)
+                VALUES (?, ?, NULL, ?, ?)
+                """,
+            ),
+            inserted,
+        )
+    cursor.close()
+    return {row[1] for row in closed} | {row[0] for row in dropped} | {row[0] for row in inserted}
+
+
+SNAPSHOT_AS_OF_SQL = """
+    SELECT rider_id, season_points, season_rank
+    FROM rating_snapshots
+    WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+"""
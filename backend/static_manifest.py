@@ -0,0 +1,99 @@
+"""In-memory serving of the built frontend (``frontend/dist``).
+
+The directory is read once at startup into a manifest: every file's
+bytes, MIME type, strong ETag and precomputed ``gzip`` (and ``br`` when
+the optional ``brotli`` package is installed) variants. Requests are
+then a dictionary lookup with no filesystem access. Vite puts
+content-hashed files under ``assets/``, which are served as immutable;
+everything else, including the ``index.html`` SPA fallback, is
+revalidated by ETag.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is fine
+    brotli = None
+
+IMMUTABLE_PREFIX = "assets/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Smaller files are not worth compressing.
+MIN_COMPRESS_SIZE = 512
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+@dataclass
+class StaticFile:
+    body: bytes
+    mimetype: str
+    etag: str
+    cache_control: str
+    # Content-Encoding -> compressed body, only kept when smaller
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+def _load(path: Path, relative: str) -> StaticFile:
+    body = path.read_bytes()
+    mimetype = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+    static_file = StaticFile(
+        body=body,
+        mimetype=mimetype,
+        etag=hashlib.sha256(body).hexdigest()[:32],
+        cache_control=IMMUTABLE_CACHE if relative.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE,
+    )
+    if len(body) >= MIN_COMPRESS_SIZE and mimetype.startswith(_COMPRESSIBLE):
+        variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body)
+        static_file.encoded = {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+    return static_file
+
+
+class StaticManifest:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.files: dict[str, StaticFile] = {}
+        for path in sorted(root.rglob("*")):
+            if path.is_file():
+                relative = path.relative_to(root).as_posix()
+                self.files[relative] = _load(path, relative)
+        self.index = self.files.get("index.html")
+
+    def lookup(self, path: str) -> StaticFile | None:
+        """The file for ``path``; unknown paths outside ``assets/`` get ``index.html``."""
+
+        static_file = self.files.get(path)
+        if static_file is None and not path.startswith(IMMUTABLE_PREFIX):
+            return self.index
+        return static_file
+
+    def response(self, static_file: StaticFile) -> Response:
+        encoding = "identity"
+        if request.accept_encodings:
+            encoding = request.accept_encodings.best_match([*static_file.encoded, "identity"]) or "identity"
+        body = static_file.encoded.get(encoding, static_file.body)
+        # every representation needs its own strong ETag
+        etag = static_file.etag if body is static_file.body else f"{static_file.etag}-{encoding}"
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=static_file.mimetype)
+            if body is not static_file.body:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = static_file.cache_control
+        if static_file.encoded:
+            response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Summary statistics for ``/api/stats`` and their consistency check.
+
+``stats_counts`` (migration 016) holds one counter per dimension and
+bucket, and ``cities`` its rider and event counters (migration 011).
+Triggers keep them current on every write, including the admin routes
+and season recalculations, so the endpoint never scans the base tables.
+This module reads them and, from the command line, compares them with
+a full count or rebuilds them::
+
+    python -m backend.stats check     # list counters that drifted, exit 1 if any
+    python -m backend.stats rebuild   # recount everything from scratch
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from backend.config import Config
+from backend.dialect import adapt, is_sqlite
+from backend.versions import bump_versions
+
+DB_PATH = Path(Config.DATABASE_PATH)
+
+# data_versions scopes the counters are derived from
+SCOPES = ("riders", "events", "season")
+
+# width of the season points histogram bands, as in the migration
+POINTS_BAND = 100
+# cities listed under riders.byCity
+TOP_CITIES = 20
+
+
+def _count_queries(conn: Any) -> list[str]:
+    """``(dimension, bucket, total)`` queries over the base tables."""
+
+    if is_sqlite(conn):
+        month = "COALESCE(substr(date_start, 1, 7), '')"
+        band = f"CAST(season_points / {POINTS_BAND} * {POINTS_BAND} AS TEXT)"
+    else:
+        month = "DATE_FORMAT(date_start, '%Y-%m')"
+        band = f"CAST(FLOOR(season_points / {POINTS_BAND}) * {POINTS_BAND} AS CHAR)"
+    published = "FROM events WHERE status = 'published'"
+    return [
+        "SELECT 'rider_level', COALESCE(level, ''), COUNT(*) FROM riders GROUP BY COALESCE(level, '')",
+        "SELECT 'rider_style', COALESCE(style, ''), COUNT(*) FROM riders GROUP BY COALESCE(style, '')",
+        f"SELECT 'event_level', COALESCE(level, ''), COUNT(*) {published} GROUP BY COALESCE(level, '')",
+        f"SELECT 'event_month', {month}, COUNT(*) {published} GROUP BY {month}",
+        f"SELECT 'points', {band}, COUNT(*) FROM season_points GROUP BY {band}",
+    ]
+
+
+def expected_counts(conn: Any) -> dict[tuple[str, str], int]:
+    cursor = conn.cursor()
+    counts: dict[tuple[str, str], int] = {}
+    for sql in _count_queries(conn):
+        cursor.execute(sql)
+        counts.update(((dimension, bucket), total) for dimension, bucket, total in cursor.fetchall())
+    cursor.close()
+    return counts
+
+
+def stored_counts(conn: Any) -> dict[tuple[str, str], int]:
+    cursor = conn.cursor()
+    cursor.execute("SELECT dimension, bucket, total FROM stats_counts WHERE total <> 0")
+    counts = {(dimension, bucket): total for dimension, bucket, total in cursor.fetchall()}
+    cursor.close()
+    return counts
+
+
+_CITY_COUNTS_SQL = """
+    SELECT c.id, c.riders_count, c.events_count,
+           (SELECT COUNT(*) FROM riders AS r WHERE r.city_id = c.id),
+           (SELECT COUNT(*) FROM events AS e WHERE e.city_id = c.id AND e.status = 'published')
+    FROM cities AS c
+"""
+
+
+def check_stats(conn: Any) -> list[str]:
+    """Describe every counter that differs from a full count."""
+
+    stored, expected = stored_counts(conn), expected_counts(conn)
+    mismatches = [
+        f"{dimension} {bucket!r}: stored {stored.get((dimension, bucket), 0)} counted {expected.get((dimension, bucket), 0)}"
+        for dimension, bucket in sorted(set(stored) | set(expected))
+        if stored.get((dimension, bucket), 0) != expected.get((dimension, bucket), 0)
+    ]
+    cursor = conn.cursor()
+    cursor.execute(_CITY_COUNTS_SQL)
+    for city_id, riders, events, counted_riders, counted_events in cursor.fetchall():
+        if (riders, events) != (counted_riders, counted_events):
+            mismatches.append(
+                f"city {city_id}: stored {riders} riders / {events} events"
+                f" counted {counted_riders} / {counted_events}"
+            )
+    cursor.close()
+    return mismatches
+
+
+def rebuild_stats(conn: Any) -> None:
+    """Recount ``stats_counts`` and the city counters; the caller commits.
+
+    The scopes ``/api/stats`` is cached on are bumped, so no worker keeps
+    serving the drifted numbers.
+    """
+
+    counts = expected_counts(conn)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM stats_counts")
+    cursor.executemany(
+        adapt(conn, "INSERT INTO stats_counts (dimension, bucket, total) VALUES (?, ?, ?)"),
+        [(dimension, bucket, total) for (dimension, bucket), total in counts.items()],
+    )
+    cursor.execute(
+        """
+        UPDATE cities
+        SET riders_count = (SELECT COUNT(*) FROM riders WHERE riders.city_id = cities.id),
+            events_count = (SELECT COUNT(*) FROM events WHERE events.city_id = cities.id AND events.status = 'published')
+        """
+    )
+    cursor.close()
+    bump_versions(conn, *SCOPES)
+
+
+def load_stats(conn: Any) -> dict[str, Any]:
+    """The ``/api/stats`` payload, read from the counters only."""
+
+    stored = stored_counts(conn)
+
+    def buckets(dimension: str) -> dict[str, int]:
+        return {bucket: total for (name, bucket), total in sorted(stored.items()) if name == dimension}
+
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(
+            conn,
+            "SELECT id, name, riders_count FROM cities WHERE riders_count > 0 ORDER BY riders_count DESC, name ASC LIMIT ?",
+        ),
+        (TOP_CITIES,),
+    )
+    cities = [{"id": city_id, "name": name, "riders": riders} for city_id, name, riders in cursor.fetchall()]
+    cursor.close()
+
+    by_level = buckets("rider_level")
+    events_by_level = buckets("event_level")
+    bands = sorted((int(bucket), total) for bucket, total in buckets("points").items())
+    return {
+        "riders": {
+            "total": sum(by_level.values()),
+            "byLevel": by_level,
+            "byStyle": buckets("rider_style"),
+            "byCity": cities,
+        },
+        "events": {
+            "total": sum(events_by_level.values()),
+            "byLevel": events_by_level,
+            "byMonth": buckets("event_month"),
+        },
+        "points": {
+            "bandWidth": POINTS_BAND,
+            "histogram": [{"from": low, "to": low + POINTS_BAND - 1, "riders": total} for low, total in bands],
+        },
+    }
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def cmd_check(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    mismatches = check_stats(conn)
+    for line in mismatches:
+        print(line)
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} counters differ from a full count; run 'rebuild'")
+    print("Statistics counters match the data")
+
+
+def cmd_rebuild(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    rebuild_stats(conn)
+    conn.commit()
+    print("Statistics counters rebuilt")
+
+
+COMMANDS = {"check": cmd_check, "rebuild": cmd_rebuild}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check or rebuild the /api/stats counters.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--database", type=Path, default=DB_PATH, help=f"SQLite database (default: {DB_PATH})")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with connect(args.database) as conn:
+        COMMANDS[args.command](conn, args)
+
+
+if __name__ == "__main__":
+    main()
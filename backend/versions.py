@@ -0,0 +1,69 @@
+"""Data generation counters (``data_versions``).
+
+Every admin write bumps the scope it touched and every season
+recalculation bumps ``season``; anything derived from the data (cached
+responses, ETags) is keyed on the current counters instead of being
+invalidated explicitly.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Sequence
+
+from backend.dialect import adapt, placeholders
+
+SCOPES = ("riders", "events", "results", "season")
+
+
+def bump_versions(conn: Any, *scopes: str) -> None:
+    """Increment ``scopes`` inside the caller's transaction."""
+
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(
+            conn,
+            f"""
+            UPDATE data_versions
+            SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE scope IN ({placeholders(len(scopes))})
+            """,
+        ),
+        scopes,
+    )
+    cursor.close()
+
+
+def current_versions(conn: Any, scopes: Sequence[str] = SCOPES) -> dict[str, int]:
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(conn, f"SELECT scope, version FROM data_versions WHERE scope IN ({placeholders(len(scopes))})"),
+        tuple(scopes),
+    )
+    versions = {scope: int(version) for scope, version in cursor.fetchall()}
+    cursor.close()
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+def generation(conn: Any, scopes: Sequence[str]) -> str:
+    """Return a compact token that changes whenever any of ``scopes`` does."""
+
+    versions = current_versions(conn, scopes)
+    return ".".join(str(versions[scope]) for scope in scopes)
+
+
+def last_updated(conn: Any, scopes: Sequence[str]) -> datetime | None:
+    """When any of ``scopes`` was last bumped (UTC), ``None`` if never."""
+
+    cursor = conn.cursor()
+    cursor.execute(
+        adapt(conn, f"SELECT MAX(updated_at) FROM data_versions WHERE scope IN ({placeholders(len(scopes))})"),
+        tuple(scopes),
+    )
+    value = cursor.fetchone()[0]
+    cursor.close()
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.replace(tzinfo=timezone.utc)